@@ -0,0 +1,199 @@
+"""
+Accounts App - Activity Log Writer
+
+``ActivityLogMiddleware`` never writes to the database in the request
+path. It puts one small tuple per logged request on a bounded in-process
+queue; a background thread drains the queue every ``FLUSH_INTERVAL``
+seconds (or as soon as ``BATCH_SIZE`` entries are waiting) and inserts
+them with ``bulk_create``.
+
+Back-pressure: when the queue is full a request waits at most
+``BLOCK_TIMEOUT`` seconds for room, then its entry is dropped and
+counted, so a slow database can never grow memory without bound or stall
+requests for long. ``stats()`` reports queued, written and dropped counts.
+
+``prune()`` (the ``prune_user_activity`` beat task) deletes rows older
+than ``RETENTION_DAYS`` in primary-key chunks, keeping each transaction
+short.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'METHODS': ['POST', 'PUT', 'PATCH', 'DELETE'],  # reads are not logged
+    'EXCLUDE_PATHS': ['/admin/jsi18n/', '/static/', '/media/'],
+    'LOGIN_VIEWS': ['token_obtain_pair'],  # successful calls update last_login_ip
+    'TRUST_X_FORWARDED_FOR': False,     # only behind a proxy that sets it
+    'MAX_QUEUE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 5,        # seconds
+    'BLOCK_TIMEOUT': 0.05,      # seconds a request may wait for room in a full queue
+    'RETENTION_DAYS': 180,
+    'PRUNE_CHUNK': 5000,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'ACTIVITY_LOG', {}))
+    return config
+
+
+class ActivityWriter:
+    """Bounded queue plus the thread that bulk-inserts it."""
+    
+    def __init__(self, config):
+        self.config = config
+        self.queue = queue.Queue(maxsize=config['MAX_QUEUE'])
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.thread = None
+    
+    def put(self, entry):
+        """Queue one ``(user_id, action, details, ip, created_at, is_login)`` entry."""
+        try:
+            self.queue.put(entry, timeout=self.config['BLOCK_TIMEOUT'])
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+        if self.queue.qsize() >= self.config['BATCH_SIZE']:
+            self.wake.set()
+        self.ensure_thread()
+        return True
+    
+    def ensure_thread(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='activity-log-writer', daemon=True)
+                self.thread.start()
+    
+    def run(self):
+        while not self.stopped.is_set():
+            self.wake.wait(self.config['FLUSH_INTERVAL'])
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Activity log flush failed')
+            finally:
+                close_old_connections()
+    
+    def take(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def flush(self):
+        """Write everything queued so far. Returns the number of rows inserted."""
+        from .authentication import forget_users
+        from .models import CustomUser, UserActivity
+        
+        written = 0
+        while True:
+            batch = self.take(self.config['BATCH_SIZE'])
+            if not batch:
+                return written
+            try:
+                UserActivity.objects.bulk_create(
+                    UserActivity(user_id=user_id, action=action, details=details, ip_address=ip, created_at=at)
+                    for user_id, action, details, ip, at, _ in batch
+                )
+            except Exception:
+                # Dropped rather than re-queued: a bad batch must not block the ones behind it.
+                with self.lock:
+                    self.dropped += len(batch)
+                raise
+            logins = {user_id: ip for user_id, _, _, ip, _, is_login in batch if is_login and ip}
+            by_ip = {}
+            for user_id, ip in logins.items():
+                by_ip.setdefault(ip, []).append(user_id)
+            for ip, user_ids in by_ip.items():
+                CustomUser.objects.filter(pk__in=user_ids).exclude(last_login_ip=ip).update(last_login_ip=ip)
+            if logins:
+                forget_users(logins)  # update() skips the signal that drops cached users
+            with self.lock:
+                self.written += len(batch)
+            written += len(batch)
+    
+    def stats(self):
+        with self.lock:
+            return {'queued': self.queue.qsize(), 'written': self.written, 'dropped': self.dropped}
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ActivityWriter(get_config())
+    return _writer
+
+
+def client_ip(request):
+    if get_config()['TRUST_X_FORWARDED_FOR']:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or None
+
+
+def record(user_id, action, details='', ip=None, is_login=False):
+    """Queue an activity row; returns False if it was dropped under back-pressure."""
+    return get_writer().put((user_id, action[:100], details, ip, timezone.now(), is_login))
+
+
+def flush():
+    return get_writer().flush()
+
+
+def stats():
+    return get_writer().stats()
+
+
+def prune(retention_days=None, chunk=None):
+    """Delete activity older than the retention period. Returns rows deleted."""
+    from .models import UserActivity
+    
+    config = get_config()
+    cutoff = timezone.now() - timedelta(days=retention_days or config['RETENTION_DAYS'])
+    chunk = chunk or config['PRUNE_CHUNK']
+    deleted = 0
+    while True:
+        ids = list(UserActivity.objects.filter(created_at__lt=cutoff).values_list('pk', flat=True)[:chunk])
+        if not ids:
+            return deleted
+        deleted += UserActivity.objects.filter(pk__in=ids).delete()[0]
+
+
+@atexit.register
+def _flush_on_exit():
+    if _writer is not None:
+        try:
+            _writer.flush()
+        except Exception:
+            pass
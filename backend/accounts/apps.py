@@ -5,3 +5,8 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
     verbose_name = 'حساب‌های کاربری'
+
+    def ready(self):
+        from . import authentication
+
+        authentication.connect_signals()
@@ -0,0 +1,160 @@
+"""
+Accounts App - Cached JWT Authentication
+
+``CachedJWTAuthentication`` is a drop-in for simplejwt's
+``JWTAuthentication`` that avoids the per-request user query. After the
+token's signature and expiry are verified (no I/O), one ``get_many`` on
+the cache fetches:
+
+* ``<prefix>:user:<id>`` - the user row, kept ``USER_TTL`` seconds and
+  dropped whenever the user is saved or deleted (``update()`` calls that
+  skip the signals call ``forget_users``);
+* ``<prefix>:token:<jti>`` - a marker that this token was checked against
+  the blacklist, kept ``TOKEN_TTL`` seconds (never past the token's expiry).
+
+Only on a miss is the database asked, and then once: the user row comes
+back with the blacklist check folded in, as in the uncached path. Revoking a token (logout) writes it
+to simplejwt's blacklist tables (unique, indexed ``jti``) and clears its
+marker; other processes with a local cache see the revocation within
+``TOKEN_TTL``. Expired rows are pruned by the ``prune_token_blacklist`` task.
+
+Dropping a user row only reaches other workers through a shared cache
+(Redis). On a process-local backend the row is kept ``LOCAL_USER_TTL``
+seconds instead (see ``core.caching``), so a user deactivated or edited
+through another worker is seen within that time.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models import Exists
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch, get_md5_hash_password
+
+from core.caching import invalidated_timeout
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'USER_TTL': 300,
+    'LOCAL_USER_TTL': 5,    # on a process-local cache backend
+    'TOKEN_TTL': 60,
+    'KEY_PREFIX': 'jwtauth',
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'AUTH_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def user_key(user_id):
+    return f"{get_config()['KEY_PREFIX']}:user:{user_id}"
+
+
+def token_key(jti):
+    return f"{get_config()['KEY_PREFIX']}:token:{jti}"
+
+
+def is_revoked(jti):
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def revoke(token):
+    """Blacklist ``token`` (access or refresh) for the rest of its lifetime."""
+    jti = token[api_settings.JTI_CLAIM]
+    outstanding, _ = OutstandingToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            'user_id': token.get(api_settings.USER_ID_CLAIM),
+            'token': str(token),
+            'created_at': datetime_from_epoch(token['iat']) if 'iat' in token else timezone.now(),
+            'expires_at': datetime_from_epoch(token['exp']),
+        },
+    )
+    BlacklistedToken.objects.get_or_create(token=outstanding)
+    get_cache().delete(token_key(jti))
+
+
+def forget_user(user_id):
+    get_cache().delete(user_key(user_id))
+
+
+def forget_users(user_ids):
+    get_cache().delete_many([user_key(user_id) for user_id in user_ids])
+
+
+def user_timeout(cache, config):
+    return invalidated_timeout(cache, config['USER_TTL'], config['LOCAL_USER_TTL'])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` with cached user lookups and a blacklist check."""
+    
+    def get_user(self, validated_token):
+        config = get_config()
+        cache = get_cache()
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)  # raises InvalidToken
+        keys = [user_key(user_id), token_key(jti)]
+        cached = cache.get_many(keys)
+        user = cached.get(keys[0])
+        
+        if keys[1] not in cached:
+            if user is None:
+                # Cold path: the blacklist check rides along with the user query.
+                user = self.load_user(user_id, jti)
+                revoked = user.token_revoked
+                del user.token_revoked
+                cache.set(keys[0], user, user_timeout(cache, config))
+            else:
+                revoked = is_revoked(jti)
+            if revoked:
+                raise AuthenticationFailed('این توکن باطل شده است', code='token_revoked')
+            remaining = int(validated_token['exp'] - timezone.now().timestamp())
+            cache.set(keys[1], True, max(1, min(config['TOKEN_TTL'], remaining)))
+        elif user is None:
+            user = self.load_user(user_id, jti)
+            del user.token_revoked
+            cache.set(keys[0], user, user_timeout(cache, config))
+        
+        # The same checks simplejwt makes after its own lookup.
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('حساب کاربری غیرفعال است', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed('رمز عبور تغییر کرده است', code='password_changed')
+        return user
+    
+    def load_user(self, user_id, jti):
+        user = (
+            self.user_model.objects
+            .annotate(token_revoked=Exists(BlacklistedToken.objects.filter(token__jti=jti)))
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        )
+        if user is None:
+            raise AuthenticationFailed('کاربر یافت نشد', code='user_not_found')
+        return user
+
+
+def _on_user_change(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(_on_user_change, sender=User, dispatch_uid='auth-cache-user-save')
+    post_delete.connect(_on_user_change, sender=User, dispatch_uid='auth-cache-user-delete')
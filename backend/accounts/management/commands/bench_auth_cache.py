@@ -0,0 +1,102 @@
+"""
+Measure what the cached JWT authentication saves per request.
+
+    python manage.py bench_auth_cache --requests 2000
+
+Authenticates the same set of tokens with simplejwt's ``JWTAuthentication``
+and with ``CachedJWTAuthentication`` (warm cache), then times full
+``GET /api/users/me/`` requests with the cache warm and with it cleared
+before every request. Also checks that logging out revokes the token and
+that saving a user refreshes the cached copy.
+"""
+
+import logging
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, RequestFactory
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import CachedJWTAuthentication, get_cache
+from core.benchmarks import benchmark_database, format_summary, summarize
+
+
+class Command(BaseCommand):
+    help = 'Compare authenticated request latency with and without the JWT user cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=50)
+
+    def handle(self, *args, **options):
+        # The expected 401s would otherwise be logged one by one.
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        with benchmark_database():
+            User = get_user_model()
+            users = User.objects.bulk_create(
+                User(username=f'auth{i}@example.com', email=f'auth{i}@example.com', full_name=f'کاربر {i}')
+                for i in range(options['users'])
+            )
+            tokens = [str(RefreshToken.for_user(user).access_token) for user in users]
+            total = options['requests']
+            factory = RequestFactory()
+            requests = [
+                Request(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')) for token in tokens
+            ]
+
+            get_cache().clear()
+            for name, backend in [('JWTAuthentication', JWTAuthentication()),
+                                  ('CachedJWTAuthentication', CachedJWTAuthentication())]:
+                self.measure(name, lambda i: backend.authenticate(requests[i % len(requests)]), total)
+
+            clients = [Client(HTTP_AUTHORIZATION=f'Bearer {token}') for token in tokens]
+            self.measure('GET /me/ (warm cache)', lambda i: clients[i % len(clients)].get('/api/users/me/'), total)
+
+            def cold(i):
+                get_cache().clear()
+                clients[i % len(clients)].get('/api/users/me/')
+
+            self.measure('GET /me/ (cache cleared)', cold, total)
+            self.check_invalidation(users[0], clients[0])
+        self.stdout.write(self.style.SUCCESS('Auth cache OK'))
+
+    def measure(self, name, fn, total):
+        fn(0)  # warm up
+        latencies = []
+        executed = []
+
+        def count(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            for i in range(total):
+                start = time.perf_counter()
+                fn(i)
+                latencies.append(time.perf_counter() - start)
+        summary = summarize(latencies, time.perf_counter() - started)
+        queries = len(executed) / total
+        self.stdout.write(f'{format_summary(name, summary)}  {queries:.2f} queries/req')
+
+    def check_invalidation(self, user, client):
+        client.get('/api/users/me/')
+        user.full_name = 'نام جدید'
+        user.save()
+        if client.get('/api/users/me/').json().get('full_name') != 'نام جدید':
+            raise CommandError('Cached user was not refreshed after save')
+        refresh = RefreshToken.for_user(user)
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client.get('/api/users/me/')
+        response = client.post('/api/token/logout/', {'refresh': str(refresh)}, content_type='application/json')
+        if response.status_code != 205:
+            raise CommandError(f'Logout returned {response.status_code}')
+        if client.get('/api/users/me/').status_code != 401:
+            raise CommandError('Revoked access token still authenticates')
+        response = Client().post('/api/token/refresh/', {'refresh': str(refresh)}, content_type='application/json')
+        if response.status_code != 401:
+            raise CommandError('Revoked refresh token can still be used')
@@ -0,0 +1,99 @@
+"""
+Check the batched activity log end to end.
+
+    python manage.py check_activity_log --requests 500
+
+Sends authenticated write requests and a login, verifies that no activity
+query runs inside a request, that a flush writes every entry in batches,
+that a full queue drops entries instead of growing, and that pruning
+removes old rows in chunks.
+"""
+
+import datetime
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import activity
+from accounts.models import UserActivity
+from core.benchmarks import benchmark_database, format_summary, summarize
+
+
+class Command(BaseCommand):
+    help = 'Verify batched UserActivity ingestion, back-pressure and retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        with benchmark_database():
+            writer = activity.get_writer()
+            writer.stopped.set()  # flush by hand below
+            writer.config = dict(writer.config, FLUSH_INTERVAL=3600)
+            User = get_user_model()
+            user = User.objects.create_user(
+                username='activity@example.com', email='activity@example.com', password='secret-pass',
+                full_name='کاربر'
+            )
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+            inserts = []
+
+            def count(execute, sql, params, many, context):
+                if 'accounts_useractivity' in sql:
+                    inserts.append(sql)
+                return execute(sql, params, many, context)
+
+            latencies = []
+            started = time.perf_counter()
+            with connection.execute_wrapper(count):
+                for i in range(total):
+                    start = time.perf_counter()
+                    client.patch('/api/users/me/', {'full_name': f'کاربر {i}'}, content_type='application/json')
+                    latencies.append(time.perf_counter() - start)
+            self.stdout.write(format_summary('PATCH /me/ (logged)', summarize(latencies, time.perf_counter() - started)))
+            if inserts:
+                raise CommandError(f'{len(inserts)} activity queries ran inside requests')
+
+            login = Client(REMOTE_ADDR='10.1.2.3').post(
+                '/api/token/', {'username': user.username, 'password': 'secret-pass'},
+                content_type='application/json'
+            )
+            if login.status_code != 200:
+                raise CommandError(f'Login returned {login.status_code}')
+
+            with connection.execute_wrapper(count):
+                written = activity.flush()
+            stored = UserActivity.objects.filter(user=user).count()
+            batches = len(inserts)
+            self.stdout.write(f'flushed {written} entries in {batches} INSERT(s)')
+            if written != stored or stored != total + 1:
+                raise CommandError(f'{written} written, {stored} stored, {total + 1} expected')
+            user.refresh_from_db()
+            if user.last_login_ip != '10.1.2.3':
+                raise CommandError(f'last_login_ip is {user.last_login_ip}')
+
+            # Back-pressure: a full queue drops new entries after BLOCK_TIMEOUT.
+            writer.queue.maxsize = 10
+            dropped = writer.stats()['dropped']
+            for i in range(25):
+                activity.record(user.pk, 'test')
+            stats = writer.stats()
+            if stats['queued'] != 10 or stats['dropped'] - dropped != 15:
+                raise CommandError(f'Back-pressure failed: {stats}')
+            activity.flush()
+            self.stdout.write(f'full queue: 10 kept, 15 dropped ({writer.stats()})')
+
+            old = timezone.now() - datetime.timedelta(days=activity.get_config()['RETENTION_DAYS'] + 1)
+            UserActivity.objects.filter(pk__in=UserActivity.objects.values('pk')[:200]).update(created_at=old)
+            deleted = activity.prune(chunk=64)
+            if deleted != 200 or UserActivity.objects.filter(created_at__lt=old + datetime.timedelta(days=1)).exists():
+                raise CommandError(f'Pruned {deleted} rows, expected 200')
+            self.stdout.write(f'pruned {deleted} old rows in chunks of 64')
+        self.stdout.write(self.style.SUCCESS('Activity log OK'))
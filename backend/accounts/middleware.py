@@ -0,0 +1,66 @@
+"""
+Accounts App - Middleware
+"""
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.middleware import AsyncCapableMiddleware
+
+from . import activity
+
+
+class ActivityLogMiddleware(AsyncCapableMiddleware):
+    """Queue a ``UserActivity`` row for authenticated write requests.
+    
+    Runs after the view, when DRF has put the token's user on the request.
+    The row is written later in a batch (see ``accounts.activity``).
+    """
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.config = activity.get_config()
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.is_logged(request):
+            self.log(request, response)
+        return response
+    
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.is_logged(request):
+            # The session user may be loaded lazily and the queue may block.
+            await sync_to_async(self.log)(request, response)
+        return response
+    
+    def is_logged(self, request):
+        return (
+            self.config['ENABLED'] and request.method in self.config['METHODS']
+            and not any(request.path.startswith(prefix) for prefix in self.config['EXCLUDE_PATHS'])
+        )
+    
+    def log(self, request, response):
+        match = request.resolver_match
+        view_name = match.view_name if match else ''
+        user_id = getattr(request.user, 'pk', None) if hasattr(request, 'user') else None
+        is_login = view_name in self.config['LOGIN_VIEWS'] and response.status_code == 200
+        if is_login:
+            user_id = self.login_user_id(response)
+            action = 'login'
+        else:
+            action = f'{request.method} {view_name or request.path}'
+        if user_id is None:
+            return
+        details = f'{request.path} -> {response.status_code}'
+        activity.record(user_id, action, details, activity.client_ip(request), is_login)
+    
+    def login_user_id(self, response):
+        try:
+            return AccessToken(response.data['access'])[api_settings.USER_ID_CLAIM]
+        except (AttributeError, KeyError, TypeError, TokenError):
+            return None
@@ -4,6 +4,7 @@ Accounts App - User Models
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class CustomUser(AbstractUser):
@@ -23,11 +24,17 @@ class CustomUser(AbstractUser):
         verbose_name='نقش'
     )
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True, verbose_name='تصویر پروفایل')
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='نسخه‌های واکنش‌گرا')
     last_login_ip = models.GenericIPAddressField(blank=True, null=True)
     
     class Meta:
         verbose_name = 'کاربر'
         verbose_name_plural = 'کاربران'
+        indexes = [
+            models.Index(fields=['-date_joined', '-id'], name='user_joined_idx'),
+            models.Index(fields=['role', '-date_joined'], name='user_role_idx'),
+            models.Index(fields=['full_name'], name='user_full_name_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} ({self.email})"
@@ -68,12 +75,17 @@ class UserActivity(models.Model):
     action = models.CharField(max_length=100, verbose_name='عملیات')
     details = models.TextField(blank=True, null=True, verbose_name='جزئیات')
     ip_address = models.GenericIPAddressField(blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the request is captured; rows are inserted later in batches.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         verbose_name = 'فعالیت کاربر'
         verbose_name_plural = 'فعالیت‌های کاربران'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='activity_user_created_idx'),
+            models.Index(fields=['created_at'], name='activity_created_idx'),  # retention pruning
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.action}"
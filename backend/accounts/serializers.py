@@ -4,6 +4,7 @@ Accounts App - Serializers
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from core.fields import ResponsiveImageField
 from .models import UserProfile, UserActivity
 
 User = get_user_model()
@@ -52,9 +53,11 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     """Basic user serializer"""
     
+    avatar_variants = ResponsiveImageField()
+    
     class Meta:
         model = User
-        fields = ['id', 'email', 'full_name', 'phone', 'role', 'avatar', 'date_joined', 'last_login']
+        fields = ['id', 'email', 'full_name', 'phone', 'role', 'avatar', 'avatar_variants', 'date_joined', 'last_login']
         read_only_fields = ['id', 'email', 'date_joined', 'last_login']
 
 
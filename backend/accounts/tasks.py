@@ -0,0 +1,20 @@
+"""
+Accounts App - Celery Tasks
+"""
+
+from celery import shared_task
+from django.core.management import call_command
+
+from . import activity
+
+
+@shared_task
+def prune_token_blacklist():
+    """Delete expired outstanding/blacklisted tokens (scheduled by Celery beat)."""
+    call_command('flushexpiredtokens')
+
+
+@shared_task
+def prune_user_activity():
+    """Delete activity rows past the retention period (scheduled by Celery beat)."""
+    return activity.prune()
@@ -6,6 +6,10 @@ from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.pagination import OptInCursorPagination
+from .authentication import revoke
 from .models import UserProfile, UserActivity
 from .serializers import (
     UserRegistrationSerializer, 
@@ -50,6 +54,26 @@ class CurrentUserView(APIView):
         return Response(serializer.data)
 
 
+class LogoutView(APIView):
+    """Revoke the current access token and, if given, the refresh token"""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                token = RefreshToken(refresh)
+            except TokenError:
+                return Response({'error': 'توکن نامعتبر است'}, status=status.HTTP_400_BAD_REQUEST)
+            if str(token.get('user_id')) != str(request.user.pk):
+                return Response({'error': 'توکن نامعتبر است'}, status=status.HTTP_400_BAD_REQUEST)
+            revoke(token)
+        if request.auth is not None:
+            revoke(request.auth)
+        return Response(status=status.HTTP_205_RESET_CONTENT)
+
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """User profile view"""
     
@@ -66,6 +90,8 @@ class UserListView(generics.ListAPIView):
     
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ('-date_joined', '-id')
     queryset = User.objects.all()
     filterset_fields = ['role']
     search_fields = ['full_name', 'email', 'phone']
@@ -77,6 +103,8 @@ class UserActivityListView(generics.ListAPIView):
     
     serializer_class = UserActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptInCursorPagination
+    implicit_filters = [['user']]
     
     def get_queryset(self):
         return UserActivity.objects.filter(user=self.request.user)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import BlogPost
+
+
+@admin.register(BlogPost)
+class BlogPostAdmin(admin.ModelAdmin):
+    list_display = ['title', 'author', 'is_published', 'view_count', 'created_at']
+    list_filter = ['is_published']
+    list_select_related = ['author']
+    search_fields = ['title', 'tags']
+    prepopulated_fields = {'slug': ('title',)}
@@ -14,6 +14,7 @@ class BlogPost(models.Model):
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='نویسنده')
     content = models.TextField(verbose_name='محتوا')
     cover_image = models.ImageField(upload_to='blog/covers/', verbose_name='تصویر کاور')
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='نسخه‌های واکنش‌گرا')
     
     tags = models.CharField(max_length=200, help_text='Comma separated tags', blank=True)
     is_published = models.BooleanField(default=True, verbose_name='منتشر شده')
@@ -26,6 +27,9 @@ class BlogPost(models.Model):
         verbose_name = 'مقاله'
         verbose_name_plural = 'مقالات'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_published', '-created_at'], name='blog_published_created_idx'),
+        ]
         
     def __str__(self):
         return self.title
@@ -2,24 +2,34 @@
 Blog App - Views
 """
 
+from django.conf import settings
 from rest_framework import viewsets, permissions
-from django.db.models import F
+from rest_framework.response import Response
+from core.mixins import RelatedFieldsMixin
+from core.response_cache import CachedResponseMixin
+from core.view_counter import record_view
 from .models import BlogPost
 from .serializers import BlogPostSerializer
 
 
-class BlogPostViewSet(viewsets.ModelViewSet):
+class BlogPostViewSet(CachedResponseMixin, RelatedFieldsMixin, viewsets.ModelViewSet):
     """Blog CRUD"""
     
     queryset = BlogPost.objects.filter(is_published=True)
     serializer_class = BlogPostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     search_fields = ['title', 'content', 'tags']
+    cache_models = ['blog.BlogPost', settings.AUTH_USER_MODEL]
     
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+    
+    def cache_hit(self, request, *args, **kwargs):
+        if 'pk' in kwargs:
+            record_view(BlogPost(pk=BlogPost._meta.pk.to_python(kwargs['pk'])))
         
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        BlogPost.objects.filter(pk=instance.pk).update(view_count=F('view_count') + 1)
-        return super().retrieve(request, *args, **kwargs)
+        record_view(instance)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
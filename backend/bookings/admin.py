@@ -0,0 +1,22 @@
+from django.contrib import admin
+from .models import Booking, DaySlot, SlotTemplate
+
+
+@admin.register(SlotTemplate)
+class SlotTemplateAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'capacity', 'is_active']
+    list_filter = ['weekday', 'is_active']
+
+
+@admin.register(DaySlot)
+class DaySlotAdmin(admin.ModelAdmin):
+    list_display = ['date', 'label', 'capacity', 'booked_count']
+    list_filter = ['date']
+    readonly_fields = ['booked_count']
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'user', 'status', 'created_at']
+    list_filter = ['status']
+    list_select_related = ['user']
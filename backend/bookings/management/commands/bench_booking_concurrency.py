@@ -0,0 +1,76 @@
+"""
+Concurrency test for slot reservation.
+
+Fires parallel booking requests from distinct users at the same slot and
+checks that exactly ``capacity`` of them succeed, the rest get 409, and the
+slot's ``booked_count`` matches the bookings actually stored.
+"""
+
+import datetime
+import logging
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from bookings.models import Booking, DaySlot
+from core.benchmarks import benchmark_database, format_summary, run_concurrent
+
+
+class Command(BaseCommand):
+    help = 'Race parallel booking requests for one slot and verify nothing is overbooked'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--capacity', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            slot = DaySlot.objects.create(
+                date=timezone.localdate() + datetime.timedelta(days=1),
+                start_time=datetime.time(9), end_time=datetime.time(11),
+                capacity=options['capacity'],
+            )
+            clients = self.seed_clients(options['requests'])
+            statuses = Counter()
+
+            def request(i):
+                response = clients[i].post(
+                    '/api/bookings/', {'slot': slot.pk, 'address': 'تهران'},
+                    content_type='application/json',
+                )
+                statuses[response.status_code] += 1
+
+            # Expected 409s would otherwise be logged as warnings one by one.
+            logging.getLogger('django.request').setLevel(logging.ERROR)
+            summary = run_concurrent(request, options['requests'], options['concurrency'])
+            self.stdout.write(format_summary('concurrent reservations', summary))
+            self.stdout.write(f'responses: {dict(sorted(statuses.items()))}')
+
+            slot.refresh_from_db()
+            stored = Booking.objects.filter(slot=slot).count()
+            expected = min(options['capacity'], options['requests'])
+            if not (statuses[201] == stored == slot.booked_count == expected):
+                raise CommandError(
+                    f'{statuses[201]} created, {stored} stored, booked_count {slot.booked_count}, '
+                    f'capacity {expected}'
+                )
+            if statuses[201] + statuses[409] != options['requests']:
+                raise CommandError('Unexpected responses')
+            self.stdout.write(self.style.SUCCESS(f'{stored}/{slot.capacity} places taken, no overbooking'))
+
+    def seed_clients(self, count):
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            User(username=f'racer{i}@example.com', email=f'racer{i}@example.com',
+                 full_name=f'کاربر {i}', phone=f'0912{i:07d}')
+            for i in range(count)
+        )
+        return [
+            Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+            for user in users
+        ]
@@ -0,0 +1,42 @@
+"""
+Materialize bookable day slots from the weekly slot templates.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bookings.models import SlotTemplate
+from bookings.services import build_calendar
+
+# The slots offered by the booking form: Saturday to Thursday, Fridays closed.
+DEFAULT_SLOTS = [
+    (datetime.time(9), datetime.time(11)),
+    (datetime.time(11), datetime.time(13)),
+    (datetime.time(14), datetime.time(16)),
+    (datetime.time(16), datetime.time(18)),
+]
+WORKING_DAYS = [5, 6, 0, 1, 2, 3]
+
+
+class Command(BaseCommand):
+    help = 'Create DaySlot rows for the coming days from the active slot templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.BOOKING_CALENDAR_DAYS)
+        parser.add_argument(
+            '--defaults', action='store_true',
+            help='Create the default weekly templates first if none exist',
+        )
+
+    def handle(self, *args, **options):
+        if options['defaults'] and not SlotTemplate.objects.exists():
+            SlotTemplate.objects.bulk_create(
+                SlotTemplate(weekday=weekday, start_time=start, end_time=end)
+                for weekday in WORKING_DAYS
+                for start, end in DEFAULT_SLOTS
+            )
+        created = build_calendar(timezone.localdate(), options['days'])
+        self.stdout.write(self.style.SUCCESS(f'{created} slot(s) created'))
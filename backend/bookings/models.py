@@ -4,6 +4,74 @@ Bookings App - Models
 
 from django.db import models
 from django.conf import settings
+from django.db.models import Q
+
+
+class SlotTemplate(models.Model):
+    """Weekly calendar: which visit slots are offered on which weekday"""
+    
+    WEEKDAY_CHOICES = [
+        (5, 'شنبه'),
+        (6, 'یکشنبه'),
+        (0, 'دوشنبه'),
+        (1, 'سه‌شنبه'),
+        (2, 'چهارشنبه'),
+        (3, 'پنجشنبه'),
+        (4, 'جمعه'),
+    ]
+    
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES, verbose_name='روز هفته')
+    start_time = models.TimeField(verbose_name='ساعت شروع')
+    end_time = models.TimeField(verbose_name='ساعت پایان')
+    capacity = models.PositiveSmallIntegerField(default=1, verbose_name='ظرفیت')
+    is_active = models.BooleanField(default=True, verbose_name='فعال')
+    
+    class Meta:
+        verbose_name = 'الگوی بازه زمانی'
+        verbose_name_plural = 'الگوهای بازه زمانی'
+        ordering = ['weekday', 'start_time']
+        unique_together = ['weekday', 'start_time']
+    
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.start_time:%H:%M} - {self.end_time:%H:%M}"
+
+
+class DaySlot(models.Model):
+    """A bookable slot on a concrete day.
+    
+    Rows are materialized ahead of time from ``SlotTemplate`` and double as
+    the availability index: ``booked_count`` is maintained by reservations,
+    so free slots are a range scan on ``date`` with no joins or counting.
+    """
+    
+    date = models.DateField(verbose_name='تاریخ')
+    start_time = models.TimeField(verbose_name='ساعت شروع')
+    end_time = models.TimeField(verbose_name='ساعت پایان')
+    capacity = models.PositiveSmallIntegerField(default=1, verbose_name='ظرفیت')
+    booked_count = models.PositiveSmallIntegerField(default=0, verbose_name='تعداد رزرو')
+    
+    class Meta:
+        verbose_name = 'بازه زمانی'
+        verbose_name_plural = 'بازه‌های زمانی'
+        ordering = ['date', 'start_time']
+        unique_together = ['date', 'start_time']
+        constraints = [
+            models.CheckConstraint(
+                check=Q(booked_count__lte=models.F('capacity')),
+                name='dayslot_not_overbooked'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.label}"
+    
+    @property
+    def label(self):
+        return f"{self.start_time:%H:%M} - {self.end_time:%H:%M}"
+    
+    @property
+    def remaining(self):
+        return max(self.capacity - self.booked_count, 0)
 
 
 class Booking(models.Model):
@@ -17,6 +85,14 @@ class Booking(models.Model):
     ]
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bookings')
+    slot = models.ForeignKey(
+        DaySlot,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='bookings',
+        verbose_name='بازه زمانی'
+    )
     date = models.DateField(verbose_name='تاریخ')
     time_slot = models.CharField(max_length=20, verbose_name='بازه زمانی') # e.g., "10:00 - 12:00"
     address = models.TextField(verbose_name='آدرس بازدید')
@@ -31,7 +107,18 @@ class Booking(models.Model):
         verbose_name = 'رزرو بازدید'
         verbose_name_plural = 'رزروهای بازدید'
         ordering = ['-date', '-time_slot']
-        unique_together = ['date', 'time_slot'] # Prevent double booking
+        indexes = [
+            models.Index(fields=['user', '-date'], name='booking_user_date_idx'),
+            models.Index(fields=['-date', '-time_slot'], name='booking_date_idx'),
+        ]
+        constraints = [
+            # Capacity is enforced on DaySlot; a user still can't hold the same slot twice.
+            models.UniqueConstraint(
+                fields=['slot', 'user'],
+                condition=~Q(status='CANCELLED'),
+                name='booking_unique_user_slot'
+            ),
+        ]
         
     def __str__(self):
         return f"{self.date} {self.time_slot} - {self.user.full_name}"
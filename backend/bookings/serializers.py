@@ -3,11 +3,27 @@ Bookings App - Serializers
 """
 
 from rest_framework import serializers
-from .models import Booking
+from .models import Booking, DaySlot
+
+
+class DaySlotSerializer(serializers.ModelSerializer):
+    label = serializers.CharField(read_only=True)
+    remaining = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = DaySlot
+        fields = ['id', 'date', 'start_time', 'end_time', 'label', 'capacity', 'remaining']
 
 
 class BookingSerializer(serializers.ModelSerializer):
+    slot = serializers.PrimaryKeyRelatedField(queryset=DaySlot.objects.all())
+    
     class Meta:
         model = Booking
         fields = '__all__'
-        read_only_fields = ['id', 'status', 'created_at']
+        read_only_fields = ['id', 'user', 'date', 'time_slot', 'status', 'created_at']
+    
+    def validate_slot(self, slot):
+        if self.instance is not None and self.instance.slot_id != slot.pk:
+            raise serializers.ValidationError('برای تغییر زمان، رزرو را لغو و دوباره ثبت کنید')
+        return slot
@@ -0,0 +1,128 @@
+"""
+Bookings App - Slot Reservation
+
+Reservations never lock the bookings table. Taking a place in a slot is a
+single conditional UPDATE on that slot's row::
+
+    UPDATE bookings_dayslot SET booked_count = booked_count + 1
+    WHERE id = %s AND booked_count < capacity
+
+which either succeeds or matches no row, however many requests race for
+the last place. The booking row is inserted in the same transaction.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Booking, DaySlot, SlotTemplate
+from .signals import booking_cancelled
+
+# ``available_slots`` checks that the calendar reaches far enough at most
+# this often; the Celery beat task extends it regardless.
+CALENDAR_CHECK_KEY = 'bookings:calendar-checked'
+CALENDAR_CHECK_INTERVAL = 10 * 60
+
+
+class SlotUnavailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'این بازه زمانی پر شده یا در دسترس نیست'
+    default_code = 'slot_unavailable'
+
+
+class AlreadyBooked(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'شما قبلا این بازه زمانی را رزرو کرده‌اید'
+    default_code = 'already_booked'
+
+
+def reserve_slot(user, slot_id, **details):
+    """Book one place in ``slot_id`` for ``user``.
+    
+    Raises ``SlotUnavailable`` when the slot is full or past and
+    ``AlreadyBooked`` when the user already holds it.
+    """
+    today = timezone.localdate()
+    try:
+        with transaction.atomic():
+            taken = DaySlot.objects.filter(
+                pk=slot_id, date__gte=today, booked_count__lt=F('capacity')
+            ).update(booked_count=F('booked_count') + 1)
+            if not taken:
+                raise SlotUnavailable()
+            # Checked after the UPDATE, which holds the slot's row (and on
+            # SQLite the write lock); raising gives the place back.
+            if Booking.objects.filter(slot_id=slot_id, user=user).exclude(status='CANCELLED').exists():
+                raise AlreadyBooked()
+            slot = DaySlot.objects.get(pk=slot_id)
+            return Booking.objects.create(
+                user=user, slot=slot, date=slot.date, time_slot=slot.label, **details
+            )
+    except IntegrityError:
+        # booking_unique_user_slot: a concurrent request of the same user won.
+        # The transaction, and the place it took, is already rolled back.
+        raise AlreadyBooked()
+
+
+def release_slot(booking):
+    """Give the booking's place back (on cancellation or deletion)."""
+    if booking.slot_id is None:
+        return
+    DaySlot.objects.filter(pk=booking.slot_id, booked_count__gt=0).update(
+        booked_count=F('booked_count') - 1
+    )
+
+
+def cancel_booking(booking):
+    with transaction.atomic():
+        updated = Booking.objects.filter(pk=booking.pk).exclude(status='CANCELLED').update(status='CANCELLED')
+        booking.status = 'CANCELLED'
+        if updated:
+            release_slot(booking)
+            booking_cancelled.send(sender=Booking, booking=booking)
+    return booking
+
+
+def build_calendar(start, days):
+    """Materialize ``DaySlot`` rows from the active templates.
+    
+    Existing days are left untouched, so this is safe to run repeatedly.
+    Returns the number of slots created.
+    """
+    templates = list(SlotTemplate.objects.filter(is_active=True))
+    slots = [
+        DaySlot(date=day, start_time=t.start_time, end_time=t.end_time, capacity=t.capacity)
+        for day in (start + datetime.timedelta(days=n) for n in range(days))
+        for t in templates
+        if t.weekday == day.weekday()
+    ]
+    before = DaySlot.objects.filter(date__gte=start).count()
+    DaySlot.objects.bulk_create(slots, ignore_conflicts=True, batch_size=500)
+    return DaySlot.objects.filter(date__gte=start).count() - before
+
+
+def ensure_calendar(days):
+    """Make sure slots exist for the next ``days`` days (one query when they do)."""
+    today = timezone.localdate()
+    horizon = today + datetime.timedelta(days=days - 1)
+    last = DaySlot.objects.aggregate(last=Max('date'))['last']
+    if last is None or last < horizon:
+        start = max(today, last + datetime.timedelta(days=1)) if last else today
+        build_calendar(start, (horizon - start).days + 1)
+
+
+def available_slots(days):
+    today = timezone.localdate()
+    if cache.add(CALENDAR_CHECK_KEY, True, CALENDAR_CHECK_INTERVAL):
+        ensure_calendar(settings.BOOKING_CALENDAR_DAYS)
+    return DaySlot.objects.filter(
+        date__gte=today,
+        date__lt=today + datetime.timedelta(days=days),
+        booked_count__lt=F('capacity'),
+    ).order_by('date', 'start_time')
@@ -0,0 +1,8 @@
+"""
+Bookings App - Signals
+"""
+
+from django.dispatch import Signal
+
+# Sent inside the cancelling transaction with ``booking=<Booking>``.
+booking_cancelled = Signal()
@@ -0,0 +1,14 @@
+"""
+Bookings App - Celery Tasks
+"""
+
+from celery import shared_task
+from django.conf import settings
+
+from . import services
+
+
+@shared_task
+def extend_booking_calendar():
+    """Keep ``BOOKING_CALENDAR_DAYS`` of slots materialized (scheduled by Celery beat)."""
+    services.ensure_calendar(settings.BOOKING_CALENDAR_DAYS)
@@ -2,9 +2,15 @@
 Bookings App - Views
 """
 
+from itertools import groupby
+
+from django.conf import settings
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import Booking
-from .serializers import BookingSerializer
+from .serializers import BookingSerializer, DaySlotSerializer
+from . import services
 
 
 class BookingViewSet(viewsets.ModelViewSet):
@@ -12,6 +18,12 @@ class BookingViewSet(viewsets.ModelViewSet):
     
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    implicit_filters = [[], ['user']]
+    
+    def get_permissions(self):
+        if self.action == 'availability':
+            return [permissions.AllowAny()]
+        return super().get_permissions()
     
     def get_queryset(self):
         if self.request.user.is_staff:
@@ -19,4 +31,32 @@ class BookingViewSet(viewsets.ModelViewSet):
         return Booking.objects.filter(user=self.request.user)
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        data = dict(serializer.validated_data)
+        slot = data.pop('slot')
+        serializer.instance = services.reserve_slot(self.request.user, slot.pk, **data)
+    
+    def perform_destroy(self, instance):
+        if instance.status != 'CANCELLED':
+            services.cancel_booking(instance)
+        instance.delete()
+    
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        """Free slots for the next ``?days=`` days, grouped by date"""
+        max_days = settings.BOOKING_CALENDAR_DAYS
+        try:
+            days = min(max(int(request.query_params.get('days', 14)), 1), max_days)
+        except ValueError:
+            days = 14
+        slots = services.available_slots(days)
+        data = [
+            {'date': date, 'slots': DaySlotSerializer(list(day_slots), many=True).data}
+            for date, day_slots in groupby(slots, key=lambda slot: slot.date)
+        ]
+        return Response(data)
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a booking and free its slot"""
+        booking = services.cancel_booking(self.get_object())
+        return Response(self.get_serializer(booking).data)
@@ -0,0 +1,329 @@
+"""
+Chats App - Model Gateway
+
+Model calls go through the backend instead of the browser, so the API key
+stays on the server and every request passes three checks:
+
+* identical requests (same model, system instruction, temperature and
+  conversation, including any attached image) are answered from an LRU
+  cache whose entries expire after ``CACHE_TTL`` seconds. FAQ-style first
+  questions ("هزینه بازسازی آشپزخانه چقدر است؟") hit it often;
+* concurrent identical requests share one upstream call: the first caller
+  makes it, the others wait for its result (or its upstream error; after
+  any other failure a waiter makes its own call);
+* a user whose model replies used ``DAILY_TOKEN_BUDGET`` tokens today gets
+  ``TokenBudgetExceeded`` (429) until tomorrow. Cached answers cost nothing
+  and skip the check; it is made before making or joining an upstream
+  call, so each caller is held to its own budget.
+
+The cache and the in-flight table live in each worker process. Token
+usage is kept in ``TokenUsage``, one row per user and day.
+
+The upstream speaks the Gemini ``generateContent`` REST API; for tests and
+local development point ``CHAT_GATEWAY['API_URL']`` at a
+``chats.model_standin.LocalModelServer``.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import ChatMessage, TokenUsage
+from .streaming import touch_session
+
+SYSTEM_INSTRUCTION = """شما مهندس ارشد و مشاور تخصصی بازسازی (Renovation Specialist) در شرکت "هرمس سازه سبز" هستید.
+تخصص اصلی شما تبدیل فضاهای قدیمی، فرسوده و بی‌روح به محیط‌های مدرن، هوشمند و پایدار (سبز) است.
+
+وظایف شما:
+1. تحلیل تصاویر ارسالی از فضاهای داخلی (آشپزخانه، پذیرایی، سرویس‌ها) و ارائه پیشنهادات نوسازی.
+2. تخمین هزینه‌های بازسازی بر اساس متراژ و سطح لوکس بودن (اقتصادی، استاندارد، VIP) به تومان.
+3. پیشنهاد متریال‌های نوین که باعث افزایش ارزش ملک می‌شوند.
+4. ارائه زمان‌بندی تقریبی برای مراحل تخریب، تاسیسات و نازک‌کاری.
+
+قوانین پاسخگویی:
+- همیشه با لحنی حرفه‌ای، مهندسی و در عین حال صمیمی به زبان فارسی پاسخ دهید.
+- از فرمت Markdown برای زیبایی متن (تیترها، لیست‌ها و جداول) استفاده کنید.
+- اگر تصویری ارسال شد، ابتدا نقاط ضعف فضا (مثل نور کم، چیدمان غلط، فرسودگی) را شناسایی و سپس راهکار بازسازی بدهید.
+- در پایان هر مشاوره، کاربر را به بازدید حضوری رایگان توسط تیم هرمس تشویق کنید.
+"""
+
+DEFAULTS = {
+    'API_URL': 'https://generativelanguage.googleapis.com/v1beta',
+    'API_KEY': '',
+    'MODEL': 'gemini-3-flash-preview',
+    'SYSTEM_INSTRUCTION': SYSTEM_INSTRUCTION,
+    'TEMPERATURE': 0.7,
+    'TIMEOUT': 60,                  # seconds for one upstream call
+    'HISTORY_MESSAGES': 10,         # earlier messages of the session sent as context
+    'CACHE_SIZE': 500,              # cached replies per worker process
+    'CACHE_TTL': 60 * 60 * 6,
+    'DAILY_TOKEN_BUDGET': 20000,    # per user; None = unlimited
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CHAT_GATEWAY', {}))
+    return config
+
+
+class GatewayError(APIException):
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = 'خطایی در ارتباط با سرور هوش مصنوعی هرمس رخ داده است.'
+    default_code = 'model_unavailable'
+
+
+class TokenBudgetExceeded(APIException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_detail = 'سهمیه امروز شما برای مشاوره هوشمند تمام شده است. لطفا فردا دوباره تلاش کنید.'
+    default_code = 'token_budget_exceeded'
+
+
+@dataclass
+class Reply:
+    text: str
+    tokens: int         # tokens the upstream call used (0 for cached / shared replies)
+    source: str         # 'upstream', 'cache' or 'coalesced'
+
+
+class LRUCache:
+    """Thread-safe LRU mapping whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Flight:
+    """One upstream call that several identical requests wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def history(session, before=None, limit=None):
+    """Gemini ``contents`` for the last ``limit`` messages of ``session``, oldest first."""
+    limit = get_config()['HISTORY_MESSAGES'] if limit is None else limit
+    if not limit:
+        return []
+    messages = session.messages.order_by('-created_at', '-id')
+    if before is not None:
+        messages = messages.filter(pk__lt=before)
+    rows = reversed(list(messages.values_list('role', 'text')[:limit]))
+    return [{'role': role, 'parts': [{'text': text}]} for role, text in rows if text]
+
+
+def user_content(text, media=None):
+    parts = [{'text': text}]
+    if media:
+        parts.append({'inlineData': {'mimeType': media['mime_type'], 'data': media['data']}})
+    return {'role': 'user', 'parts': parts}
+
+
+def parse_reply(payload):
+    """``(text, total tokens)`` from a ``generateContent`` response."""
+    try:
+        parts = payload['candidates'][0]['content']['parts']
+    except (KeyError, IndexError, TypeError):
+        raise GatewayError()
+    text = ''.join(part.get('text', '') for part in parts)
+    if not text:
+        raise GatewayError()
+    return text, int(payload.get('usageMetadata', {}).get('totalTokenCount', 0))
+
+
+def tokens_used(user_id, day=None):
+    day = day or timezone.localdate()
+    return TokenUsage.objects.filter(user_id=user_id, date=day).values_list('tokens', flat=True).first() or 0
+
+
+def charge(user_id, tokens, day=None):
+    """Add ``tokens`` and one request to the user's usage row for ``day``."""
+    day = day or timezone.localdate()
+    changes = {'tokens': F('tokens') + tokens, 'requests': F('requests') + 1}
+    if TokenUsage.objects.filter(user_id=user_id, date=day).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            TokenUsage.objects.create(user_id=user_id, date=day, tokens=tokens, requests=1)
+    except IntegrityError:
+        # Another request created today's row first.
+        TokenUsage.objects.filter(user_id=user_id, date=day).update(**changes)
+
+
+class ModelGateway:
+    """Forward ``generateContent`` calls with caching, coalescing and budgets."""
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.cache = LRUCache(self.config['CACHE_SIZE'], self.config['CACHE_TTL'])
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {'upstream': 0, 'cache': 0, 'coalesced': 0, 'errors': 0}
+
+    def request_body(self, contents):
+        return {
+            'contents': contents,
+            'systemInstruction': {'parts': [{'text': self.config['SYSTEM_INSTRUCTION']}]},
+            'generationConfig': {'temperature': self.config['TEMPERATURE']},
+        }
+
+    def cache_key(self, body):
+        encoded = json.dumps([self.config['MODEL'], body], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def generate(self, user_id, contents):
+        """Reply to ``contents`` (Gemini format) on behalf of ``user_id``."""
+        body = self.request_body(contents)
+        key = self.cache_key(body)
+        text = self.cache.get(key)
+        if text is not None:
+            self.count('cache')
+            return Reply(text, 0, 'cache')
+
+        budget = self.config['DAILY_TOKEN_BUDGET']
+        if budget is not None and tokens_used(user_id) >= budget:
+            raise TokenBudgetExceeded()
+
+        while True:
+            with self._lock:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _Flight()
+            if leader:
+                break
+            if not flight.done.wait(self.config['TIMEOUT']):
+                raise GatewayError()
+            if flight.error is None:
+                self.count('coalesced')
+                return Reply(flight.result, 0, 'coalesced')
+            if isinstance(flight.error, GatewayError):
+                raise flight.error
+            # The leader failed for a reason of its own: make the call here.
+
+        try:
+            text, tokens = self.call(body)
+            self.cache.set(key, text)
+            flight.result = text
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+        charge(user_id, tokens)
+        self.count('upstream')
+        return Reply(text, tokens, 'upstream')
+
+    def call(self, body):
+        """One upstream ``generateContent`` request; ``(text, tokens)``."""
+        config = self.config
+        request = urllib.request.Request(
+            f"{config['API_URL'].rstrip('/')}/models/{config['MODEL']}:generateContent",
+            data=json.dumps(body).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'x-goog-api-key': config['API_KEY']},
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=config['TIMEOUT']) as response:
+                payload = json.loads(response.read())
+        except (OSError, ValueError):  # URLError, HTTPError, timeouts, bad JSON
+            self.count('errors')
+            raise GatewayError()
+        return parse_reply(payload)
+
+    def count(self, kind):
+        with self._lock:
+            self.stats[kind] += 1
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = ModelGateway()
+    return _gateway
+
+
+def reset_gateway():
+    """Drop the process-wide gateway (after a settings change)."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
+
+
+def ask(session, text, media=None):
+    """Ask the model in ``session`` and store the question and reply together.
+
+    The upstream call is made before the transaction, so no row lock or
+    connection is held while the model thinks. Returns
+    ``(question, answer, reply)``.
+    """
+    contents = history(session) + [user_content(text, media)]
+    reply = get_gateway().generate(session.user_id, contents)
+    with transaction.atomic():
+        question, answer = ChatMessage.objects.bulk_create([
+            ChatMessage(session=session, role='user', text=text),
+            ChatMessage(session=session, role='model', text=reply.text),
+        ])
+        touch_session(session.pk)
+    return question, answer, reply
+
+
+def reply_generator(session, user_message):
+    """``CHAT_REPLY_GENERATOR`` for ``add_message?stream=1`` through the gateway.
+
+    The reply is generated whole (that is what can be cached and shared)
+    and sent as one chunk.
+    """
+    contents = history(session, before=user_message.pk) + [user_content(user_message.text)]
+    yield get_gateway().generate(session.user_id, contents).text
@@ -0,0 +1,183 @@
+"""
+Check the model gateway against a local Gemini stand-in.
+
+    python manage.py check_chat_gateway --concurrency 8
+
+Asks through ``/api/chats/<id>/ask/`` and verifies that a repeated question
+is answered from the cache, that concurrent identical questions share one
+upstream call, that an exhausted daily budget answers 429 (to its own user
+only, when another user asks the same question at once), that an upstream
+failure answers 502 without storing messages, and that the cache evicts
+least recently used and expired entries.
+"""
+
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from chats import gateway
+from chats.model_standin import LocalModelServer
+from chats.models import ChatMessage, ChatSession, TokenUsage
+from core.benchmarks import benchmark_database
+
+QUESTION = 'هزینه بازسازی آشپزخانه چقدر است؟'
+
+
+class Command(BaseCommand):
+    help = 'Verify caching, coalescing, budgets and failure handling of the chat model gateway'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--delay', type=float, default=0.3, help='Stand-in reply latency in seconds')
+
+    def handle(self, *args, **options):
+        self.errors = []
+        with LocalModelServer(delay=options['delay']) as server, benchmark_database(), override_settings(
+            CHAT_GATEWAY={'API_URL': server.url, 'API_KEY': 'test-key', 'DAILY_TOKEN_BUDGET': 10000},
+        ):
+            gateway.reset_gateway()
+            try:
+                User = get_user_model()
+                user = User.objects.create_user(
+                    username='gateway@example.com', email='gateway@example.com', password='x', full_name='کاربر'
+                )
+                self.client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+                self.check_cache(server, user)
+                self.check_coalescing(server, user, options['concurrency'])
+                self.check_failure(server, user)
+                self.check_budget(server, user)
+            finally:
+                gateway.reset_gateway()
+        self.check_lru()
+
+        if self.errors:
+            raise CommandError('; '.join(self.errors))
+        self.stdout.write(self.style.SUCCESS('Chat gateway OK'))
+
+    def ask(self, session, text=QUESTION):
+        return self.client.post(f'/api/chats/{session.pk}/ask/', {'text': text}, content_type='application/json')
+
+    def expect(self, condition, message):
+        if not condition:
+            self.errors.append(message)
+
+    def check_cache(self, server, user):
+        first = self.ask(ChatSession.objects.create(user=user, title='اول'))
+        second = self.ask(ChatSession.objects.create(user=user, title='دوم'))
+        self.expect(first.status_code == 201, f'first ask returned {first.status_code}')
+        self.expect(second.status_code == 201, f'second ask returned {second.status_code}')
+        if first.status_code == second.status_code == 201:
+            self.expect(first.json()['source'] == 'upstream', f"first ask came from {first.json()['source']}")
+            self.expect(second.json()['source'] == 'cache', f"repeated ask came from {second.json()['source']}")
+            self.expect(first.json()['answer']['text'] == second.json()['answer']['text'], 'cached answer differs')
+        self.expect(len(server.requests) == 1, f'{len(server.requests)} upstream calls for a repeated question')
+        self.expect(server.requests[0]['key'] == 'test-key', 'API key was not sent upstream')
+        self.stdout.write(f'cache: 2 asks, {len(server.requests)} upstream call(s)')
+
+    def check_coalescing(self, server, user, concurrency):
+        before = len(server.requests)
+        sessions = [ChatSession.objects.create(user=user, title=f'همزمان {i}') for i in range(concurrency)]
+        barrier = threading.Barrier(concurrency)
+        results = [None] * concurrency
+
+        def worker(index):
+            barrier.wait()
+            results[index] = self.ask(sessions[index], 'قیمت کابینت هایگلاس؟')
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        calls = len(server.requests) - before
+        statuses = [response.status_code for response in results]
+        sources = sorted(response.json()['source'] for response in results if response.status_code == 201)
+        self.expect(statuses == [201] * concurrency, f'concurrent asks returned {statuses}')
+        self.expect(calls == 1, f'{calls} upstream calls for {concurrency} concurrent identical asks')
+        self.expect(sources.count('upstream') == 1, f'concurrent sources {sources}')
+        self.stdout.write(
+            f'coalescing: {concurrency} concurrent asks, {calls} upstream call(s) in {elapsed * 1000:.0f} ms '
+            f"({', '.join(sorted(set(sources)))})"
+        )
+
+    def check_failure(self, server, user):
+        session = ChatSession.objects.create(user=user, title='خطا')
+        server.fail_next(503)
+        response = self.ask(session, 'سوالی که پاسخ نمی‌گیرد')
+        stored = ChatMessage.objects.filter(session=session).count()
+        self.expect(response.status_code == 502, f'upstream failure returned {response.status_code}')
+        self.expect(stored == 0, f'{stored} message(s) stored for a failed ask')
+        retry = self.ask(session, 'سوالی که پاسخ نمی‌گیرد')
+        self.expect(retry.status_code == 201, f'retry after a failure returned {retry.status_code}')
+        self.stdout.write(f'failure: upstream 503 -> {response.status_code}, {stored} message(s) stored')
+
+    def check_budget(self, server, user):
+        usage = TokenUsage.objects.get(user=user)
+        self.expect(usage.tokens > 0 and usage.requests == 3, f'usage row {usage.tokens} tokens / {usage.requests} requests')
+        TokenUsage.objects.filter(pk=usage.pk).update(tokens=10000)
+        session = ChatSession.objects.create(user=user, title='سهمیه')
+        before = len(server.requests)
+        over = self.ask(session, 'سوال تازه پس از پایان سهمیه')
+        cached = self.ask(session, QUESTION)
+        self.expect(over.status_code == 429, f'exhausted budget returned {over.status_code}')
+        self.expect(len(server.requests) == before, 'upstream called over budget')
+        # An answer already in the cache costs nothing, so it is still served.
+        self.expect(cached.status_code == 201, f'cached ask over budget returned {cached.status_code}')
+
+        # Calls of other users in flight, finished by a stand-in leader after a moment.
+        gate = gateway.get_gateway()
+        other = get_user_model().objects.create_user(
+            username='budget@example.com', email='budget@example.com', password='x', full_name='کاربر دوم'
+        )
+
+        def in_flight(text, result=None, error=None):
+            contents = [gateway.user_content(text)]
+            key = gate.cache_key(gate.request_body(contents))
+            flight = gate._inflight[key] = gateway._Flight()
+
+            def finish():
+                with gate._lock:
+                    del gate._inflight[key]
+                flight.result, flight.error = result, error
+                flight.done.set()
+
+            threading.Timer(0.2, finish).start()
+            return contents
+
+        # Joining another user's call is not a way around the budget...
+        contents = in_flight('پاسخ مشترک', result='پاسخ')
+        try:
+            joined = gate.generate(user.pk, contents).source
+        except gateway.TokenBudgetExceeded:
+            joined = 'refused'
+        self.expect(joined == 'refused', f'over-budget user joining a call got {joined}')
+        # ...and a leader's own 429 is not passed on to a user with budget left.
+        contents = in_flight('سوال همزمان دو کاربر', error=gateway.TokenBudgetExceeded())
+        try:
+            shared = gate.generate(other.pk, contents).source
+        except gateway.TokenBudgetExceeded:
+            shared = 'refused'
+        self.expect(shared == 'upstream', f"waiter after the leader's 429 got {shared}")
+        self.stdout.write(
+            f'budget: new question {over.status_code}, cached question {cached.status_code}, '
+            f'joining over budget {joined}, after a leader\'s 429 {shared}'
+        )
+
+    def check_lru(self):
+        cache = gateway.LRUCache(maxsize=2, ttl=0.2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.expect(cache.get('b') is None and cache.get('a') == 1, 'LRU evicted the wrong entry')
+        time.sleep(0.25)
+        self.expect(cache.get('a') is None and len(cache) == 1, 'expired entry was served')
+        self.stdout.write('lru: eviction and expiry ok')
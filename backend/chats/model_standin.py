@@ -0,0 +1,107 @@
+"""
+Chats App - Local Model Stand-in
+
+A minimal in-process server speaking the Gemini ``generateContent`` REST
+API, for exercising ``chats.gateway`` without the real model::
+
+    with LocalModelServer(delay=0.2) as server:
+        # CHAT_GATEWAY={'API_URL': server.url, ...}
+        ...
+        server.requests, server.fail_next(503)
+
+Replies echo the last user text and report token usage of roughly one
+token per four characters.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATH = re.compile(r'^/v1beta/models/(?P<model>[^/:]+):generateContent$')
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+class ModelHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+    
+    def respond(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        server = self.server.owner
+        match = PATH.match(self.path)
+        if not match:
+            return self.respond(404, {'error': {'code': 404, 'message': 'Not found'}})
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with server.lock:
+            server.requests.append({'model': match['model'], 'body': body, 'key': self.headers.get('x-goog-api-key')})
+            failure, server.failure = server.failure, None
+        if server.delay:
+            time.sleep(server.delay)
+        if failure:
+            return self.respond(failure, {'error': {'code': failure, 'message': 'Stand-in failure'}})
+
+        prompt = ''.join(part.get('text', '') for part in body['contents'][-1]['parts'])
+        text = f'پاسخ آزمایشی به: {prompt}'
+        prompt_tokens = sum(
+            estimate_tokens(part.get('text', '')) for content in body['contents'] for part in content['parts']
+        )
+        self.respond(200, {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+            'usageMetadata': {
+                'promptTokenCount': prompt_tokens,
+                'candidatesTokenCount': estimate_tokens(text),
+                'totalTokenCount': prompt_tokens + estimate_tokens(text),
+            },
+        })
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalModelServer:
+    """Threaded model stand-in on ``127.0.0.1``; port 0 picks a free port."""
+    
+    def __init__(self, port=0, delay=0.0):
+        self.server = _Server(('127.0.0.1', port), ModelHandler)
+        self.server.owner = self
+        self.port = self.server.server_address[1]
+        self.url = f'http://127.0.0.1:{self.port}/v1beta'
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = []
+        self.failure = None
+        self.thread = None
+    
+    def fail_next(self, status):
+        """Answer the next request with HTTP ``status``."""
+        with self.lock:
+            self.failure = status
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
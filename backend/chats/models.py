@@ -22,6 +22,9 @@ class ChatSession(models.Model):
         verbose_name = 'گفتگو'
         verbose_name_plural = 'گفتگوها'
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='chat_user_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.title}"
@@ -44,6 +47,32 @@ class ChatMessage(models.Model):
         verbose_name = 'پیام'
         verbose_name_plural = 'پیام‌ها'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['session', '-created_at', '-id'], name='chatmsg_session_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.role}: {self.text[:50]}..."
+
+
+class TokenUsage(models.Model):
+    """Model tokens used by one user on one day (see ``chats.gateway``)"""
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='token_usage'
+    )
+    date = models.DateField(verbose_name='تاریخ')
+    tokens = models.PositiveIntegerField(default=0, verbose_name='توکن مصرفی')
+    requests = models.PositiveIntegerField(default=0, verbose_name='تعداد درخواست')
+    
+    class Meta:
+        verbose_name = 'مصرف توکن'
+        verbose_name_plural = 'مصرف توکن'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='token_usage_user_date'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.date}: {self.tokens}"
@@ -2,6 +2,9 @@
 Chats App - Serializers
 """
 
+import base64
+import binascii
+
 from rest_framework import serializers
 from .models import ChatSession, ChatMessage
 
@@ -13,9 +16,56 @@ class ChatMessageSerializer(serializers.ModelSerializer):
 
 
 class ChatSessionSerializer(serializers.ModelSerializer):
-    messages = ChatMessageSerializer(many=True, read_only=True)
+    """Session summary; history comes from the paginated messages endpoint.
+
+    ``message_count`` and ``last_message`` are read from annotations added
+    by ``ChatSessionViewSet.get_queryset``.
+    """
+    
+    message_count = serializers.SerializerMethodField()
+    last_message = serializers.SerializerMethodField()
     
     class Meta:
         model = ChatSession
-        fields = ['id', 'title', 'messages', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'message_count', 'last_message', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+    
+    def get_message_count(self, obj):
+        return getattr(obj, 'message_count', 0)
+    
+    def get_last_message(self, obj):
+        if getattr(obj, 'last_message_at', None) is None:
+            return None
+        return {
+            'role': obj.last_message_role,
+            'text': obj.last_message_text,
+            'created_at': serializers.DateTimeField().to_representation(obj.last_message_at),
+        }
+
+
+class ChatMessageChunkSerializer(serializers.Serializer):
+    """A piece of a model reply appended to an existing message"""
+    
+    message_id = serializers.IntegerField()
+    text = serializers.CharField(trim_whitespace=False)
+
+
+class ChatMediaSerializer(serializers.Serializer):
+    """An inline image sent along with a question (base64, as the browser reads it)"""
+    
+    mime_type = serializers.ChoiceField(choices=['image/jpeg', 'image/png', 'image/webp'])
+    data = serializers.CharField(max_length=8 * 1024 * 1024)
+    
+    def validate_data(self, value):
+        try:
+            base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError):
+            raise serializers.ValidationError('تصویر معتبر نیست')
+        return value
+
+
+class ChatAskSerializer(serializers.Serializer):
+    """A question for the model, answered through ``chats.gateway``"""
+    
+    text = serializers.CharField(max_length=4000)
+    media = ChatMediaSerializer(required=False)
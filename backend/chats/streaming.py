@@ -0,0 +1,167 @@
+"""
+Chats App - Streaming Replies
+
+``stream_reply`` runs the configured reply generator
+(``settings.CHAT_REPLY_GENERATOR``: a dotted path to
+``callable(session, user_message) -> iterable of text chunks``) and turns it
+into Server-Sent Events. The model message is created up front and its text
+is written back every ``FLUSH_EVERY`` chunks, so a dropped connection still
+leaves the partial reply in the history.
+
+``astream_reply`` is the same for the async view. The generator may also be
+an async generator function; a synchronous one is then advanced in a worker
+thread, so the event loop never waits on the upstream API. Either kind
+works in both modes.
+
+Such worker threads (``thread_sensitive=False``) are outside Django's
+request cycle, so work run there goes through ``closing_connections``,
+which closes the database connections it opened the way a request would.
+"""
+
+import functools
+import inspect
+import json
+import logging
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import APIException
+
+from .models import ChatMessage, ChatSession
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = 20
+STREAM_ERROR = 'پاسخ هوشمند کامل نشد. لطفا دوباره تلاش کنید.'
+
+
+def get_reply_generator():
+    path = getattr(settings, 'CHAT_REPLY_GENERATOR', None)
+    return import_string(path) if path else None
+
+
+def closing_connections(func):
+    """``func`` closing stale database connections before and after, for worker threads."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+def error_event(exc):
+    """An ``error`` event for the browser; only API errors carry their own (user-facing) text."""
+    if isinstance(exc, APIException):
+        return sse_event('error', {'detail': str(exc.detail)})
+    logger.exception('Streamed chat reply failed')
+    return sse_event('error', {'detail': STREAM_ERROR})
+
+
+def iterate_chunks(generator, session, user_message):
+    """The generator's chunks as a plain iterator, whatever its kind."""
+    chunks = generator(session, user_message)
+    if not hasattr(chunks, '__anext__'):
+        yield from chunks
+        return
+    next_chunk = async_to_sync(chunks.__anext__)
+    while True:
+        try:
+            yield next_chunk()
+        except StopAsyncIteration:
+            return
+
+
+async def aiterate_chunks(generator, session, user_message):
+    """The generator's chunks as an async iterator, whatever its kind."""
+    if inspect.isasyncgenfunction(generator):
+        async for chunk in generator(session, user_message):
+            yield chunk
+        return
+
+    def start():
+        return iter(generator(session, user_message))
+
+    done = object()
+    advance = sync_to_async(closing_connections(next), thread_sensitive=False)
+    chunks = await sync_to_async(closing_connections(start), thread_sensitive=False)()
+    while (chunk := await advance(chunks, done)) is not done:
+        yield chunk
+
+
+def append_text(message_id, text):
+    """Append a chunk to a stored message with a single UPDATE."""
+    return ChatMessage.objects.filter(pk=message_id).update(text=Concat(F('text'), Value(text)))
+
+
+async def aappend_text(message_id, text):
+    return await ChatMessage.objects.filter(pk=message_id).aupdate(text=Concat(F('text'), Value(text)))
+
+
+def touch_session(session_id):
+    ChatSession.objects.filter(pk=session_id).update(updated_at=timezone.now())
+
+
+async def atouch_session(session_id):
+    await ChatSession.objects.filter(pk=session_id).aupdate(updated_at=timezone.now())
+
+
+def stream_reply(generator, session, user_message):
+    reply = ChatMessage.objects.create(session=session, role='model', text='')
+    yield sse_event('start', {'user_message_id': user_message.pk, 'message_id': reply.pk})
+
+    pending = []
+    try:
+        for chunk in iterate_chunks(generator, session, user_message):
+            if not chunk:
+                continue
+            pending.append(chunk)
+            yield sse_event('chunk', {'text': chunk})
+            if len(pending) >= FLUSH_EVERY:
+                append_text(reply.pk, ''.join(pending))
+                pending = []
+    except Exception as exc:
+        yield error_event(exc)
+    finally:
+        if pending:
+            append_text(reply.pk, ''.join(pending))
+        touch_session(session.pk)
+
+    reply.refresh_from_db(fields=['text'])
+    yield sse_event('done', {'message_id': reply.pk, 'text': reply.text})
+
+
+async def astream_reply(generator, session, user_message):
+    reply = await ChatMessage.objects.acreate(session=session, role='model', text='')
+    yield sse_event('start', {'user_message_id': user_message.pk, 'message_id': reply.pk})
+
+    pending = []
+    try:
+        async for chunk in aiterate_chunks(generator, session, user_message):
+            if not chunk:
+                continue
+            pending.append(chunk)
+            yield sse_event('chunk', {'text': chunk})
+            if len(pending) >= FLUSH_EVERY:
+                await aappend_text(reply.pk, ''.join(pending))
+                pending = []
+    except Exception as exc:
+        yield error_event(exc)
+    finally:
+        if pending:
+            await aappend_text(reply.pk, ''.join(pending))
+        await atouch_session(session.pk)
+
+    await reply.arefresh_from_db(fields=['text'])
+    yield sse_event('done', {'message_id': reply.pk, 'text': reply.text})
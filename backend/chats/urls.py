@@ -1,6 +1,10 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import ChatSessionViewSet
+from .views import (
+    AsyncChatAddMessageView, AsyncChatAskView, AsyncChatMessagesView, AsyncChatSessionListView,
+    ChatSessionViewSet
+)
 
 router = DefaultRouter()
 router.register('', ChatSessionViewSet, basename='chats')
@@ -8,3 +12,12 @@ router.register('', ChatSessionViewSet, basename='chats')
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Same paths and names as the router's, matched first.
+    urlpatterns = [
+        path('', AsyncChatSessionListView.as_view(), name='chats-list'),
+        re_path(r'^(?P<pk>[^/.]+)/messages/$', AsyncChatMessagesView.as_view(), name='chats-messages'),
+        re_path(r'^(?P<pk>[^/.]+)/add_message/$', AsyncChatAddMessageView.as_view(), name='chats-add-message'),
+        re_path(r'^(?P<pk>[^/.]+)/ask/$', AsyncChatAskView.as_view(), name='chats-ask'),
+    ] + urlpatterns
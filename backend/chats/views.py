@@ -2,11 +2,37 @@
 Chats App - Views
 """
 
+from asgiref.sync import sync_to_async
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Substr
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from drf_yasg.utils import swagger_auto_schema
+from core.async_views import AsyncAPIView
+from core.pagination import KeysetPagination, PaginatedActionSchema
 from .models import ChatSession, ChatMessage
-from .serializers import ChatSessionSerializer, ChatMessageSerializer
+from .gateway import ask
+from .serializers import (
+    ChatAskSerializer, ChatMessageChunkSerializer, ChatMessageSerializer, ChatSessionSerializer
+)
+from .streaming import (
+    append_text, astream_reply, atouch_session, closing_connections, get_reply_generator, stream_reply,
+    touch_session,
+)
+
+LAST_MESSAGE_PREVIEW = 200
+
+
+def ask_response(session, text, media=None):
+    question, answer, reply = ask(session, text, media)
+    return {
+        'question': ChatMessageSerializer(question).data,
+        'answer': ChatMessageSerializer(answer).data,
+        'source': reply.source,
+        'tokens': reply.tokens,
+    }
 
 
 class ChatSessionViewSet(viewsets.ModelViewSet):
@@ -14,20 +40,173 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
     
     serializer_class = ChatSessionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    implicit_filters = [['user']]
     
     def get_queryset(self):
-        return ChatSession.objects.filter(user=self.request.user)
+        queryset = ChatSession.objects.filter(user=self.request.user)
+        if self.action in ['list', 'retrieve']:
+            last = ChatMessage.objects.filter(session=OuterRef('pk')).order_by('-created_at', '-id')
+            queryset = queryset.annotate(
+                message_count=Count('messages'),
+                last_message_role=Subquery(last.values('role')[:1]),
+                last_message_text=Subquery(last.annotate(
+                    preview=Substr('text', 1, LAST_MESSAGE_PREVIEW)
+                ).values('preview')[:1]),
+                last_message_at=Subquery(last.values('created_at')[:1]),
+            ).order_by('-updated_at')  # Meta.ordering is dropped by the GROUP BY
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'messages':
+            return ChatMessageSerializer
+        return ChatSessionSerializer
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    @swagger_auto_schema(auto_schema=PaginatedActionSchema)
+    @action(detail=True, methods=['get'], pagination_class=KeysetPagination)
+    def messages(self, request, pk=None):
+        """Message history, newest first, cursor paginated"""
+        session = self.get_object()
+        queryset = session.messages.order_by('-created_at', '-id')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
     @action(detail=True, methods=['post'])
     def add_message(self, request, pk=None):
-        """Add a message to a session"""
+        """Add a message to a session.
+        
+        With ``?stream=1`` the reply is generated server side and sent back
+        as Server-Sent Events while it is being stored.
+        """
         session = self.get_object()
         serializer = ChatMessageSerializer(data=request.data)
         
-        if serializer.is_valid():
-            serializer.save(session=session)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.query_params.get('stream'):
+            generator = get_reply_generator()
+            if generator is None:
+                return Response(
+                    {'error': 'پاسخ‌دهی هم‌زمان فعال نیست'},
+                    status=status.HTTP_501_NOT_IMPLEMENTED
+                )
+            message = serializer.save(session=session)
+            response = StreamingHttpResponse(
+                stream_reply(generator, session, message),
+                content_type='text/event-stream'
+            )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        
+        serializer.save(session=session)
+        touch_session(session.pk)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def ask(self, request, pk=None):
+        """Ask the model through the server-side gateway.
+        
+        The question and the reply are stored together, in one transaction,
+        once the reply has arrived.
+        """
+        session = self.get_object()
+        serializer = ChatAskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            ask_response(session, **serializer.validated_data),
+            status=status.HTTP_201_CREATED
+        )
+    
+    @action(detail=True, methods=['post'])
+    def append_chunk(self, request, pk=None):
+        """Append a streamed chunk to an existing model message"""
+        session = self.get_object()
+        serializer = ChatMessageChunkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        message_id = serializer.validated_data['message_id']
+        if not session.messages.filter(pk=message_id, role='model').exists():
+            return Response({'error': 'پیام یافت نشد'}, status=status.HTTP_404_NOT_FOUND)
+        append_text(message_id, serializer.validated_data['text'])
+        touch_session(session.pk)
+        return Response({'message_id': message_id}, status=status.HTTP_200_OK)
+
+
+class AsyncChatSessionListView(AsyncAPIView):
+    """Session list served natively under ASGI; creation stays on the viewset"""
+    
+    view_class = ChatSessionViewSet
+    actions = {'get': 'list', 'post': 'create'}
+
+
+class AsyncChatMessagesView(AsyncAPIView):
+    """``ChatSessionViewSet.messages`` served natively under ASGI"""
+    
+    view_class = ChatSessionViewSet
+    actions = {'get': 'messages'}
+    
+    async def messages(self, request, pk=None):
+        session = await self.get_object()
+        queryset = session.messages.order_by('-created_at', '-id')
+        page = await self.paginate_queryset(queryset)
+        serializer = ChatMessageSerializer(page, many=True)
+        return self.api.get_paginated_response(serializer.data)
+
+
+class AsyncChatAddMessageView(AsyncAPIView):
+    """``ChatSessionViewSet.add_message`` served natively under ASGI.
+    
+    While a streamed reply is generated the request holds no thread, only
+    the event loop task.
+    """
+    
+    view_class = ChatSessionViewSet
+    actions = {'post': 'add_message'}
+    
+    async def add_message(self, request, pk=None):
+        session = await self.get_object()
+        serializer = ChatMessageSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.query_params.get('stream'):
+            generator = get_reply_generator()
+            if generator is None:
+                return Response(
+                    {'error': 'پاسخ‌دهی هم‌زمان فعال نیست'},
+                    status=status.HTTP_501_NOT_IMPLEMENTED
+                )
+            message = await ChatMessage.objects.acreate(session=session, **serializer.validated_data)
+            response = StreamingHttpResponse(
+                astream_reply(generator, session, message),
+                content_type='text/event-stream'
+            )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        
+        message = await ChatMessage.objects.acreate(session=session, **serializer.validated_data)
+        await atouch_session(session.pk)
+        return Response(ChatMessageSerializer(message).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncChatAskView(AsyncAPIView):
+    """``ChatSessionViewSet.ask`` under ASGI: the model call waits in a worker thread"""
+    
+    view_class = ChatSessionViewSet
+    actions = {'post': 'ask'}
+    
+    async def ask(self, request, pk=None):
+        session = await self.get_object()
+        serializer = ChatAskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = await sync_to_async(closing_connections(ask_response), thread_sensitive=False)(
+            session, **serializer.validated_data
+        )
+        return Response(data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'هسته'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import images, response_cache, search
+
+        search.connect_signals()
+        images.connect_signals()
+        response_cache.connect_signals()
+        post_migrate.connect(search.install, dispatch_uid='core-search-install')
@@ -0,0 +1,173 @@
+"""
+Core App - Async API Views
+
+DRF views are synchronous, so under ASGI each of them runs in a thread
+that is held while the view waits on the database, the cache or an
+upstream API. ``AsyncAPIView`` serves chosen actions of an existing DRF
+view as native coroutines instead::
+
+    class PortfolioListView(AsyncAPIView):
+        view_class = PortfolioViewSet
+        actions = {'get': 'list', 'post': 'create'}
+
+        async def list(self, request):
+            ...
+
+The DRF view still provides everything that does no I/O — queryset,
+serializers, filter backends, pagination, permissions, exception handling
+and rendering — through an instance available as ``self.api``. Actions the
+async view does not implement (``create`` above, ``OPTIONS``) are handed to
+the regular DRF view, so a route keeps its full behaviour.
+
+Django 4.2's async ORM still runs each query in a worker thread (one per
+request, see ``asgiref.sync.ThreadSensitiveContext``); the difference is
+that the request only holds it for the query itself. These views are
+routed only when ``settings.ASYNC_VIEWS`` is set, which ``hermes_backend.asgi``
+does by default.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page
+from django.http import Http404
+from django.views import View
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSetMixin
+
+from .pagination import OptInCursorPagination
+from .response_cache import CachedResponseMixin
+
+
+class AsyncAPIView(View):
+    """Serve some actions of ``view_class`` asynchronously; see the module docstring."""
+
+    view_class = None   # the DRF view (or viewset) these handlers stand in for
+    actions = {}        # {method: action} for every method the route accepts
+
+    # Handlers are looked up by action name in ``dispatch``, not by method.
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True  # token authenticated, like the DRF views
+        return view
+
+    @classmethod
+    def get_initkwargs(cls):
+        """Overrides declared with ``@action(...)``, as the router would pass them."""
+        initkwargs = {}
+        for action in cls.actions.values():
+            initkwargs.update(getattr(getattr(cls.view_class, action, None), 'kwargs', {}))
+        return initkwargs
+
+    @classmethod
+    def get_sync_view(cls):
+        if '_sync_view' not in cls.__dict__:
+            if issubclass(cls.view_class, ViewSetMixin):
+                cls._sync_view = cls.view_class.as_view(cls.actions, **cls.get_initkwargs())
+            else:
+                cls._sync_view = cls.view_class.as_view()
+        return cls._sync_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        action = self.actions.get(method)
+        handler = getattr(self, action, None) if action else None
+        if handler is None or method == 'options':
+            return await sync_to_async(self.get_sync_view())(request, *args, **kwargs)
+
+        # The same steps as ``APIView.dispatch``, with I/O awaited.
+        api = self.view_class(action_map=self.actions, format_kwarg=None, **self.get_initkwargs())
+        if isinstance(api, ViewSetMixin):
+            for name, viewset_action in self.actions.items():
+                setattr(api, name, getattr(api, viewset_action))  # for the Allow header
+        api.args, api.kwargs = args, kwargs
+        request = api.initialize_request(request, *args, **kwargs)
+        api.request = request
+        api.headers = api.default_response_headers
+        self.api = api
+
+        if isinstance(api, CachedResponseMixin):
+            key, cached = await sync_to_async(api.get_cached_response)(request, *args, **kwargs)
+            if cached is not None:
+                return cached
+        else:
+            key = None
+
+        try:
+            # Authentication and throttling may query the cache and the database.
+            await sync_to_async(api.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = api.handle_exception(exc)
+
+        # Rendering happens in Django's handler (in the request's thread).
+        response = api.finalize_response(request, response, *args, **kwargs)
+        if key is not None:
+            api.cache_response(key, response)
+        return response
+
+    async def filter_queryset(self, queryset):
+        # Filter backends may query (full-text search), so they run in the thread.
+        return await sync_to_async(self.api.filter_queryset)(queryset)
+
+    async def get_object(self):
+        """``GenericAPIView.get_object`` with the lookup awaited."""
+        api = self.api
+        queryset = await self.filter_queryset(api.get_queryset())
+        lookup_url_kwarg = api.lookup_url_kwarg or api.lookup_field
+        try:
+            obj = await queryset.aget(**{api.lookup_field: api.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        api.check_object_permissions(api.request, obj)
+        return obj
+
+    async def paginate_queryset(self, queryset):
+        """Page-number pages are counted and fetched with the async ORM.
+
+        Cursor pages keep DRF's implementation, run in the request's thread.
+        """
+        paginator = self.api.paginator
+        if paginator is None:
+            return None
+        request = self.api.request
+        is_cursor = isinstance(paginator, OptInCursorPagination) and paginator.use_cursor(request)
+        if not isinstance(paginator, PageNumberPagination) or is_cursor:
+            return await sync_to_async(paginator.paginate_queryset)(queryset, request, self.api)
+
+        page_size = paginator.get_page_size(request)
+        if not page_size:
+            return None
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(request, django_paginator)
+        try:
+            number = django_paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        bottom = (number - 1) * page_size
+        objects = [obj async for obj in queryset[bottom:bottom + page_size]]
+
+        paginator.page = Page(objects, number, django_paginator)
+        paginator.request = request
+        if django_paginator.num_pages > 1 and paginator.template is not None:
+            paginator.display_page_controls = True
+        return objects
+
+    async def list(self, request, *args, **kwargs):
+        """``ListModelMixin.list``"""
+        api = self.api
+        queryset = await self.filter_queryset(api.get_queryset())
+        page = await self.paginate_queryset(queryset)
+        if page is not None:
+            return api.get_paginated_response(api.get_serializer(page, many=True).data)
+        return Response(api.get_serializer([obj async for obj in queryset], many=True).data)
+
+    async def retrieve(self, request, *args, **kwargs):
+        """``RetrieveModelMixin.retrieve``"""
+        instance = await self.get_object()
+        return Response(self.api.get_serializer(instance).data)
@@ -0,0 +1,166 @@
+"""
+Core App - Benchmark Helpers
+
+Shared by the ``bench_*`` management commands. Benchmarks run against a
+throwaway database, never against the configured one.
+"""
+
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from . import view_counter
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """Create a scratch database (file-backed on SQLite) and drop it afterwards."""
+    db = connections[DEFAULT_DB_ALIAS]
+    test_settings = db.settings_dict.setdefault('TEST', {})
+    tmpdir = None
+    if db.vendor == 'sqlite' and not test_settings.get('NAME'):
+        # A file database lets worker threads share data the way real
+        # gunicorn workers do; the in-memory test database does not.
+        tmpdir = tempfile.mkdtemp(prefix='hermes-bench-')
+        test_settings['NAME'] = os.path.join(tmpdir, 'bench.sqlite3')
+    setup_test_environment()
+    old_name = db.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield db
+        # Buffered view counts belong to the scratch rows; write them there
+        # rather than at exit, when the database is gone.
+        view_counter.flush()
+    finally:
+        db.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+        if tmpdir:
+            test_settings.pop('NAME', None)
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def run_concurrent(request_fn, total, concurrency=1):
+    """Call ``request_fn(i)`` ``total`` times from ``concurrency`` threads.
+
+    Returns a summary dict (see ``summarize``).
+    """
+
+    def worker(indexes):
+        latencies = []
+        try:
+            for i in indexes:
+                start = time.perf_counter()
+                request_fn(i)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+        return latencies
+
+    chunks = [range(n, total, concurrency) for n in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, chunks))
+    elapsed = time.perf_counter() - start
+    return summarize([latency for chunk in results for latency in chunk], elapsed)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def format_summary(name, summary):
+    return (
+        f"{name:<28} {summary['requests']:>7} req  {summary['throughput']:>9.1f} req/s  "
+        f"p50 {summary['p50_ms']:>7.2f} ms  p95 {summary['p95_ms']:>7.2f} ms  "
+        f"p99 {summary['p99_ms']:>7.2f} ms"
+    )
+
+
+# The API benchmark suite (``manage.py bench_api``): name, client
+# ('anon', 'user' or 'staff'), path (formatted with ids of seeded rows) and
+# query strings cycled across requests.
+PAGES = [{'page': page} for page in range(1, 6)]
+API_SCENARIOS = [
+    ('portfolio-list', 'anon', '/api/portfolio/', PAGES),
+    ('portfolio-detail', 'anon', '/api/portfolio/{project}/', [{}]),
+    ('portfolio-featured', 'anon', '/api/portfolio/featured/', [{}]),
+    ('portfolio-search', 'anon', '/api/portfolio/', [{'search': q} for q in ('پروژه', 'بازسازی', 'تهران')]),
+    ('blog-list', 'anon', '/api/blog/', [{}]),
+    ('reviews-list', 'anon', '/api/reviews/', PAGES),
+    ('bookings-availability', 'anon', '/api/bookings/availability/', [{}]),
+    ('orders-list (owner)', 'user', '/api/orders/', [{}]),
+    ('orders-detail', 'user', '/api/orders/{order}/', [{}]),
+    ('orders-list (staff)', 'staff', '/api/orders/', PAGES),
+    ('invoices-list (staff)', 'staff', '/api/invoices/', PAGES),
+    ('chats-list', 'user', '/api/chats/', [{}]),
+    ('chat-messages', 'user', '/api/chats/{session}/messages/', [{}]),
+    ('loyalty', 'user', '/api/loyalty/', [{}]),
+    ('users-me', 'user', '/api/users/me/', [{}]),
+]
+
+
+def measure_endpoint(client, path, params, total, warmup=5):
+    """Issue ``total`` sequential GETs; returns ``summarize()`` plus queries per request."""
+    queries = []
+
+    def count(execute, sql, query_params, many, context):
+        queries.append(sql)
+        return execute(sql, query_params, many, context)
+
+    for i in range(warmup):
+        client.get(path, params[i % len(params)])
+    latencies = []
+    statuses = set()
+    started = time.perf_counter()
+    with connection.execute_wrapper(count):
+        for i in range(total):
+            start = time.perf_counter()
+            response = client.get(path, params[i % len(params)])
+            latencies.append(time.perf_counter() - start)
+            statuses.add(response.status_code)
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary['queries'] = len(queries) / total if total else 0.0
+    summary['statuses'] = sorted(statuses)
+    return summary
+
+
+def compare_to_baseline(results, baseline, tolerance=0.5, floor_ms=1.0):
+    """Regressions of ``results`` against a stored run, as readable strings.
+
+    More queries per request is always a regression. Latency regresses
+    when p95 grows by more than ``tolerance`` (a fraction) and by more than
+    ``floor_ms``, so sub-millisecond noise never fails a build.
+    """
+    failures = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries'] + 0.01:
+            failures.append(f"{name}: {current['queries']:.2f} queries/req (baseline {previous['queries']:.2f})")
+        limit = previous['p95_ms'] * (1 + tolerance)
+        if current['p95_ms'] > limit and current['p95_ms'] - previous['p95_ms'] > floor_ms:
+            failures.append(f"{name}: p95 {current['p95_ms']:.2f} ms (baseline {previous['p95_ms']:.2f} ms)")
+    return failures
@@ -0,0 +1,24 @@
+"""
+Core App - Cache Lifetimes
+
+Entries invalidated on change (site settings, cached responses, the users
+behind JWTs) only stay correct across gunicorn workers on a shared cache
+(Redis): the invalidation of one worker is what the others read. With a
+process-local backend (the default LocMem cache) it reaches the worker
+that made the change only, so such entries get a lifetime of a few
+seconds instead, which bounds how long any other worker serves stale data.
+"""
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+LOCAL_TIMEOUT = 5
+
+
+def is_process_local(cache):
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def invalidated_timeout(cache, timeout, local_timeout=LOCAL_TIMEOUT):
+    """``timeout`` on a shared ``cache``, ``local_timeout`` on one that lives in this process."""
+    return local_timeout if is_process_local(cache) else timeout
@@ -0,0 +1,38 @@
+"""
+Core App - Serializer Fields
+"""
+
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+
+class ResponsiveImageField(serializers.Field):
+    """Renders a ``<field>_variants`` manifest (see ``core.images``).
+    
+    Output is ``None`` until the derivatives exist, then::
+    
+        {"width": 4000, "height": 3000,
+         "srcset": {"avif": "…/320.avif 320w, …/640.avif 640w, …",
+                    "webp": "…/320.webp 320w, …"}}
+    """
+    
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def url(self, path):
+        url = default_storage.url(path)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+    
+    def to_representation(self, manifest):
+        if not manifest or not manifest.get('formats'):
+            return None
+        return {
+            'width': manifest['width'],
+            'height': manifest['height'],
+            'srcset': {
+                fmt: ', '.join(f'{self.url(path)} {width}w' for width, path in sizes)
+                for fmt, sizes in manifest['formats'].items()
+            },
+        }
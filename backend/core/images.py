@@ -0,0 +1,198 @@
+"""
+Core App - Responsive Image Derivatives
+
+Every image field listed in ``settings.IMAGE_DERIVATIVES['FIELDS']`` has a
+sibling JSONField ``<field>_variants`` holding a manifest of resized WebP
+and AVIF copies. After an upload is committed a Celery task renders them;
+serializers expose them through ``core.fields.ResponsiveImageField`` without
+any extra query.
+
+Derivatives are stored under the SHA-256 of the source bytes and the
+pipeline settings (``derivatives/ab/abcdef…/640.webp``), so identical
+uploads are rendered once and a settings change re-renders everything.
+``manifest.json`` is written last and marks a complete set.
+"""
+
+import hashlib
+import io
+import json
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps, features
+
+from .response_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendering changes so existing derivatives are rebuilt.
+PIPELINE_VERSION = 1
+
+DEFAULTS = {
+    'FIELDS': [],                       # 'app_label.Model.field'
+    'WIDTHS': [320, 640, 1024, 1600],
+    'FORMATS': ['avif', 'webp'],
+    'QUALITY': {'avif': 55, 'webp': 80},
+}
+
+PIL_FORMATS = {'avif': 'AVIF', 'webp': 'WEBP'}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'IMAGE_DERIVATIVES', {}))
+    # Pillow builds without libavif simply skip that format.
+    config['FORMATS'] = [fmt for fmt in config['FORMATS'] if features.check(fmt)]
+    return config
+
+
+def variants_field(field):
+    return f'{field}_variants'
+
+
+def configured_fields():
+    """``{model: [field, ...]}`` for every configured image field."""
+    fields = {}
+    for path in get_config()['FIELDS']:
+        label, field = path.rsplit('.', 1)
+        fields.setdefault(apps.get_model(label), []).append(field)
+    return fields
+
+
+def render_options(config=None):
+    """The parts of the config that affect output, as plain data."""
+    config = config or get_config()
+    return {
+        'widths': sorted(config['WIDTHS']),
+        'formats': list(config['FORMATS']),
+        'quality': {fmt: config['QUALITY'].get(fmt, 80) for fmt in config['FORMATS']},
+    }
+
+
+def source_digest(data, options):
+    header = json.dumps([PIPELINE_VERSION, options], sort_keys=True).encode('utf-8')
+    return hashlib.sha256(header + data).hexdigest()
+
+
+def derivative_path(digest, width, fmt):
+    return f'derivatives/{digest[:2]}/{digest}/{width}.{fmt}'
+
+
+def manifest_path(digest):
+    return f'derivatives/{digest[:2]}/{digest}/manifest.json'
+
+
+def target_widths(width, widths):
+    """Configured widths below the original, plus the original capped at the largest."""
+    return sorted({w for w in widths if w < width} | {min(width, widths[-1])})
+
+
+def render(data, options):
+    """Render every derivative of one source image.
+
+    Pure function (bytes in, bytes out) so it can run in a process pool.
+    Returns ``(width, height, {(width, fmt): bytes})``.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+        width, height = image.size
+        outputs = {}
+        for target in reversed(target_widths(width, options['widths'])):
+            size = (target, max(1, round(height * target / width)))
+            resized = image if size == image.size else image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+            for fmt in options['formats']:
+                buffer = io.BytesIO()
+                resized.save(buffer, PIL_FORMATS[fmt], quality=options['quality'][fmt])
+                outputs[(target, fmt)] = buffer.getvalue()
+            # Downscale from the previous size: much cheaper than from the original.
+            image = resized
+    return width, height, outputs
+
+
+def render_source(args):
+    """Process-pool entry point: ``(data, options)`` -> ``(digest, width, height, outputs)``."""
+    data, options = args
+    return (source_digest(data, options), *render(data, options))
+
+
+def build_manifest(digest, width, height, outputs):
+    formats = {}
+    for (target, fmt) in sorted(outputs):
+        formats.setdefault(fmt, []).append([target, derivative_path(digest, target, fmt)])
+    return {'digest': digest, 'width': width, 'height': height, 'formats': formats}
+
+
+def load_manifest(digest):
+    path = manifest_path(digest)
+    if not default_storage.exists(path):
+        return None
+    with default_storage.open(path) as handle:
+        return json.loads(handle.read())
+
+
+def store(digest, width, height, outputs):
+    """Save rendered derivatives and their manifest; returns the manifest."""
+    for (target, fmt), data in outputs.items():
+        path = derivative_path(digest, target, fmt)
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(data))
+    manifest = build_manifest(digest, width, height, outputs)
+    if not default_storage.exists(manifest_path(digest)):
+        default_storage.save(manifest_path(digest), ContentFile(json.dumps(manifest).encode('utf-8')))
+    return manifest
+
+
+def derive(name, options=None):
+    """Manifest for the stored image ``name``, rendering only if needed."""
+    options = options or render_options()
+    with default_storage.open(name) as handle:
+        data = handle.read()
+    digest = source_digest(data, options)
+    manifest = load_manifest(digest) or store(digest, *render(data, options))
+    return dict(manifest, source=name)
+
+
+def save_manifest(model, pk, field, name, manifest):
+    """Attach ``manifest`` unless the image was replaced in the meantime."""
+    updated = model._default_manager.filter(pk=pk, **{field: name}).update(
+        **{variants_field(field): manifest}
+    )
+    if updated:
+        invalidate(model)
+    return updated
+
+
+def is_current(instance, field):
+    name = getattr(instance, field).name or None
+    return (getattr(instance, variants_field(field)) or {}).get('source') == name
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .tasks import generate_image_derivatives
+
+    for field in configured_fields().get(sender, []):
+        if is_current(instance, field):
+            continue
+        # Never serve the previous image's srcset next to the new image,
+        # including when rendering the new one fails.
+        if getattr(instance, variants_field(field)):
+            setattr(instance, variants_field(field), {})
+            sender._default_manager.filter(pk=instance.pk).update(**{variants_field(field): {}})
+        if getattr(instance, field).name:
+            transaction.on_commit(
+                lambda field=field: generate_image_derivatives.delay(sender._meta.label, instance.pk, field)
+            )
+
+
+def connect_signals():
+    for model in configured_fields():
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'image-derivatives-{model._meta.label}')
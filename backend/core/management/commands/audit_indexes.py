@@ -0,0 +1,169 @@
+"""
+Report API query patterns that have no index behind them.
+
+For every DRF view reachable from the URLconf, the command derives the
+query shapes it can produce:
+
+* equality filters baked into the view's queryset (``filter(is_published=True)``),
+  or, for views that filter in ``get_queryset()``, the column sets listed in
+  ``implicit_filters`` (``[[], ['user']]`` = unfiltered for staff, by user otherwise),
+* each ``filterset_fields`` entry on top of those,
+* each ``ordering_fields`` entry and the model's default ordering,
+
+and checks them against the indexes that actually exist in the database.
+Patterns that are not fully covered are printed with their ``EXPLAIN``.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import ForeignKey
+from django.db.models.expressions import Col
+from django.db.models.lookups import Exact
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def iter_views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is not None:
+                yield view_class
+
+
+def view_model(view_class):
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is not None:
+        return queryset.model
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    meta = getattr(serializer_class, 'Meta', None)
+    return getattr(meta, 'model', None)
+
+
+def queryset_filters(view_class):
+    """Columns compared with ``=`` in the view's class-level queryset."""
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is None:
+        return []
+    columns = []
+    for child in queryset.query.where.children:
+        if isinstance(child, Exact) and isinstance(child.lhs, Col):
+            columns.append(child.lhs.target.column)
+    return columns
+
+
+def column_for(model, name):
+    name = name.lstrip('-')
+    if '__' in name:
+        return None  # spans a join, not indexable on this table
+    field = model._meta.get_field(name)
+    return field.column
+
+
+class Command(BaseCommand):
+    help = 'List filter/ordering patterns exposed by the API that no index covers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Also show covered patterns')
+        parser.add_argument('--no-explain', action='store_true', help='Skip EXPLAIN output')
+
+    def handle(self, *args, **options):
+        uncovered = 0
+        seen = set()
+        for view_class in iter_views(get_resolver().url_patterns):
+            model = view_model(view_class)
+            if view_class in seen or model is None:
+                continue
+            seen.add(view_class)
+            indexes = self.table_indexes(model)
+            for filters, order in self.patterns(view_class, model):
+                status, index = self.coverage(filters, order, indexes)
+                if status == 'covered' and not options['all']:
+                    continue
+                if status != 'covered':
+                    uncovered += 1
+                label = ', '.join(filters) or '-'
+                style = self.style.SUCCESS if status == 'covered' else (
+                    self.style.WARNING if status == 'partial' else self.style.ERROR
+                )
+                self.stdout.write(style(
+                    f'{status:<8} {view_class.__name__:<24} {model._meta.db_table:<28} '
+                    f'filter [{label}] order [{order or "-"}]' + (f'  ({index})' if index else '')
+                ))
+                if status != 'covered' and not options['no_explain']:
+                    self.stdout.write(self.explain(model, filters, order))
+        summary = f'{uncovered} pattern(s) without a full index'
+        self.stdout.write(self.style.ERROR(summary) if uncovered else self.style.SUCCESS(summary))
+
+    def patterns(self, view_class, model):
+        fields = {f.column: f for f in model._meta.concrete_fields}
+        implicit = getattr(view_class, 'implicit_filters', None)
+        if implicit is not None:
+            base_sets = [[column_for(model, name) for name in names] for names in implicit]
+        else:
+            base_sets = [queryset_filters(view_class)]
+        default_order = column_for(model, model._meta.ordering[0]) if model._meta.ordering else None
+
+        patterns = []
+        for base in base_sets:
+            patterns.append((tuple(base), default_order))
+            for name in getattr(view_class, 'filterset_fields', None) or []:
+                column = column_for(model, name)
+                if column and column in fields and column not in base:
+                    patterns.append((tuple(base) + (column,), default_order))
+            for name in getattr(view_class, 'ordering_fields', None) or []:
+                column = column_for(model, name)
+                if column and column in fields:
+                    patterns.append((tuple(base), column))
+        # Deduplicate, keep order; a pattern with nothing to filter or sort is trivially fine.
+        return [p for p in dict.fromkeys(patterns) if p[0] or p[1]]
+
+    def table_indexes(self, model):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        return {
+            name: (info['columns'], info['unique'] or info['primary_key'])
+            for name, info in constraints.items()
+            if (info['index'] or info['unique'] or info['primary_key']) and info['columns']
+        }
+
+    def coverage(self, filters, order, indexes):
+        """'covered', 'partial' (filters indexed, sort is not) or 'missing'."""
+        best = ('missing', None)
+        for name, (columns, unique) in indexes.items():
+            if filters and set(columns[:len(filters)]) != set(filters):
+                continue
+            if unique and filters and len(columns) == len(filters):
+                return 'covered', name  # at most one row, nothing to sort
+            rest = columns[len(filters):]
+            if order is None or (rest and rest[0] == order):
+                return 'covered', name
+            if filters:
+                best = ('partial', name)
+        return best
+
+    def explain(self, model, filters, order):
+        lookups = {}
+        for column in filters:
+            field = next(f for f in model._meta.concrete_fields if f.column == column)
+            lookups[field.attname] = self.sample_value(model, field)
+        queryset = model._default_manager.filter(**lookups)
+        if order:
+            field = next(f for f in model._meta.concrete_fields if f.column == order)
+            queryset = queryset.order_by(f'-{field.attname}')
+        try:
+            plan = queryset.explain()
+        except Exception as exc:  # EXPLAIN is best effort on exotic backends
+            plan = f'EXPLAIN failed: {exc}'
+        return '\n'.join(f'    {line}' for line in plan.splitlines()) + '\n'
+
+    def sample_value(self, model, field):
+        value = model._default_manager.values_list(field.attname, flat=True).first()
+        if value is not None:
+            return value
+        if isinstance(field, ForeignKey) or field.get_internal_type().endswith('IntegerField'):
+            return 1
+        if field.get_internal_type() == 'BooleanField':
+            return True
+        return ''
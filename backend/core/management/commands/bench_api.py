@@ -0,0 +1,131 @@
+"""
+Reproducible API benchmark suite.
+
+    python manage.py bench_api                          # production volumes
+    python manage.py bench_api --scale 0.01 --baseline core/bench_baseline.json
+    python manage.py bench_api --scale 0.01 --save-baseline core/bench_baseline.json
+
+Seeds a scratch database with ``core.seeding.VOLUMES`` times ``--scale``
+(100k orders, 1M chat messages, 10k portfolio items with galleries and
+50k reviews at scale 1) using chunked ``bulk_create``, then drives every
+scenario in ``core.benchmarks.API_SCENARIOS`` in-process through the test
+client and reports p50/p95/p99 latency, throughput and queries per request.
+
+With ``--baseline`` the run fails (exit status 1) on any scenario that now
+runs more queries per request, or whose p95 grew beyond ``--tolerance``.
+The anonymous response cache is bypassed unless ``--response-cache`` is
+given, so cached endpoints are measured on their database path.
+"""
+
+import json
+import platform
+import sys
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from chats.models import ChatSession
+from core.benchmarks import API_SCENARIOS, benchmark_database, compare_to_baseline, measure_endpoint
+from core.seeding import seed_dataset
+from orders.models import ServiceOrder
+from portfolio.models import PortfolioItem
+
+
+class Command(BaseCommand):
+    help = 'Seed realistic volumes and benchmark every API endpoint, optionally against a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Fraction of the production volumes')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--scenario', action='append', help='Only these scenarios (repeatable)')
+        parser.add_argument('--output', help='Write the results as JSON')
+        parser.add_argument('--baseline', help='Fail on regressions against this JSON file')
+        parser.add_argument('--save-baseline', help='Store this run as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed p95 growth (0.5 = +50%%)')
+        parser.add_argument('--response-cache', action='store_true', help='Keep the anonymous response cache')
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in API_SCENARIOS if not options['scenario'] or s[0] in options['scenario']]
+        if not scenarios:
+            raise CommandError(f'No such scenario; choose from {", ".join(s[0] for s in API_SCENARIOS)}')
+        caches = dict(settings.CACHES)
+        if not options['response_cache']:
+            caches['responses'] = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+
+        with benchmark_database(), override_settings(CACHES=caches):
+            started = time.perf_counter()
+            users = seed_dataset(options['scale'], log=lambda line: self.stdout.write(f'  seeded {line}'))
+            self.stdout.write(f'seeding took {time.perf_counter() - started:.1f} s')
+            clients, ids = self.prepare(users)
+
+            results = {}
+            for name, audience, path, params in scenarios:
+                summary = measure_endpoint(clients[audience], path.format(**ids), params, options['requests'])
+                if any(status >= 400 for status in summary['statuses']):
+                    raise CommandError(f'{name}: responses {summary["statuses"]}')
+                results[name] = summary
+                self.stdout.write(
+                    f"{name:<24} p50 {summary['p50_ms']:>7.2f}  p95 {summary['p95_ms']:>7.2f}  "
+                    f"p99 {summary['p99_ms']:>7.2f} ms  {summary['throughput']:>8.1f} req/s  "
+                    f"{summary['queries']:>5.2f} queries/req"
+                )
+
+        report = {
+            'meta': {
+                'scale': options['scale'], 'requests': options['requests'],
+                'database': connection.vendor, 'python': platform.python_version(),
+                'django': django.get_version(), 'response_cache': options['response_cache'],
+            },
+            'results': {
+                name: {key: round(summary[key], 3) for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput', 'queries')}
+                for name, summary in results.items()
+            },
+        }
+        for path in filter(None, [options['output'], options['save_baseline']]):
+            with open(path, 'w') as handle:
+                json.dump(report, handle, indent=2, ensure_ascii=False)
+                handle.write('\n')
+            self.stdout.write(f'results written to {path}')
+
+        if options['baseline']:
+            self.check_baseline(report, options)
+
+    def prepare(self, users):
+        User = get_user_model()
+        staff = User.objects.create_user(
+            username='bench-staff@example.com', email='bench-staff@example.com', password='!',
+            full_name='مدیر', is_staff=True
+        )
+        owner = users[0]
+
+        def client(user):
+            return Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+        clients = {'anon': Client(), 'user': client(owner), 'staff': client(staff)}
+        ids = {
+            'project': PortfolioItem.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'order': ServiceOrder.objects.filter(user=owner).values_list('pk', flat=True).first(),
+            'session': ChatSession.objects.filter(user=owner).values_list('pk', flat=True).first(),
+        }
+        return clients, ids
+
+    def check_baseline(self, report, options):
+        with open(options['baseline']) as handle:
+            baseline = json.load(handle)
+        if baseline.get('meta', {}).get('scale') != report['meta']['scale']:
+            self.stderr.write(
+                f"warning: baseline was recorded at scale {baseline.get('meta', {}).get('scale')}, "
+                f"this run used {report['meta']['scale']}"
+            )
+        failures = compare_to_baseline(report['results'], baseline, options['tolerance'])
+        if failures:
+            for failure in failures:
+                self.stderr.write(f'REGRESSION {failure}')
+            sys.exit(1)
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {options["baseline"]}'))
@@ -0,0 +1,306 @@
+"""
+Compare sync (WSGI) and async (ASGI) serving of waiting requests.
+
+    python manage.py bench_asgi
+    python manage.py bench_asgi --concurrency 500 --workers 9 --latency 2
+
+Both modes run in this process against a scratch database, with every
+request arriving at once (latency is counted from then, so time queued
+behind busy workers is included):
+
+* ``wsgi``: ``--workers`` threads each pass one request at a time through
+  the WSGI handler with the sync viewsets, which is the concurrency of as
+  many sync gunicorn workers;
+* ``asgi``: one event loop passes all requests through
+  ``hermes_backend.asgi`` with the async views routed: one uvicorn worker.
+
+The ``chat-stream`` scenario streams a chat reply from a simulated upstream
+that waits ``--latency`` seconds over ``--chunks`` chunks (``time.sleep``
+for WSGI, ``asyncio.sleep`` for ASGI). ``portfolio-list`` and
+``site-settings`` do not wait and show the per-request cost of each path.
+
+Memory is compared per worker process: a sync worker costs this process's
+RSS after warm-up, an uvicorn worker the same plus what the ASGI run added
+(the peak RSS growth, covering in-flight requests and their threads). The
+summary reports how many requests each mode keeps in flight for the memory
+of the sync workers.
+"""
+
+import asyncio
+import importlib
+import json
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import clear_url_caches
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from chats.models import ChatSession
+from core.benchmarks import benchmark_database, summarize
+from core.seeding import seed_portfolio, seed_user
+
+UPSTREAM = {'latency': 1.0, 'chunks': 5}
+URLCONFS = ['chats.urls', 'portfolio.urls', 'settings_app.urls']
+
+SCENARIOS = [
+    # name, method, path, body, authenticated
+    ('chat-stream', 'POST', '/api/chats/{session}/add_message/?stream=1', {'role': 'user', 'text': 'سلام'}, True),
+    ('portfolio-list', 'GET', '/api/portfolio/', None, False),
+    ('site-settings', 'GET', '/api/settings/', None, False),
+]
+
+
+def slow_reply(session, user_message):
+    """Simulated upstream for sync workers."""
+    for n in range(UPSTREAM['chunks']):
+        time.sleep(UPSTREAM['latency'] / UPSTREAM['chunks'])
+        yield f'بخش {n} '
+
+
+async def aslow_reply(session, user_message):
+    """Simulated upstream for the event loop."""
+    for n in range(UPSTREAM['chunks']):
+        await asyncio.sleep(UPSTREAM['latency'] / UPSTREAM['chunks'])
+        yield f'بخش {n} '
+
+
+def rss_mb():
+    """Current resident set size (peak on platforms without /proc)."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def route_async_views(enabled):
+    """Rebuild the URL configuration with or without the async views."""
+    settings.ASYNC_VIEWS = enabled
+    for name in URLCONFS + [settings.ROOT_URLCONF]:
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+async def asgi_request(app, method, path, headers, body):
+    """One request through an ASGI application; returns ``(status, body bytes)``."""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'testserver')] + [(k.encode(), v.encode()) for k, v in headers.items()],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    pending = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    finished = asyncio.Event()
+    result = {'status': None, 'bytes': 0}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            result['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            result['bytes'] += len(message.get('body', b''))
+
+    await app(scope, receive, send)
+    finished.set()
+    return result['status'], result['bytes']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent waiting requests under sync WSGI workers and one ASGI worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=200, help='Requests arriving at once')
+        parser.add_argument('--workers', type=int, default=5, help='Sync workers in the WSGI run')
+        parser.add_argument('--latency', type=float, default=1.0, help='Simulated upstream seconds per reply')
+        parser.add_argument('--chunks', type=int, default=5, help='Chunks per streamed reply')
+        parser.add_argument('--scenario', action='append', help='Only these scenarios (repeatable)')
+        parser.add_argument('--output', help='Write the results as JSON')
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in SCENARIOS if not options['scenario'] or s[0] in options['scenario']]
+        if not scenarios:
+            raise CommandError(f'No such scenario; choose from {", ".join(s[0] for s in SCENARIOS)}')
+        UPSTREAM.update(latency=options['latency'], chunks=max(1, options['chunks']))
+        caches = dict(settings.CACHES)
+        caches['responses'] = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        activity_log = dict(getattr(settings, 'ACTIVITY_LOG', {}), ENABLED=False)
+        metrics = dict(getattr(settings, 'METRICS', {}), ENABLED=False)
+
+        with benchmark_database(), override_settings(
+            CACHES=caches, ACTIVITY_LOG=activity_log, METRICS=metrics, ASYNC_VIEWS=False
+        ):
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode=WAL')  # concurrent readers next to one writer
+            ids, token = self.prepare()
+            try:
+                results = self.run(scenarios, ids, token, options)
+            finally:
+                route_async_views(False)
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2, ensure_ascii=False)
+                handle.write('\n')
+            self.stdout.write(f'results written to {options["output"]}')
+
+    def prepare(self):
+        user = seed_user('bench-asgi@example.com')
+        seed_portfolio(40)
+        session = ChatSession.objects.create(user=user, title='بنچمارک')
+        return {'session': session.pk}, str(RefreshToken.for_user(user).access_token)
+
+    def run(self, scenarios, ids, token, options):
+        concurrency, workers = options['concurrency'], options['workers']
+        results = {}
+        # ASGI first, so its RSS growth is not hidden by the WSGI run's peak.
+        route_async_views(True)
+        from django.core.asgi import get_asgi_application
+        app = get_asgi_application()
+        with override_settings(CHAT_REPLY_GENERATOR=f'{__name__}.aslow_reply'):
+            for scenario in scenarios:
+                self.asgi_run(app, scenario, ids, token, 5)  # warm-up
+            baseline_rss = rss_mb()
+            peak_rss = baseline_rss
+            for scenario in scenarios:
+                summary, peak = self.asgi_run(app, scenario, ids, token, concurrency)
+                peak_rss = max(peak_rss, peak)
+                results.setdefault(scenario[0], {})['asgi'] = summary
+
+        route_async_views(False)
+        with override_settings(CHAT_REPLY_GENERATOR=f'{__name__}.slow_reply'):
+            for scenario in scenarios:
+                self.wsgi_run(scenario, ids, token, min(5, workers), workers)  # warm-up
+                summary = self.wsgi_run(scenario, ids, token, concurrency, workers)
+                results[scenario[0]]['wsgi'] = summary
+
+        growth = max(0.0, peak_rss - baseline_rss)
+        self.stdout.write(
+            f'\n{concurrency} requests at once, upstream latency {options["latency"]:.2f} s, '
+            f'worker RSS {baseline_rss:.0f} MB'
+        )
+        for name, modes in results.items():
+            self.stdout.write(f'\n{name}')
+            for mode in ('wsgi', 'asgi'):
+                summary = modes[mode]
+                self.stdout.write(
+                    f"  {mode}  {summary['throughput']:>8.1f} req/s  p50 {summary['p50_ms']:>8.1f} ms  "
+                    f"p95 {summary['p95_ms']:>8.1f} ms  max in flight {summary['in_flight']:>4}  "
+                    f"errors {summary['errors']}"
+                )
+
+        budget = workers * baseline_rss
+        asgi_workers = max(1, int(budget // (baseline_rss + growth)))
+        stream = results.get('chat-stream')
+        self.stdout.write(
+            f'\nmemory budget of {workers} sync workers: {budget:.0f} MB '
+            f'(one uvicorn worker: {baseline_rss:.0f} MB + {growth:.1f} MB under load)'
+        )
+        if stream:
+            self.stdout.write(self.style.SUCCESS(
+                f'streams in flight for that budget: wsgi {stream["wsgi"]["in_flight"]}, '
+                f'asgi {stream["asgi"]["in_flight"] * asgi_workers} ({asgi_workers} uvicorn workers)'
+            ))
+        return {
+            'meta': {
+                'concurrency': concurrency, 'workers': workers, 'latency': options['latency'],
+                'worker_rss_mb': round(baseline_rss, 1), 'asgi_growth_mb': round(growth, 1),
+            },
+            'results': results,
+        }
+
+    def request_args(self, scenario, ids, token):
+        name, method, path, body, authenticated = scenario
+        headers = {'authorization': f'Bearer {token}'} if authenticated else {}
+        data = json.dumps(body).encode() if body is not None else b''
+        if body is not None:
+            headers.update({'content-type': 'application/json', 'content-length': str(len(data))})
+        return method, path.format(**ids), headers, data
+
+    def asgi_run(self, app, scenario, ids, token, total):
+        method, path, headers, data = self.request_args(scenario, ids, token)
+        state = {'in_flight': 0, 'max': 0, 'errors': 0, 'peak_rss': rss_mb()}
+
+        async def one(started):
+            state['in_flight'] += 1
+            state['max'] = max(state['max'], state['in_flight'])
+            try:
+                status, _ = await asgi_request(app, method, path, headers, data)
+            finally:
+                state['in_flight'] -= 1
+            if status is None or status >= 400:
+                state['errors'] += 1
+            return time.perf_counter() - started
+
+        async def sample_rss(done):
+            while not done.is_set():
+                state['peak_rss'] = max(state['peak_rss'], rss_mb())
+                await asyncio.sleep(0.05)
+
+        async def main():
+            done = asyncio.Event()
+            sampler = asyncio.create_task(sample_rss(done))
+            started = time.perf_counter()
+            latencies = await asyncio.gather(*(one(started) for _ in range(total)))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await sampler
+            return latencies, elapsed
+
+        latencies, elapsed = asyncio.run(main())
+        summary = summarize(latencies, elapsed)
+        summary.update(in_flight=state['max'], errors=state['errors'])
+        return summary, state['peak_rss']
+
+    def wsgi_run(self, scenario, ids, token, total, workers):
+        method, path, headers, data = self.request_args(scenario, ids, token)
+        extra = {f'HTTP_{name.upper().replace("-", "_")}': value for name, value in headers.items()}
+        extra.pop('HTTP_CONTENT_TYPE', None)
+        extra.pop('HTTP_CONTENT_LENGTH', None)
+        local = threading.local()
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'max': 0, 'errors': 0}
+
+        def one(started):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client(**extra)
+            with lock:
+                state['in_flight'] += 1
+                state['max'] = max(state['max'], state['in_flight'])
+            try:
+                if method == 'POST':
+                    response = client.post(path, data, content_type='application/json')
+                else:
+                    response = client.get(path)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            finally:
+                with lock:
+                    state['in_flight'] -= 1
+                connection.close()
+            if response.status_code >= 400:
+                with lock:
+                    state['errors'] += 1
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            started = time.perf_counter()
+            latencies = list(pool.map(one, [started] * total))
+            elapsed = time.perf_counter() - started
+        summary = summarize(latencies, elapsed)
+        summary.update(in_flight=state['max'], errors=state['errors'])
+        return summary
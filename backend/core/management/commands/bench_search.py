@@ -0,0 +1,81 @@
+"""
+Compare full-text search latency with the icontains SearchFilter.
+
+Seeds a scratch database with portfolio items and runs the same queries
+through /api/portfolio/?search= with each filter backend.
+"""
+
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.utils.module_loading import import_string
+from rest_framework.filters import SearchFilter
+
+from core import search
+from core.benchmarks import benchmark_database, format_summary, run_concurrent
+from portfolio.models import PortfolioItem
+from portfolio.views import PortfolioViewSet
+
+WORDS = (
+    'بازسازی آشپزخانه حمام کابینت کاشی سرامیک نقاشی دیوار کف پارکت لوله کشی '
+    'برق کاری نورپردازی کناف سقف کاذب پنجره دوجداره نما سنگ ویلا آپارتمان '
+    'تهران شیراز اصفهان مشهد کرج طراحی داخلی مدرن کلاسیک'
+).split()
+QUERIES = ['آشپزخانه', 'كابينت', 'سقف کاذب', 'بازسازي حمام', 'پارک', 'نما سنگ']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-text search against icontains'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        # Mostly filler vocabulary so each query term hits a realistic share of rows
+        filler = [f'واژه{i}' for i in range(5000)]
+        # Measure the search itself, not the anonymous response cache.
+        caches = dict(settings.CACHES, responses={'BACKEND': 'django.core.cache.backends.dummy.DummyCache'})
+        with benchmark_database(), override_settings(CACHES=caches):
+            PortfolioItem.objects.bulk_create(
+                (
+                    PortfolioItem(
+                        title=' '.join(rng.choices(WORDS, k=3)),
+                        description=' '.join(rng.choices(filler, k=115) + rng.choices(WORDS, k=5)),
+                        location=rng.choice(['تهران', 'شیراز', 'اصفهان']),
+                    )
+                    for _ in range(options['items'])
+                ),
+                batch_size=2000,
+            )
+            search.rebuild(PortfolioItem)
+            self.stdout.write(f'{options["items"]} portfolio items seeded and indexed')
+
+            backends = (
+                ('icontains', 'rest_framework.filters.SearchFilter'),
+                ('full-text', 'core.search.FullTextSearchFilter'),
+            )
+            original = PortfolioViewSet.filter_backends
+            client = Client()
+
+            def request(i):
+                response = client.get('/api/portfolio/', {'search': QUERIES[i % len(QUERIES)]})
+                assert response.status_code == 200
+
+            try:
+                for label, backend in backends:
+                    PortfolioViewSet.filter_backends = [
+                        import_string(backend) if issubclass(cls, SearchFilter) else cls
+                        for cls in original
+                    ]
+                    self.stdout.write(format_summary(label, run_concurrent(request, options['requests'])))
+            finally:
+                PortfolioViewSet.filter_backends = original
+
+            for query in QUERIES:
+                icontains = PortfolioItem.objects.filter(description__icontains=query).count()
+                hits = search.filter_queryset(PortfolioItem.objects.all(), query, order=False).count()
+                self.stdout.write(f'  {query!r}: {hits} full-text hits (icontains on description: {icontains})')
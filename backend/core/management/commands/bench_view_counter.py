@@ -0,0 +1,79 @@
+"""
+Load test for buffered view counters.
+
+Hammers the portfolio and blog detail endpoints from several threads, once
+with synchronous view-count updates and once with buffering enabled, and
+prints read throughput for both runs.
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from blog.models import BlogPost
+from core import view_counter
+from core.benchmarks import benchmark_database, format_summary, run_concurrent
+from portfolio.models import PortfolioItem
+
+BUFFERED_MODELS = ['portfolio.PortfolioItem', 'blog.BlogPost']
+
+
+class Command(BaseCommand):
+    help = 'Compare detail-endpoint throughput with view-count batching on and off'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--objects', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            urls = self.seed(options['objects'])
+            for label, models in (('batching off', []), ('batching on', BUFFERED_MODELS)):
+                config = {'BACKEND': 'memory', 'MODELS': models, 'FLUSH_INTERVAL': 0}
+                with override_settings(VIEW_COUNTER=config):
+                    summary = self.run(urls, options['requests'], options['concurrency'])
+                    start = time.perf_counter()
+                    flushed = view_counter.flush()
+                    flush_ms = (time.perf_counter() - start) * 1000
+                self.stdout.write(format_summary(label, summary))
+                if models:
+                    self.stdout.write(f'{"":<28} flushed {flushed} rows in {flush_ms:.2f} ms')
+            self.check_totals(options['requests'])
+
+    def seed(self, count):
+        author = get_user_model().objects.create_user(
+            username='bench@example.com', email='bench@example.com',
+            password='bench-password', full_name='Bench',
+        )
+        items = PortfolioItem.objects.bulk_create(
+            PortfolioItem(title=f'Project {i}', description='...') for i in range(count)
+        )
+        posts = BlogPost.objects.bulk_create(
+            BlogPost(title=f'Post {i}', slug=f'post-{i}', author=author,
+                     content='...', cover_image='blog/covers/bench.jpg')
+            for i in range(count)
+        )
+        return (
+            [f'/api/portfolio/{item.pk}/' for item in items]
+            + [f'/api/blog/{post.pk}/' for post in posts]
+        )
+
+    def run(self, urls, total, concurrency):
+        clients = {}
+
+        def request(i):
+            client = clients.setdefault(i % concurrency, Client())
+            response = client.get(urls[i % len(urls)])
+            assert response.status_code == 200, response.status_code
+
+        return run_concurrent(request, total, concurrency)
+
+    def check_totals(self, total):
+        counted = sum(PortfolioItem.objects.values_list('view_count', flat=True))
+        counted += sum(BlogPost.objects.values_list('view_count', flat=True))
+        expected = total * 2
+        style = self.style.SUCCESS if counted == expected else self.style.ERROR
+        self.stdout.write(style(f'view_count total {counted}, expected {expected}'))
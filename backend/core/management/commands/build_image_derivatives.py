@@ -0,0 +1,85 @@
+"""
+Backfill responsive image derivatives across a process pool.
+
+    python manage.py build_image_derivatives --workers 4
+    python manage.py build_image_derivatives --model portfolio.PortfolioImage --force
+
+Rows whose manifest already matches their current file are skipped unless
+``--force`` is given. Sources are read and derivatives stored by the parent;
+only decoding, resizing and encoding run in child processes. Identical
+files (same content hash) are rendered once.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core import images
+
+
+class Command(BaseCommand):
+    help = 'Render missing WebP/AVIF derivatives for every configured image field'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--model', help='Only this model, e.g. portfolio.PortfolioImage')
+        parser.add_argument('--force', action='store_true', help='Re-attach manifests for current rows too')
+        parser.add_argument('--batch-size', type=int, default=64,
+                            help='Sources held in memory at once')
+
+    def handle(self, *args, **options):
+        fields = images.configured_fields()
+        if options['model']:
+            fields = {model: names for model, names in fields.items() if model._meta.label == options['model']}
+            if not fields:
+                raise CommandError(f'{options["model"]} has no configured image fields')
+
+        pending = []
+        for model, names in fields.items():
+            for field in names:
+                rows = (
+                    model._default_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                    .values_list('pk', field, images.variants_field(field))
+                )
+                for pk, name, manifest in rows.iterator():
+                    if options['force'] or (manifest or {}).get('source') != name:
+                        pending.append((model, pk, field, name))
+
+        options_ = images.render_options()
+        started = time.perf_counter()
+        rendered = missing = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for start in range(0, len(pending), options['batch_size']):
+                batch = pending[start:start + options['batch_size']]
+                manifests, to_render = {}, {}
+                for _, _, _, name in batch:
+                    if name in manifests or name in to_render:
+                        continue
+                    if not default_storage.exists(name):
+                        manifests[name] = None
+                        continue
+                    with default_storage.open(name) as handle:
+                        data = handle.read()
+                    manifest = images.load_manifest(images.source_digest(data, options_))
+                    if manifest:
+                        manifests[name] = manifest
+                    else:
+                        to_render[name] = data
+                jobs = [(data, options_) for data in to_render.values()]
+                for name, result in zip(to_render, pool.map(images.render_source, jobs)):
+                    manifests[name] = images.store(*result)
+                    rendered += 1
+                for model, pk, field, name in batch:
+                    if manifests[name] is None:
+                        missing += 1
+                        continue
+                    images.save_manifest(model, pk, field, name, dict(manifests[name], source=name))
+        elapsed = time.perf_counter() - started
+
+        rate = rendered / elapsed if elapsed and rendered else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(pending)} image(s) updated: {rendered} rendered, '
+            f'{len(pending) - rendered - missing} reused, {missing} missing source ({rate:.1f} images/s)'
+        ))
@@ -0,0 +1,103 @@
+"""
+Measure the request metrics middleware and check its exposition.
+
+    python manage.py check_metrics --requests 2000
+
+Times the same anonymous requests with the middleware enabled and
+disabled, then checks the scrape output: per-view counts and query
+totals, merging of an exited worker's archived file, access control
+(the token), and that a scrape runs no database query.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import resolve
+
+from core import metrics
+from core.benchmarks import benchmark_database, format_summary, summarize
+
+TOKEN = 'check-metrics'
+
+
+class Command(BaseCommand):
+    help = 'Report MetricsMiddleware overhead and verify the Prometheus exposition'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--url', default='/api/settings/')
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp(prefix='hermes-metrics-')
+        try:
+            with benchmark_database():
+                summaries = {}
+                for enabled in (False, True, False, True):
+                    with override_settings(METRICS={'ENABLED': enabled, 'DIRECTORY': directory}):
+                        metrics._registry = None
+                        summaries[enabled] = self.measure(Client(), options['url'], options['requests'])
+                for enabled in (False, True):
+                    self.stdout.write(format_summary(f'metrics {"on" if enabled else "off"}', summaries[enabled]))
+                overhead = (summaries[True]['mean_ms'] - summaries[False]['mean_ms']) * 1000
+                self.stdout.write(f'overhead: {overhead:.1f} µs/request')
+
+                with override_settings(METRICS={'DIRECTORY': directory, 'TOKEN': TOKEN}):
+                    self.check_exposition(directory, options['url'], options['requests'])
+        finally:
+            metrics._registry = None
+            shutil.rmtree(directory, ignore_errors=True)
+        self.stdout.write(self.style.SUCCESS('Metrics OK'))
+
+    def measure(self, client, url, total):
+        client.get(url)
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(total):
+            start = time.perf_counter()
+            client.get(url)
+            latencies.append(time.perf_counter() - start)
+        return summarize(latencies, time.perf_counter() - started)
+
+    def check_exposition(self, directory, url, total):
+        view = resolve(url).view_name
+        # A second "worker" that served the same view and has exited since.
+        other = {
+            'buckets': metrics.get_config()['BUCKETS'],
+            'series': [dict(metrics.new_series(metrics.get_config()['BUCKETS']), view=view, method='GET',
+                            count=5, statuses={'2xx': 5})],
+        }
+        other['series'][0]['buckets'][0] = 5
+        with open(os.path.join(directory, '999999.json'), 'w') as handle:
+            json.dump(other, handle)
+        metrics.archive(999999)
+
+        logging.getLogger('django.request').setLevel(logging.ERROR)  # the expected 403
+        if Client().get('/api/core/metrics/').status_code != 403:
+            raise CommandError('Metrics are readable without the token')
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = Client(HTTP_AUTHORIZATION=f'Bearer {TOKEN}').get('/api/core/metrics/')
+        if response.status_code != 200:
+            raise CommandError(f'Scrape returned {response.status_code}')
+        text = response.content.decode()
+        expected = total + 1 + 5  # measured run, its warm-up, the other worker
+        line = f'hermes_http_request_duration_seconds_count{{view="{view}",method="GET"}} {expected}'
+        if line not in text:
+            raise CommandError(f'Missing merged series: {line}')
+        if f'hermes_db_queries_total{{view="{view}",method="GET"}}' not in text:
+            raise CommandError('Missing query counter')
+        if queries:
+            raise CommandError(f'Scrape ran {len(queries)} queries')
+        self.stdout.write(f'scrape: {len(text.splitlines())} lines, {len(queries)} queries, merged 2 workers')
@@ -0,0 +1,70 @@
+"""
+Enforce ``settings.QUERY_BUDGETS`` against seeded data.
+
+Each budget names a URL pattern and the maximum number of queries a GET to
+it may run. Detail routes take their ``pk`` from the first row of ``model``.
+Exits non-zero when any endpoint is over budget, so it can run in CI.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import seeding
+from settings_app.models import SiteSettings
+from core.benchmarks import benchmark_database
+from core.query_budget import QueryBudgetExceeded, query_budget
+
+
+class Command(BaseCommand):
+    help = 'Fail when an API endpoint runs more queries than its budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=25, help='Rows to seed per model')
+
+    def handle(self, *args, **options):
+        failures = []
+        with benchmark_database():
+            self.seed(options['rows'])
+            for budget in settings.QUERY_BUDGETS:
+                url = self.build_url(budget)
+                client = self.staff_client if budget.get('staff') else Client()
+                try:
+                    with query_budget(budget['max_queries'], label=f'GET {url}') as captured:
+                        response = client.get(url)
+                except QueryBudgetExceeded as exc:
+                    failures.append(str(exc))
+                    self.stdout.write(self.style.ERROR(f'FAIL {url}'))
+                    continue
+                if response.status_code != 200:
+                    failures.append(f'GET {url} returned {response.status_code}')
+                    self.stdout.write(self.style.ERROR(f'FAIL {url} ({response.status_code})'))
+                    continue
+                self.stdout.write(self.style.SUCCESS(
+                    f'ok   {url} ({len(captured)}/{budget["max_queries"]} queries)'
+                ))
+        if failures:
+            raise CommandError('\n\n'.join(failures))
+
+    def seed(self, rows):
+        staff = seeding.seed_user('staff@example.com', is_staff=True, is_superuser=True)
+        # Session login for the admin, a JWT for the API
+        token = RefreshToken.for_user(staff).access_token
+        self.staff_client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.staff_client.force_login(staff)
+        users = seeding.seed_users(rows)
+        projects = seeding.seed_portfolio(rows)
+        seeding.seed_blog(rows, users)
+        seeding.seed_reviews(rows, users, projects)
+        orders = seeding.seed_orders(rows, users)
+        seeding.seed_invoices(orders)
+        SiteSettings.objects.create(id=1)
+
+    def build_url(self, budget):
+        kwargs = {}
+        if budget.get('model'):
+            kwargs['pk'] = apps.get_model(budget['model'])._default_manager.values_list('pk', flat=True).first()
+        return reverse(budget['url'], kwargs=kwargs)
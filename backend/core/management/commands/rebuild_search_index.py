@@ -0,0 +1,25 @@
+"""
+(Re)build the full-text search index for every model in SEARCH_INDEXES.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='Model labels, default: all indexed models')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if search.get_backend() is None:
+            self.stderr.write('No full-text backend for this database; search falls back to icontains.')
+            return
+        for label in options['models'] or settings.SEARCH_INDEXES:
+            count = search.rebuild(apps.get_model(label), batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{label}: indexed {count} rows'))
@@ -0,0 +1,349 @@
+"""
+Core App - Request Metrics
+
+``MetricsMiddleware`` measures every request and adds it to an in-process
+aggregate keyed by resolved URL name and method: a latency histogram,
+status classes, database query count and time (through
+``connection.execute_wrapper``), response bytes and response-cache hits.
+Recording is a few additions under a lock; nothing touches the database
+or the network.
+
+Each worker writes its aggregate to ``<DIRECTORY>/<pid>.json`` at most once
+per ``DUMP_INTERVAL`` seconds (atomically, via rename). The metrics view
+sums every file in the directory, so a scrape of any gunicorn worker sees
+the whole server. The gunicorn master (``gunicorn.conf.py``) empties the
+directory when it starts and, as each worker exits, folds that worker's
+file into ``archive.json``: counters never go backwards, and a new worker
+that reuses the PID starts a file of its own.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .middleware import AsyncCapableMiddleware
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIRECTORY': os.path.join(tempfile.gettempdir(), 'hermes-metrics'),  # None = this process only
+    'DUMP_INTERVAL': 1.0,
+    'BUCKETS': [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+    'EXCLUDE_PATHS': ['/static/', '/media/'],
+    'TOKEN': None,                      # bearer token accepted by the metrics view
+    'ALLOWED_IPS': [],                  # addresses that need no token (mind reverse proxies)
+}
+
+ARCHIVE = 'archive.json'
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+# ``[query count, query seconds]`` of the request being measured
+_query_stats = ContextVar('metrics_query_stats', default=None)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'METRICS', {}))
+    return config
+
+
+def new_series(buckets):
+    return {
+        'count': 0, 'duration': 0.0, 'buckets': [0] * (len(buckets) + 1),
+        'queries': 0, 'query_duration': 0.0, 'bytes': 0, 'cache_hits': 0, 'statuses': {},
+    }
+
+
+class Registry:
+    """Per-process aggregates, one series per (view name, method)."""
+    
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.lock = threading.Lock()
+        self.series = {}
+        self.last_dump = 0.0
+    
+    def observe(self, view, method, status, duration, queries, query_duration, size, cache_hit):
+        index = next((i for i, bound in enumerate(self.buckets) if duration <= bound), len(self.buckets))
+        status_class = f'{status // 100}xx'
+        with self.lock:
+            series = self.series.get((view, method))
+            if series is None:
+                series = self.series[(view, method)] = new_series(self.buckets)
+            series['count'] += 1
+            series['duration'] += duration
+            series['buckets'][index] += 1
+            series['queries'] += queries
+            series['query_duration'] += query_duration
+            series['bytes'] += size
+            series['cache_hits'] += cache_hit
+            series['statuses'][status_class] = series['statuses'].get(status_class, 0) + 1
+    
+    def snapshot(self):
+        with self.lock:
+            return as_snapshot(self.series, self.buckets)
+    
+    def dump(self, directory, force=False):
+        """Write this process's snapshot for the other workers' scrapes."""
+        now = time.monotonic()
+        if not directory or (not force and now - self.last_dump < get_config()['DUMP_INTERVAL']):
+            return
+        self.last_dump = now
+        write_snapshot(os.path.join(directory, f'{os.getpid()}.json'), self.snapshot())
+
+
+def as_snapshot(series, buckets):
+    """The JSON form of ``{(view, method): series}`` that workers write."""
+    return {
+        'buckets': list(buckets),
+        'series': [
+            {'view': view, 'method': method, **dict(data, buckets=list(data['buckets']),
+                                                   statuses=dict(data['statuses']))}
+            for (view, method), data in series.items()
+        ],
+    }
+
+
+def write_snapshot(path, snapshot):
+    """Replace ``path`` atomically, so readers never see half a file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as handle:
+        json.dump(snapshot, handle)
+    os.replace(handle.name, path)
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None  # gone, or a worker is replacing it right now
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = Registry(get_config()['BUCKETS'])
+    return _registry
+
+
+def merge(snapshots):
+    """Sum snapshots (one per worker) into ``{(view, method): series}``."""
+    merged = {}
+    for snapshot in snapshots:
+        for row in snapshot['series']:
+            key = (row['view'], row['method'])
+            series = merged.get(key)
+            if series is None:
+                series = merged[key] = new_series(snapshot['buckets'])
+            for field in ('count', 'duration', 'queries', 'query_duration', 'bytes', 'cache_hits'):
+                series[field] += row[field]
+            series['buckets'] = [a + b for a, b in zip(series['buckets'], row['buckets'])]
+            for status, count in row['statuses'].items():
+                series['statuses'][status] = series['statuses'].get(status, 0) + count
+    return merged
+
+
+def collect():
+    """Merged series of every worker sharing the metrics directory."""
+    config = get_config()
+    registry = get_registry()
+    directory = config['DIRECTORY']
+    if not directory:
+        return merge([registry.snapshot()]), registry.buckets
+    registry.dump(directory, force=True)
+    names = [name for name in os.listdir(directory) if name.endswith('.json')]
+    snapshots = [read_snapshot(os.path.join(directory, name)) for name in names]
+    return merge([snapshot for snapshot in snapshots if snapshot]), registry.buckets
+
+
+def clear(directory=None):
+    """Delete every worker file and the archive (the gunicorn master, on start)."""
+    directory = directory or get_config()['DIRECTORY']
+    if not directory or not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith(('.json', '.tmp')):
+            os.remove(os.path.join(directory, name))
+
+
+def archive(pid, directory=None):
+    """Fold the file of the exited worker ``pid`` into the archive (the gunicorn master)."""
+    directory = directory or get_config()['DIRECTORY']
+    if not directory:
+        return
+    path = os.path.join(directory, f'{pid}.json')
+    worker = read_snapshot(path)
+    if worker is None:
+        return
+    archive_path = os.path.join(directory, ARCHIVE)
+    snapshots = [worker] + [snapshot for snapshot in [read_snapshot(archive_path)] if snapshot]
+    write_snapshot(archive_path, as_snapshot(merge(snapshots), worker['buckets']))
+    os.remove(path)
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render(series, buckets, extra=()):
+    """Prometheus text exposition (format 0.0.4)."""
+    lines = []
+    
+    def header(name, kind, text):
+        lines.append(f'# HELP {name} {text}')
+        lines.append(f'# TYPE {name} {kind}')
+    
+    keys = sorted(series)
+    header('hermes_http_requests_total', 'counter', 'Requests by URL name, method and status class.')
+    for view, method in keys:
+        for status, count in sorted(series[(view, method)]['statuses'].items()):
+            lines.append(f'hermes_http_requests_total{_labels(view=view, method=method, status=status)} {count}')
+    
+    header('hermes_http_request_duration_seconds', 'histogram', 'Request latency.')
+    for view, method in keys:
+        data = series[(view, method)]
+        cumulative = 0
+        for bound, count in zip([*buckets, '+Inf'], data['buckets']):
+            cumulative += count
+            lines.append(
+                f'hermes_http_request_duration_seconds_bucket{_labels(view=view, method=method, le=bound)} {cumulative}'
+            )
+        lines.append(f'hermes_http_request_duration_seconds_sum{_labels(view=view, method=method)} {data["duration"]:.6f}')
+        lines.append(f'hermes_http_request_duration_seconds_count{_labels(view=view, method=method)} {data["count"]}')
+    
+    for name, field, kind, text in [
+        ('hermes_db_queries_total', 'queries', 'counter', 'Database queries run by requests.'),
+        ('hermes_db_query_duration_seconds_total', 'query_duration', 'counter', 'Time spent in database queries.'),
+        ('hermes_http_response_bytes_total', 'bytes', 'counter', 'Response body bytes sent.'),
+        ('hermes_response_cache_hits_total', 'cache_hits', 'counter', 'Responses served from the response cache.'),
+    ]:
+        header(name, kind, text)
+        for view, method in keys:
+            value = series[(view, method)][field]
+            value = f'{value:.6f}' if isinstance(value, float) else value
+            lines.append(f'{name}{_labels(view=view, method=method)} {value}')
+    
+    lines.extend(extra)
+    return '\n'.join(lines) + '\n'
+
+
+def response_cache_lines():
+    """Shared response-cache hit/miss counters (they live in the cache, not per worker)."""
+    from . import response_cache
+    
+    lines = [
+        '# HELP hermes_response_cache_lookups_total Response cache lookups by view and result.',
+        '# TYPE hermes_response_cache_lookups_total counter',
+    ]
+    for view, stats in response_cache.stats().items():
+        lines.append(f'hermes_response_cache_lookups_total{_labels(view=view, result="hit")} {stats["hits"]}')
+        lines.append(f'hermes_response_cache_lookups_total{_labels(view=view, result="miss")} {stats["misses"]}')
+    return lines
+
+
+def _time_query(execute, sql, params, many, context):
+    stats = _query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+
+
+def _install_query_timer():
+    from django.db import connection
+    
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Time every request and count its queries; see ``core.metrics``.
+    
+    The timer stays installed on each thread's connection and counts into
+    the current request's context variable. Under ASGI the async ORM runs
+    queries in a thread of its own that sees the same context, so the timer
+    is installed from there.
+    """
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.config = get_config()
+        self.registry = get_registry()
+    
+    def is_measured(self, request):
+        return self.config['ENABLED'] and not any(
+            request.path.startswith(p) for p in self.config['EXCLUDE_PATHS']
+        )
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.is_measured(request):
+            return self.get_response(request)
+        
+        stats = [0, 0.0]
+        token = _query_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            _install_query_timer()
+            response = self.get_response(request)
+        finally:
+            _query_stats.reset(token)
+        self.observe(request, response, time.perf_counter() - start, stats)
+        return response
+    
+    async def __acall__(self, request):
+        if not self.is_measured(request):
+            return await self.get_response(request)
+        
+        stats = [0, 0.0]
+        token = _query_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await sync_to_async(_install_query_timer)()
+            response = await self.get_response(request)
+        finally:
+            _query_stats.reset(token)
+        self.observe(request, response, time.perf_counter() - start, stats)
+        return response
+    
+    def observe(self, request, response, duration, stats):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        method = request.method if request.method in METHODS else 'OTHER'
+        size = 0 if response.streaming else len(response.content)
+        self.registry.observe(
+            view, method, response.status_code, duration, stats[0], stats[1], size,
+            response.get('X-Cache') == 'HIT'
+        )
+        self.registry.dump(self.config['DIRECTORY'])
+
+
+@atexit.register
+def _dump_on_exit():
+    if _registry is not None:
+        try:
+            _registry.dump(get_config()['DIRECTORY'], force=True)
+        except OSError:
+            pass
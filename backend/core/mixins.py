@@ -0,0 +1,28 @@
+"""
+Core App - ViewSet Mixins
+"""
+
+
+class RelatedFieldsMixin:
+    """Load the relations a serializer reads in the same query as the rows.
+
+    Serializers declare what they need on their ``Meta``::
+
+        class Meta:
+            select_related = ['author']
+            prefetch_related = [Prefetch('gallery_images', ...)]
+
+    and the view applies it to ``get_queryset()`` for whichever serializer
+    class the current action uses.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        select_related = getattr(meta, 'select_related', ())
+        prefetch_related = getattr(meta, 'prefetch_related', ())
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
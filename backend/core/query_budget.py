@@ -0,0 +1,45 @@
+"""
+Core App - Query Budgets
+
+Guards against N+1 regressions. ``query_budget`` fails when the wrapped
+block runs more queries than allowed::
+
+    with query_budget(3, label='portfolio list'):
+        client.get('/api/portfolio/')
+
+Endpoint budgets live in ``settings.QUERY_BUDGETS`` and are enforced for
+every app by ``manage.py check_query_budgets``.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more queries than its budget."""
+
+
+class query_budget(CaptureQueriesContext):
+    """Context manager that fails when more than ``max_queries`` run inside it."""
+
+    def __init__(self, max_queries, label='', using=DEFAULT_DB_ALIAS):
+        super().__init__(connections[using])
+        self.max_queries = max_queries
+        self.label = label
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is None and len(self) > self.max_queries:
+            raise QueryBudgetExceeded(self.report())
+
+    def report(self):
+        lines = [f'{self.label or "block"}: {len(self)} queries, budget {self.max_queries}']
+        lines += [f'  {index}. {query["sql"]}' for index, query in enumerate(self.captured_queries, 1)]
+        return '\n'.join(lines)
+
+
+class QueryBudgetTestMixin:
+    """``TestCase`` mixin exposing ``assertQueryBudget(max_queries)``."""
+
+    def assertQueryBudget(self, max_queries, label='', using=DEFAULT_DB_ALIAS):
+        return query_budget(max_queries, label=label, using=using)
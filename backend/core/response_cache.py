@@ -0,0 +1,226 @@
+"""
+Core App - Anonymous Response Cache
+
+ViewSets opt in with ``CachedResponseMixin`` and declare what they cache
+and which models their output depends on::
+
+    class PortfolioViewSet(CachedResponseMixin, ...):
+        cache_actions = ['list', 'retrieve', 'featured']
+        cache_models = ['portfolio.PortfolioItem', 'portfolio.PortfolioImage']
+
+Only anonymous ``GET``/``HEAD`` requests (no ``Authorization`` header) that
+negotiate the JSON renderer are served from or stored in the cache; the
+browsable API's HTML carries per-request content and is never cached. The
+key covers the view, the path and the sorted query string.
+
+Invalidation is by version: every model in ``settings.RESPONSE_CACHE['MODELS']``
+has a version token that ``post_save``/``post_delete`` replace, and that
+token is part of each key. A change makes every dependent entry
+unreachable at once; stale entries simply age out. ``FIELDS`` narrows a
+model to the fields responses show: a save with ``update_fields`` outside
+them (a user's ``last_login``) leaves the token alone. Eviction is left to the
+backend: the local-memory cache is LRU bounded by ``MAX_ENTRIES``; on Redis,
+entries carry the TTL and the server's ``allkeys-lru`` policy caps memory.
+
+Version tokens are kept in the cache too, so on a process-local backend
+entries live ``LOCAL_TIMEOUT`` seconds instead of ``TIMEOUT`` (see
+``core.caching``).
+
+Hit and miss counts per view are kept in the same cache (shared across
+workers on Redis) and reported by ``stats()``.
+"""
+
+import hashlib
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from rest_framework.request import Request
+
+from .caching import invalidated_timeout
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'LOCAL_TIMEOUT': 5,   # entry lifetime on a process-local cache backend
+    'MODELS': [],
+    'FIELDS': {},
+    'KEY_PREFIX': 'respcache',
+}
+
+# Headers worth replaying from a cached response.
+CACHED_HEADERS = ('Content-Type', 'Vary', 'Allow', 'Content-Language')
+
+_views = {}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RESPONSE_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def version_key(label):
+    return f"{get_config()['KEY_PREFIX']}:version:{label}"
+
+
+def counter_key(view, kind):
+    return f"{get_config()['KEY_PREFIX']}:stats:{view}:{kind}"
+
+
+def get_versions(labels):
+    """Current version token of each model, creating missing ones."""
+    cache = get_cache()
+    keys = [version_key(label) for label in labels]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A lost token must never bring back entries built on an old one.
+            token = uuid.uuid4().hex
+            if not cache.add(key, token, None):
+                token = cache.get(key) or token
+            versions[key] = token
+    return [versions[key] for key in keys]
+
+
+def invalidate(model):
+    """Drop every cached response that depends on ``model``."""
+    get_cache().set(version_key(model._meta.label), uuid.uuid4().hex, None)
+
+
+def response_key(view, request, labels):
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    versions = ','.join(get_versions(labels))
+    digest = hashlib.sha1(f'{request.path}?{query}|{versions}'.encode('utf-8')).hexdigest()
+    return f"{get_config()['KEY_PREFIX']}:response:{view}:{digest}"
+
+
+def count(view, kind):
+    cache = get_cache()
+    key = counter_key(view, kind)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    """``{view: {'hits', 'misses', 'hit_ratio'}}`` for every cached view."""
+    cache = get_cache()
+    keys = {(view, kind): counter_key(view, kind) for view in sorted(_views) for kind in ('hits', 'misses')}
+    values = cache.get_many(list(keys.values()))
+    result = {}
+    for view in sorted(_views):
+        hits = values.get(keys[(view, 'hits')], 0)
+        misses = values.get(keys[(view, 'misses')], 0)
+        total = hits + misses
+        result[view] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
+    return result
+
+
+def reset_stats():
+    get_cache().delete_many([counter_key(view, kind) for view in _views for kind in ('hits', 'misses')])
+
+
+class CachedResponseMixin:
+    """Serve anonymous reads of the listed actions from the response cache."""
+
+    cache_actions = ['list', 'retrieve']
+    cache_models = []
+    cache_timeout = None  # defaults to RESPONSE_CACHE['TIMEOUT']
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_models:
+            _views[cls.__name__] = cls
+
+    def cache_hit(self, request, *args, **kwargs):
+        """Hook for side effects a cached response must still have (view counts)."""
+
+    def is_cacheable(self, request, **kwargs):
+        if request.method not in ('GET', 'HEAD') or 'HTTP_AUTHORIZATION' in request.META:
+            return False
+        action = getattr(self, 'action_map', {}).get('get')
+        return action in self.cache_actions and self.negotiated_format(request, **kwargs) == 'json'
+
+    def negotiated_format(self, request, **kwargs):
+        """Format of the renderer the request will get (``?format=``, suffix or ``Accept``)."""
+        if not isinstance(request, Request):
+            request = Request(request)
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        renderer, media_type = self.perform_content_negotiation(request, force=True)
+        return renderer.format
+
+    def get_cached_response(self, request, *args, **kwargs):
+        """``(key, response)``: the replayed response on a hit, ``(key, None)`` on a miss.
+
+        ``(None, None)`` when the request is not cacheable at all.
+        """
+        if not self.cache_models or not self.is_cacheable(request, **kwargs):
+            return None, None
+
+        view = type(self).__name__
+        key = response_key(view, request, self.cache_models)
+        cached = get_cache().get(key)
+        if cached is None:
+            count(view, 'misses')
+            return key, None
+
+        count(view, 'hits')
+        self.args, self.kwargs, self.request = args, kwargs, request
+        self.cache_hit(request, *args, **kwargs)
+        status, headers, content = cached
+        response = HttpResponse(content, status=status)
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return key, response
+
+    def cache_response(self, key, response):
+        """Store a successful ``GET`` response under ``key`` once it is rendered."""
+        if response.status_code == 200 and self.request.method == 'GET':
+            config = get_config()
+            cache = get_cache()
+            timeout = invalidated_timeout(cache, self.cache_timeout or config['TIMEOUT'], config['LOCAL_TIMEOUT'])
+
+            def store(rendered):
+                headers = {name: rendered[name] for name in CACHED_HEADERS if rendered.has_header(name)}
+                cache.set(key, (rendered.status_code, headers, rendered.content), timeout)
+
+            if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        key, cached = self.get_cached_response(request, *args, **kwargs)
+        if cached is not None:
+            return cached
+        response = super().dispatch(request, *args, **kwargs)
+        if key is None:
+            return response
+        return self.cache_response(key, response)
+
+
+def _on_change(sender, update_fields=None, **kwargs):
+    fields = get_config()['FIELDS'].get(sender._meta.label)
+    if fields and update_fields is not None and not set(update_fields) & set(fields):
+        return
+    invalidate(sender)
+
+
+def connect_signals():
+    for label in get_config()['MODELS']:
+        model = apps.get_model(label)
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'response-cache-save-{label}')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'response-cache-delete-{label}')
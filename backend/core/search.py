@@ -0,0 +1,357 @@
+"""
+Core App - Full-Text Search
+
+Replaces ``icontains`` scans for the models listed in
+``settings.SEARCH_INDEXES`` with a ranked full-text index:
+
+* SQLite: one FTS5 table per model (``search_<db_table>``), rowid = pk,
+  ranked with ``bm25``.
+* PostgreSQL: one table per model holding a ``tsvector`` behind a GIN
+  index, ranked with ``ts_rank``.
+
+Text is normalized for Persian before it is indexed and before it is
+searched (Arabic yeh/kaf, ZWNJ, diacritics, digits), so both sides always
+agree. Rows are re-indexed after every save/delete commit; the
+``rebuild_search_index`` command fills the index for existing data.
+
+``FullTextSearchFilter`` is a drop-in ``SearchFilter``: it matches the
+indexed columns the view lists in ``search_fields``, inside the view's own
+queryset (a subquery on the index, not a capped id list), and orders by
+rank. Models without an index (or a database without a backend) fall back
+to ``icontains`` on ``search_fields``.
+"""
+
+import logging
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from rest_framework.filters import SearchFilter
+
+logger = logging.getLogger(__name__)
+
+ARABIC_TO_PERSIAN = str.maketrans({
+    '\u064A': '\u06CC', '\u0649': '\u06CC', '\u0626': '\u06CC',  # Arabic yeh -> Persian yeh
+    '\u0643': '\u06A9',  # Arabic kaf -> keheh
+    '\u0629': '\u0647', '\u06C0': '\u0647',  # teh marbuta, heh with yeh
+    '\u0623': '\u0627', '\u0625': '\u0627', '\u0671': '\u0627',  # alef variants
+    '\u0624': '\u0648',  # waw with hamza
+    '\u200C': ' ',  # ZWNJ, so half-spaced and spaced words match
+    '\u200F': None, '\u200E': None,  # RLM / LRM
+    '\u0640': None,  # tatweel
+    **{chr(0x06F0 + i): str(i) for i in range(10)},  # Persian digits
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic digits
+})
+DIACRITICS = re.compile('[\u064B-\u065F\u0670]')
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+    """Canonical form of Persian/Arabic text used for indexing and queries."""
+    if not text:
+        return ''
+    text = DIACRITICS.sub('', str(text).translate(ARABIC_TO_PERSIAN))
+    return ' '.join(text.lower().split())
+
+
+def tokenize(query):
+    return TOKEN.findall(normalize(query))
+
+
+def get_config():
+    return getattr(settings, 'SEARCH_INDEXES', {})
+
+
+def indexed_fields(model):
+    return get_config().get(model._meta.label)
+
+
+def table_name(model):
+    return f'search_{model._meta.db_table}'
+
+
+def pk_column(model):
+    quote = connection.ops.quote_name
+    return f'{quote(model._meta.db_table)}.{quote(model._meta.pk.column)}'
+
+
+class SQLiteFTS5Backend:
+    def install(self, model, fields):
+        columns = ', '.join(fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table_name(model)} "
+                f"USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def index(self, model, fields, rows):
+        """``rows`` is an iterable of ``(pk, [value per field])``."""
+        table = table_name(model)
+        placeholders = ', '.join(['%s'] * (len(fields) + 1))
+        rows = list(rows)
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {table} WHERE rowid = %s', [(pk,) for pk, _ in rows])
+            cursor.executemany(
+                f'INSERT INTO {table} (rowid, {", ".join(fields)}) VALUES ({placeholders})',
+                [(pk, *values) for pk, values in rows],
+            )
+
+    def remove(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table_name(model)} WHERE rowid = %s', [pk])
+
+    def drop(self, model):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {table_name(model)}')
+
+    def match_query(self, fields, columns, tokens):
+        # Every token must match; the last one may be a prefix (search-as-you-type).
+        terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*']
+        query = ' '.join(terms)
+        if list(columns) != list(fields):
+            query = '{%s} : (%s)' % (' '.join(columns), query)
+        return query
+
+    def weights(self, fields):
+        return ', '.join(['2.0'] + ['1.0'] * (len(fields) - 1))
+
+    def search(self, model, fields, columns, tokens, limit):
+        table = table_name(model)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+                f'ORDER BY bm25({table}, {self.weights(fields)}) LIMIT %s',
+                [self.match_query(fields, columns, tokens), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def matches(self, model, fields, columns, tokens):
+        table = table_name(model)
+        return RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [self.match_query(fields, columns, tokens)]
+        )
+
+    def rank_expression(self, model, ids):
+        # Position of the row's pk in ",3,17,5," - one parameter however long
+        # the list; NULL for rows outside it.
+        return RawSQL(
+            f"NULLIF(instr(%s, ',' || {pk_column(model)} || ','), 0)", [f',{",".join(map(str, ids))},']
+        )
+
+
+class PostgresBackend:
+    def install(self, model, fields):
+        table = table_name(model)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} '
+                f'(object_id bigint PRIMARY KEY, vector tsvector NOT NULL)'
+            )
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {table}_vector ON {table} USING GIN (vector)')
+
+    def weight(self, fields, field):
+        # Fields are labelled A, B, C, D in order (the fifth and later share D),
+        # so earlier fields rank higher and a query can be limited to some of them.
+        return 'ABCD'[min(fields.index(field), 3)]
+
+    def vector_sql(self, fields):
+        parts = [f"setweight(to_tsvector('simple', %s), '{self.weight(fields, field)}')" for field in fields]
+        return ' || '.join(parts)
+
+    def index(self, model, fields, rows):
+        table = table_name(model)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {table} (object_id, vector) VALUES (%s, {self.vector_sql(fields)}) '
+                f'ON CONFLICT (object_id) DO UPDATE SET vector = EXCLUDED.vector',
+                [(pk, *values) for pk, values in rows],
+            )
+
+    def remove(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table_name(model)} WHERE object_id = %s', [pk])
+
+    def drop(self, model):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {table_name(model)}')
+
+    def match_query(self, fields, columns, tokens):
+        labels = ''
+        if list(columns) != list(fields):
+            labels = ''.join(sorted({self.weight(fields, column) for column in columns}))
+        terms = [f'{token}:{labels}' if labels else token for token in tokens[:-1]]
+        return ' & '.join(terms + [f'{tokens[-1]}:*{labels}'])
+
+    def search(self, model, fields, columns, tokens, limit):
+        table = table_name(model)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT object_id FROM {table}, to_tsquery('simple', %s) query "
+                f'WHERE vector @@ query ORDER BY ts_rank(vector, query) DESC LIMIT %s',
+                [self.match_query(fields, columns, tokens), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def matches(self, model, fields, columns, tokens):
+        table = table_name(model)
+        return RawSQL(
+            f"SELECT object_id FROM {table} WHERE vector @@ to_tsquery('simple', %s)",
+            [self.match_query(fields, columns, tokens)],
+        )
+
+    def rank_expression(self, model, ids):
+        return RawSQL(f'array_position(%s::bigint[], {pk_column(model)})', [list(ids)])
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend():
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+def document(instance, fields):
+    return [normalize(getattr(instance, field, '')) for field in fields]
+
+
+def index_instances(model, instances):
+    fields = indexed_fields(model)
+    backend = get_backend()
+    if fields and backend:
+        backend.index(model, fields, ((obj.pk, document(obj, fields)) for obj in instances))
+
+
+def rebuild(model, batch_size=2000):
+    """Re-index every row of ``model``. Returns the number of rows indexed."""
+    fields = indexed_fields(model)
+    backend = get_backend()
+    if not fields or not backend:
+        return 0
+    # Recreate rather than empty, in case the indexed fields changed.
+    backend.drop(model)
+    backend.install(model, fields)
+    count = 0
+    batch = []
+    for obj in model._default_manager.only('pk', *fields).iterator(chunk_size=batch_size):
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            index_instances(model, batch)
+            count += len(batch)
+            batch = []
+    index_instances(model, batch)
+    return count + len(batch)
+
+
+def search(model, query, limit=None, columns=None):
+    """Primary keys of the ``limit`` best rows of ``model`` matching ``query``.
+
+    ``columns`` limits the match to some of the indexed fields. Returns
+    ``None`` when full-text search is unavailable for the model, so callers
+    can fall back to ``icontains``. To filter a queryset use
+    ``filter_queryset``, which has no limit.
+    """
+    fields = indexed_fields(model)
+    backend = get_backend()
+    if not fields or not backend:
+        return None
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    limit = limit or getattr(settings, 'SEARCH_MAX_RESULTS', 500)
+    return backend.search(model, fields, columns or fields, tokens, limit)
+
+
+def filter_queryset(queryset, query, columns=None, order=True):
+    """``queryset`` restricted to rows matching ``query``, best first if ``order``.
+
+    The match is a subquery on the index, so the database combines it with
+    the queryset's own filters and no row is left out. Ranking is computed
+    for the best ``SEARCH_MAX_RESULTS`` rows of the whole index; matching
+    rows outside them follow, newest first. Returns ``None`` when full-text
+    search is unavailable for the model.
+    """
+    model = queryset.model
+    fields = indexed_fields(model)
+    backend = get_backend()
+    if not fields or not backend:
+        return None
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none()
+    columns = columns or fields
+    queryset = queryset.filter(pk__in=backend.matches(model, fields, columns, tokens))
+    if order:
+        limit = getattr(settings, 'SEARCH_MAX_RESULTS', 500)
+        ranked = backend.search(model, fields, columns, tokens, limit)
+        if ranked:
+            queryset = queryset.order_by(backend.rank_expression(model, ranked).asc(nulls_last=True), '-pk')
+    return queryset
+
+
+def install(app_config, **kwargs):
+    """``post_migrate`` hook: create the index tables of the migrated app."""
+    backend = get_backend()
+    if backend is None:
+        return
+    for label, fields in get_config().items():
+        model = apps.get_model(label)
+        if model._meta.app_label == app_config.label:
+            backend.install(model, fields)
+
+
+def _safely(func, *args):
+    # A stale index must never fail the write that triggered it;
+    # rebuild_search_index repairs it.
+    try:
+        func(*args)
+    except DatabaseError:
+        logger.exception('Search index update failed for %s', args[0]._meta.label)
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: _safely(index_instances, sender, [instance]))
+
+
+def _on_delete(sender, instance, **kwargs):
+    backend = get_backend()
+    if backend:
+        pk = instance.pk
+        transaction.on_commit(lambda: _safely(backend.remove, sender, pk))
+
+
+def connect_signals():
+    for label in get_config():
+        model = apps.get_model(label)
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'search-save-{label}')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'search-delete-{label}')
+
+
+class FullTextSearchFilter(SearchFilter):
+    """``SearchFilter`` that uses the full-text index when there is one."""
+
+    def get_search_columns(self, view, request, model):
+        """Indexed fields of ``model`` that the view lists in ``search_fields``."""
+        prefixes = ''.join(self.lookup_prefixes)
+        listed = {field.lstrip(prefixes) for field in self.get_search_fields(view, request) or ()}
+        return [field for field in indexed_fields(model) or () if field in listed]
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        columns = self.get_search_columns(view, request, queryset.model)
+        if not columns:
+            return super().filter_queryset(request, queryset, view)
+        order = not request.query_params.get('ordering')
+        filtered = filter_queryset(queryset, ' '.join(terms), columns, order=order)
+        if filtered is None:
+            return super().filter_queryset(request, queryset, view)
+        return filtered
@@ -0,0 +1,174 @@
+"""
+Core App - Data Seeding
+
+Fast ``bulk_create`` factories used by benchmarks and query-budget checks.
+Only ever run against a scratch database.
+"""
+
+import datetime
+from itertools import islice
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+
+from blog.models import BlogPost
+from chats.models import ChatMessage, ChatSession
+from invoices.models import Invoice
+from orders.models import ServiceOrder
+from portfolio.models import PortfolioImage, PortfolioItem
+from reviews.models import Review
+
+User = get_user_model()
+
+# Row counts of ``seed_dataset(scale=1)``: production-like volumes.
+VOLUMES = {
+    'users': 5000,
+    'portfolio': 10000,         # with 5 gallery images each
+    'blog': 2000,
+    'reviews': 50000,
+    'orders': 100000,           # every other one invoiced
+    'chat_sessions': 20000,
+    'chat_messages': 1000000,
+}
+
+
+def bulk_insert(model, objects, batch_size=5000):
+    """``bulk_create`` a (lazy) iterable in chunks, never holding it all in memory."""
+    objects = iter(objects)
+    count = 0
+    while True:
+        chunk = list(islice(objects, batch_size))
+        if not chunk:
+            return count
+        model.objects.bulk_create(chunk, batch_size=batch_size)
+        count += len(chunk)
+
+
+def seed_user(email='seed@example.com', **extra):
+    extra.setdefault('full_name', 'Seed User')
+    return User.objects.create_user(username=email, email=email, password='seed-password', **extra)
+
+
+def seed_portfolio(count, images_per_item=5, featured_every=3):
+    items = PortfolioItem.objects.bulk_create(
+        (
+            PortfolioItem(
+                title=f'پروژه {i}',
+                description=f'توضیحات پروژه بازسازی شماره {i}',
+                location='تهران',
+                is_featured=(i % featured_every == 0),
+            )
+            for i in range(count)
+        ),
+        batch_size=2000,
+    )
+    bulk_insert(PortfolioImage, (
+        PortfolioImage(portfolio=item, image=f'portfolio/gallery/{item.pk}-{n}.jpg', order=n)
+        for item in items
+        for n in reversed(range(images_per_item))
+    ))
+    return items
+
+
+def seed_users(count, prefix='user'):
+    return User.objects.bulk_create(
+        (
+            User(username=f'{prefix}{i}@example.com', email=f'{prefix}{i}@example.com',
+                 full_name=f'کاربر {i}', password='!')
+            for i in range(count)
+        ),
+        batch_size=2000,
+    )
+
+
+def seed_blog(count, authors):
+    return BlogPost.objects.bulk_create(
+        BlogPost(
+            title=f'مقاله {i}', slug=f'post-{i}', author=authors[i % len(authors)],
+            content=f'محتوای آموزشی بازسازی شماره {i}', cover_image='blog/covers/seed.jpg',
+        )
+        for i in range(count)
+    )
+
+
+def seed_reviews(count, users, projects):
+    return bulk_insert(Review, (
+        Review(
+            user=users[i % len(users)], project=projects[i % len(projects)],
+            rating=i % 5 + 1, comment=f'نظر شماره {i}', is_verified=(i % 4 != 0),
+        )
+        for i in range(count)
+    ))
+
+
+def seed_orders(count, users):
+    statuses = ServiceOrder.Status.values
+    return ServiceOrder.objects.bulk_create(
+        (
+            ServiceOrder(
+                user=users[i % len(users)], service_title=f'سرویس {i % 12}',
+                full_name=users[i % len(users)].full_name, phone='09120000000',
+                description=f'درخواست شماره {i}', status=statuses[i % len(statuses)],
+            )
+            for i in range(count)
+        ),
+        batch_size=2000,
+    )
+
+
+def seed_invoices(orders):
+    return bulk_insert(Invoice, (
+        Invoice(
+            order=order, invoice_number=f'INV-{order.pk:08d}', amount=1000000,
+            tax_amount=90000, final_amount=1090000, due_date=datetime.date.today(),
+        )
+        for order in orders
+    ))
+
+
+def seed_chats(sessions, messages, users):
+    """``sessions`` chat sessions spread over ``users``, ``messages`` messages spread over the sessions."""
+    created = ChatSession.objects.bulk_create(
+        (ChatSession(user=users[i % len(users)], title=f'گفتگو {i}') for i in range(sessions)),
+        batch_size=2000,
+    )
+    ids = [session.pk for session in created]
+    roles = ('user', 'model')
+    return created, bulk_insert(ChatMessage, (
+        ChatMessage(session_id=ids[i % len(ids)], role=roles[i % 2], text=f'پیام شماره {i} درباره بازسازی')
+        for i in range(messages)
+    ))
+
+
+def seed_dataset(scale=1.0, log=None):
+    """Seed every app at ``VOLUMES`` times ``scale``. Returns the created users.
+    
+    ``users[0]`` owns a typical share of orders and chats. Derived data that
+    signals would normally maintain (rating aggregates, search index,
+    dashboard rollups) is rebuilt at the end.
+    """
+    from reviews.aggregates import rebuild as rebuild_ratings
+    from core import search
+    from stats.rollups import rebuild as rebuild_stats
+    
+    counts = {name: max(1, int(volume * scale)) for name, volume in VOLUMES.items()}
+    log = log or (lambda message: None)
+    users = seed_users(counts['users'], prefix='bench')
+    log(f"{counts['users']} users")
+    projects = seed_portfolio(counts['portfolio'])
+    log(f"{counts['portfolio']} portfolio items with galleries")
+    seed_blog(counts['blog'], users[:20])
+    seed_reviews(counts['reviews'], users, projects)
+    rebuild_ratings()
+    log(f"{counts['blog']} blog posts, {counts['reviews']} reviews")
+    orders = seed_orders(counts['orders'], users)
+    seed_invoices(orders[::2])
+    log(f"{counts['orders']} orders, {len(orders[::2])} invoices")
+    seed_chats(counts['chat_sessions'], counts['chat_messages'], users)
+    log(f"{counts['chat_sessions']} chat sessions, {counts['chat_messages']} messages")
+    for label in search.get_config():
+        search.rebuild(apps.get_model(label))
+    log('search index rebuilt')
+    rebuild_stats()
+    log('dashboard rollups rebuilt')
+    return users
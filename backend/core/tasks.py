@@ -0,0 +1,26 @@
+"""
+Core App - Celery Tasks
+"""
+
+from celery import shared_task
+from django.apps import apps
+
+from . import images, view_counter
+
+
+@shared_task
+def flush_view_counts():
+    """Write buffered view counts (scheduled by Celery beat)."""
+    return view_counter.flush()
+
+
+@shared_task
+def generate_image_derivatives(label, pk, field):
+    """Render responsive copies of one uploaded image and attach the manifest."""
+    model = apps.get_model(label)
+    name = model._default_manager.filter(pk=pk).values_list(field, flat=True).first()
+    if not name:
+        return None
+    manifest = images.derive(name)
+    images.save_manifest(model, pk, field, name, manifest)
+    return manifest['digest']
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import ResponseCacheStatsView, metrics_view
+
+urlpatterns = [
+    path('cache-stats/', ResponseCacheStatsView.as_view(), name='response-cache-stats'),
+    path('metrics/', metrics_view, name='metrics'),
+]
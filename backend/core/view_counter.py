@@ -0,0 +1,181 @@
+"""
+Core App - Buffered View Counters
+
+Detail endpoints call ``record_view(instance)`` instead of issuing their own
+``UPDATE ... SET view_count = view_count + 1``. For models listed in
+``settings.VIEW_COUNTER['MODELS']`` the increment is only buffered (in process
+memory or in a Redis hash) and ``flush()`` later writes every pending count of
+a model in a single UPDATE. Models that are not listed keep the synchronous
+update.
+"""
+
+import atexit
+import logging
+import threading
+import uuid
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Case, F, When
+
+DEFAULTS = {
+    'BACKEND': 'memory',        # 'memory' or 'redis'
+    'MODELS': [],               # model labels, e.g. 'blog.BlogPost'
+    'FIELD': 'view_count',
+    'FLUSH_INTERVAL': 10,       # seconds, used by the in-process flusher
+    'REDIS_URL': 'redis://localhost:6379/0',
+}
+
+logger = logging.getLogger(__name__)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'VIEW_COUNTER', {}))
+    return config
+
+
+class MemoryBuffer:
+    """Per-process buffer. Each gunicorn worker flushes its own counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(Counter)
+
+    def add(self, label, pk, amount=1):
+        with self._lock:
+            self._counts[label][pk] += amount
+
+    def drain(self, labels):
+        with self._lock:
+            drained, self._counts = self._counts, defaultdict(Counter)
+        return {label: dict(counts) for label, counts in drained.items() if counts}
+
+
+class RedisBuffer:
+    """Buffer shared by all workers, stored as one Redis hash per model."""
+
+    key_prefix = 'viewcounts:'
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def add(self, label, pk, amount=1):
+        self._client.hincrby(self.key_prefix + label, pk, amount)
+
+    def drain(self, labels):
+        import redis
+        drained = {}
+        for label in labels:
+            key = self.key_prefix + label
+            # RENAME is atomic, so increments arriving during the flush land
+            # in a fresh hash instead of being lost.
+            flushing = f'{key}:flushing:{uuid.uuid4().hex}'
+            try:
+                self._client.rename(key, flushing)
+            except redis.ResponseError:
+                continue  # nothing buffered for this model
+            counts = self._client.hgetall(flushing)
+            self._client.delete(flushing)
+            if counts:
+                drained[label] = {int(pk): int(amount) for pk, amount in counts.items()}
+        return drained
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_flusher = None
+
+
+def get_buffer():
+    global _buffer
+    config = get_config()
+    buffer_class = RedisBuffer if config['BACKEND'] == 'redis' else MemoryBuffer
+    with _buffer_lock:
+        if not isinstance(_buffer, buffer_class):
+            _buffer = RedisBuffer(config['REDIS_URL']) if buffer_class is RedisBuffer else MemoryBuffer()
+        return _buffer
+
+
+def is_buffered(model):
+    return model._meta.label in get_config()['MODELS']
+
+
+def record_view(instance):
+    """Count one view of ``instance``, buffered if its model is enabled."""
+    model = type(instance)
+    field = get_config()['FIELD']
+    if not is_buffered(model):
+        model._default_manager.filter(pk=instance.pk).update(**{field: F(field) + 1})
+        return
+    get_buffer().add(model._meta.label, instance.pk)
+    _ensure_flusher()
+
+
+def flush():
+    """Write all buffered counts. Returns the number of rows updated."""
+    config = get_config()
+    buffer = get_buffer()
+    field = config['FIELD']
+    updated = 0
+    for label, counts in buffer.drain(config['MODELS']).items():
+        model = apps.get_model(label)
+        # Group rows by increment so the CASE stays short on busy pages.
+        by_amount = defaultdict(list)
+        for pk, amount in counts.items():
+            by_amount[amount].append(pk)
+        whens = [When(pk__in=pks, then=F(field) + amount) for amount, pks in by_amount.items()]
+        try:
+            updated += model._default_manager.filter(pk__in=list(counts)).update(
+                **{field: Case(*whens, default=F(field), output_field=model._meta.get_field(field))}
+            )
+        except Exception:
+            # Put the counts back so the next flush can retry them.
+            for pk, amount in counts.items():
+                buffer.add(label, pk, amount)
+            raise
+    return updated
+
+
+class _Flusher(threading.Thread):
+    """Background thread that flushes the in-process buffer periodically."""
+
+    def __init__(self, interval):
+        super().__init__(name='view-counter-flusher', daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                flush()
+            except Exception:
+                logger.exception('View count flush failed')
+            finally:
+                close_old_connections()
+
+
+def _ensure_flusher():
+    """Start the flusher for the memory backend; Redis is flushed by Celery beat."""
+    global _flusher
+    config = get_config()
+    if config['BACKEND'] != 'memory' or not config['FLUSH_INTERVAL']:
+        return
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _buffer_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = _Flusher(config['FLUSH_INTERVAL'])
+            _flusher.start()
+
+
+@atexit.register
+def _flush_on_exit():
+    if isinstance(_buffer, MemoryBuffer):
+        try:
+            flush()
+        except Exception:
+            logger.exception('View count flush at exit failed')
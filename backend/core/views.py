@@ -0,0 +1,39 @@
+"""
+Core App - Views
+"""
+
+import hmac
+
+from django.http import HttpResponse
+from rest_framework import views, permissions, response
+from . import metrics, response_cache
+
+
+class ResponseCacheStatsView(views.APIView):
+    """Hit/miss counters of the anonymous response cache (staff only)"""
+    
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return response.Response(response_cache.stats())
+    
+    def delete(self, request):
+        response_cache.reset_stats()
+        return response.Response(status=204)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; no database access.
+    
+    Open to ``METRICS['ALLOWED_IPS']`` and to requests carrying
+    ``Authorization: Bearer <METRICS['TOKEN']>``.
+    """
+    config = metrics.get_config()
+    token = config['TOKEN']
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = bool(token) and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+    if not authorized and request.META.get('REMOTE_ADDR') not in config['ALLOWED_IPS']:
+        return HttpResponse(status=403)
+    series, buckets = metrics.collect()
+    body = metrics.render(series, buckets, metrics.response_cache_lines())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
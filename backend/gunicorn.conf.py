@@ -0,0 +1,79 @@
+"""
+Gunicorn configuration for Hermes Saze Sabz.
+
+ASGI (default): the async chat, settings and portfolio views run natively
+and a worker keeps serving other requests while one waits on an upstream
+API or a streamed chat reply::
+
+    gunicorn -c gunicorn.conf.py
+
+WSGI: one request per sync worker, as before::
+
+    SERVER_MODE=wsgi gunicorn -c gunicorn.conf.py
+
+A sync worker is busy for the whole of every request it serves, so its
+concurrency is the worker count and the usual rule is ``2 * cores + 1``.
+An uvicorn worker multiplexes requests on one event loop, so one per core
+is enough; the memory freed by the fewer processes is what buys the extra
+concurrency (``manage.py bench_asgi`` measures it). Every setting below can
+be overridden from the environment.
+"""
+
+import multiprocessing
+import os
+
+mode = os.environ.get('SERVER_MODE', 'asgi')
+cores = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+if mode == 'asgi':
+    # Also set by hermes_backend.asgi, but only once a worker imports it.
+    os.environ.setdefault('ASYNC_VIEWS', 'True')
+    wsgi_app = 'hermes_backend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', cores))
+else:
+    wsgi_app = 'hermes_backend.wsgi:application'
+    worker_class = 'sync'
+    workers = int(os.environ.get('WEB_CONCURRENCY', 2 * cores + 1))
+
+# Sync workers are killed after ``timeout`` seconds on one request, which
+# also bounds streamed chat replies; the chat gateway's upstream timeout
+# is kept 5 seconds shorter so a slow model still gets its 502 instead of
+# a killed worker. Uvicorn workers only need to answer the arbiter's
+# heartbeat, so long streams are not cut off.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30 if mode == 'wsgi' else 60))
+if mode == 'wsgi':
+    os.environ.setdefault('CHAT_GATEWAY_TIMEOUT', str(max(timeout - 5, 1)))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then so slow leaks cannot grow unbounded.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Heartbeat files in memory instead of on a possibly slow disk.
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+# Request metrics: each worker writes a file to METRICS['DIRECTORY'] (see
+# core/metrics.py). Start from an empty directory, and fold the file of an
+# exited worker into the archive so a new worker reusing its PID does not
+# overwrite its counts. The master must not load the Django settings (the
+# workers would inherit them), so the directory comes from the environment
+# as in settings.py.
+metrics_dir = os.environ.get('METRICS_DIR', '/tmp/hermes-metrics')
+
+
+def on_starting(server):
+    from core import metrics
+    metrics.clear(metrics_dir)
+
+
+def child_exit(server, worker):
+    from core import metrics
+    metrics.archive(worker.pid, metrics_dir)
@@ -1 +1,4 @@
 # Hermes Backend Package
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -0,0 +1,14 @@
+"""
+ASGI config for Hermes Saze Sabz project.
+
+Served by gunicorn with uvicorn workers, see ``gunicorn.conf.py``. Unless
+``ASYNC_VIEWS`` is set explicitly, the async chat, settings and portfolio
+views are routed in this mode.
+"""
+
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hermes_backend.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+application = get_asgi_application()
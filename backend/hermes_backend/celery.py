@@ -0,0 +1,12 @@
+"""
+Celery application for Hermes Saze Sabz.
+"""
+
+import os
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hermes_backend.settings')
+
+app = Celery('hermes_backend')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
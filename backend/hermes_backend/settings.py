@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -30,11 +32,13 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     'drf_yasg',
     
     # Local apps
+    'core.apps.CoreConfig',
     'accounts.apps.AccountsConfig',
     'portfolio.apps.PortfolioConfig',
     'orders.apps.OrdersConfig',
@@ -44,19 +48,23 @@ INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'reviews.apps.ReviewsConfig',
     'invoices.apps.InvoicesConfig',
+    'notifications.apps.NotificationsConfig',
     'loyalty.apps.LoyaltyConfig',
+    'stats.apps.StatsConfig',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',  # first, so it times the whole stack
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.StaticFilesMiddleware',  # WhiteNoise, async-capable
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'accounts.middleware.ActivityLogMiddleware',
 ]
 
 ROOT_URLCONF = 'hermes_backend.urls'
@@ -78,6 +86,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hermes_backend.wsgi.application'
+ASGI_APPLICATION = 'hermes_backend.asgi.application'
+
+# Route the chat, settings and portfolio reads to their async views
+# (core/async_views.py). hermes_backend/asgi.py turns this on.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
 
 
 # Database
@@ -89,6 +102,39 @@ DATABASES = {
 }
 
 
+# Cache
+# Local memory per process by default; set REDIS_CACHE_URL to share the
+# cache between gunicorn workers.
+if os.environ.get('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_CACHE_URL'],
+        },
+        # Anonymous API responses (core/response_cache.py). Run Redis with
+        # maxmemory-policy allkeys-lru so the least recently used entries go first.
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_CACHE_URL'],
+            'KEY_PREFIX': 'responses',
+            'TIMEOUT': 300,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'hermes-default',
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'hermes-responses',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 2000},  # LRU beyond this
+        },
+    }
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -126,14 +172,14 @@ AUTH_USER_MODEL = 'accounts.CustomUser'
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'core.search.FullTextSearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -150,6 +196,23 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Cached user lookups for JWT requests (see accounts/authentication.py)
+AUTH_CACHE = {
+    # Dropped when the user is saved or deleted; that reaches other workers
+    # only on Redis, so with the LocMem cache rows live LOCAL_USER_TTL (5 s).
+    'USER_TTL': 5 * 60,
+    'TOKEN_TTL': 60,      # how long another process may take to see a revoked token
+}
+
+# Batched activity logging (see accounts/activity.py for all options)
+ACTIVITY_LOG = {
+    'MAX_QUEUE': 10000,     # entries held per process before requests start dropping them
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 5,
+    'RETENTION_DAYS': 180,
+    'TRUST_X_FORWARDED_FOR': os.environ.get('TRUST_X_FORWARDED_FOR', 'False') == 'True',
+}
+
 
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
@@ -180,3 +243,180 @@ SWAGGER_SETTINGS = {
         }
     }
 }
+
+
+# Celery Settings
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+# Tasks are queued for the workers unless this is set; manage.py sets it for
+# local development (runserver and the check/bench commands).
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'flush-view-counts': {
+        'task': 'core.tasks.flush_view_counts',
+        'schedule': 30.0,
+    },
+    'drain-notification-outbox': {
+        'task': 'notifications.tasks.drain_outbox',
+        'schedule': 15.0,
+    },
+    'prune-token-blacklist': {
+        'task': 'accounts.tasks.prune_token_blacklist',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'prune-user-activity': {
+        'task': 'accounts.tasks.prune_user_activity',
+        'schedule': crontab(hour=4, minute=30),
+    },
+    'recompute-loyalty-tiers': {
+        'task': 'loyalty.tasks.recompute_loyalty_tiers',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'extend-booking-calendar': {
+        'task': 'bookings.tasks.extend_booking_calendar',
+        'schedule': 6 * 60 * 60.0,
+    },
+    'refresh-recent-stats': {
+        'task': 'stats.tasks.refresh_recent_stats',
+        'schedule': 60 * 60.0,
+    },
+}
+
+
+# Buffered view counters (see core/view_counter.py)
+VIEW_COUNTER = {
+    'BACKEND': os.environ.get('VIEW_COUNTER_BACKEND', 'memory'),  # 'memory' or 'redis'
+    'MODELS': ['portfolio.PortfolioItem', 'blog.BlogPost'],
+    'FLUSH_INTERVAL': 10,
+    'REDIS_URL': os.environ.get('VIEW_COUNTER_REDIS_URL', CELERY_BROKER_URL),
+}
+
+
+# Query budgets enforced by `manage.py check_query_budgets` (see core/query_budget.py)
+QUERY_BUDGETS = [
+    {'url': 'portfolio-list', 'max_queries': 3},
+    {'url': 'portfolio-featured', 'max_queries': 2},
+    {'url': 'portfolio-detail', 'model': 'portfolio.PortfolioItem', 'max_queries': 2},
+    {'url': 'blog-list', 'max_queries': 2},
+    {'url': 'blog-detail', 'model': 'blog.BlogPost', 'max_queries': 1},
+    {'url': 'reviews-list', 'max_queries': 2},
+    {'url': 'site-settings', 'max_queries': 1},
+    {'url': 'invoices-list', 'staff': True, 'max_queries': 3},
+    {'url': 'admin:blog_blogpost_changelist', 'staff': True, 'max_queries': 5},
+    {'url': 'admin:reviews_review_changelist', 'staff': True, 'max_queries': 5},
+    {'url': 'admin:invoices_invoice_changelist', 'staff': True, 'max_queries': 5},
+    {'url': 'stats-dashboard', 'staff': True, 'max_queries': 5},
+]
+
+
+# Dashboard rollups (see stats/rollups.py); rebuild history with `manage.py rebuild_stats`
+STATS = {
+    'REFRESH_DAYS': 3,
+    'CHUNK_DAYS': 31,
+}
+
+
+# Full-text search (see core/search.py). Fields are listed most important
+# first; the first one is weighted higher when ranking.
+SEARCH_INDEXES = {
+    'portfolio.PortfolioItem': ['title', 'description', 'location'],
+    'blog.BlogPost': ['title', 'content', 'tags'],
+    'orders.ServiceOrder': ['service_title', 'full_name', 'phone', 'description'],
+    'accounts.CustomUser': ['full_name', 'email', 'phone'],
+}
+SEARCH_MAX_RESULTS = 500
+
+
+# Chat replies streamed by `add_message?stream=1`: dotted path to
+# callable(session, user_message) returning an iterable of text chunks.
+# 'chats.gateway.reply_generator' answers through the model gateway below.
+CHAT_REPLY_GENERATOR = os.environ.get('CHAT_REPLY_GENERATOR') or None
+
+# Server-side model gateway behind `api/chats/<id>/ask/` (see chats/gateway.py for all options)
+CHAT_GATEWAY = {
+    'API_URL': os.environ.get('GEMINI_API_URL', 'https://generativelanguage.googleapis.com/v1beta'),
+    'API_KEY': os.environ.get('GEMINI_API_KEY', ''),
+    'MODEL': os.environ.get('GEMINI_MODEL', 'gemini-3-flash-preview'),
+    # Below gunicorn's worker timeout on sync workers (gunicorn.conf.py sets it)
+    'TIMEOUT': int(os.environ.get('CHAT_GATEWAY_TIMEOUT', 60)),
+    'CACHE_SIZE': 500,
+    'CACHE_TTL': 60 * 60 * 6,
+    'DAILY_TOKEN_BUDGET': int(os.environ.get('CHAT_DAILY_TOKEN_BUDGET', 20000)),
+}
+
+
+# Booking calendar: how many days of DaySlot rows are kept materialized
+BOOKING_CALENDAR_DAYS = 60
+
+
+# Responsive image derivatives (see core/images.py)
+IMAGE_DERIVATIVES = {
+    'FIELDS': [
+        'portfolio.PortfolioImage.image',
+        'portfolio.PortfolioItem.cover_image',
+        'blog.BlogPost.cover_image',
+        'accounts.CustomUser.avatar',
+    ],
+    'WIDTHS': [320, 640, 1024, 1600],
+    'FORMATS': ['avif', 'webp'],
+}
+
+
+# Uploads stream to temporary files instead of memory, and portfolio images
+# are watermarked server-side (see portfolio/uploads.py)
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+IMAGE_WATERMARK = {
+    'TEXT': 'Hermes Saze Sabz | هرمس سازه سبز',
+    'FONT': os.environ.get('WATERMARK_FONT') or None,
+    'MAX_DIMENSION': 2560,
+    'WORKERS': int(os.environ['UPLOAD_WORKERS']) if os.environ.get('UPLOAD_WORKERS') else None,
+}
+
+
+# Anonymous response cache (see core/response_cache.py)
+RESPONSE_CACHE = {
+    'ALIAS': 'responses',
+    'TIMEOUT': 300,
+    # Saving or deleting one of these invalidates the responses built from it
+    'MODELS': [
+        'portfolio.PortfolioItem',
+        'portfolio.PortfolioImage',
+        'blog.BlogPost',
+        'reviews.Review',
+        'accounts.CustomUser',  # author and reviewer names and avatars
+    ],
+    # Only saves touching these fields invalidate (not logins' last_login)
+    'FIELDS': {
+        'accounts.CustomUser': ['full_name', 'avatar', 'avatar_variants'],
+    },
+}
+
+
+# Notification outbox (see notifications/outbox.py for all options)
+NOTIFICATIONS = {
+    'BATCH_SIZE': 100,
+    'RATE_LIMIT': (10, 60 * 60),  # per user: 10 messages an hour, the rest are deferred
+    'SMS_BACKEND': os.environ.get('SMS_BACKEND', 'notifications.delivery.ConsoleSMSBackend'),
+}
+
+
+# Loyalty points (see loyalty/ledger.py for all options)
+LOYALTY = {
+    'AMOUNT_PER_POINT': 100000,  # one point per 100,000 toman of paid invoices
+    'TIERS': [('PLATINUM', 20000), ('GOLD', 5000), ('SILVER', 1000)],
+    'TIER_WINDOW_DAYS': 365,
+    'REFERRAL_REWARDS': [200, 50, 20],  # per referral, to levels 1, 2 and 3 above the new member
+}
+
+
+# Per-endpoint request metrics, scraped from /api/core/metrics/ (see core/metrics.py)
+METRICS = {
+    # Shared by all gunicorn workers of this server; gunicorn.conf.py clears it on start.
+    'DIRECTORY': os.environ.get('METRICS_DIR', '/tmp/hermes-metrics'),
+    'TOKEN': os.environ.get('METRICS_TOKEN') or None,
+    # Scrapers must send the token. Behind a reverse proxy on the same host
+    # every request comes from 127.0.0.1, so trust loopback only in development.
+    'ALLOWED_IPS': ['127.0.0.1', '::1'] if DEBUG else [],
+}
@@ -7,6 +7,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from accounts.views import LogoutView
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
@@ -32,6 +33,7 @@ urlpatterns = [
     # JWT Authentication
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/logout/', LogoutView.as_view(), name='token_logout'),
     
     # API Endpoints
     path('api/users/', include('accounts.urls')),
@@ -44,6 +46,8 @@ urlpatterns = [
     path('api/reviews/', include('reviews.urls')),
     path('api/invoices/', include('invoices.urls')),
     path('api/loyalty/', include('loyalty.urls')),
+    path('api/core/', include('core.urls')),
+    path('api/stats/', include('stats.urls')),
     
     # Swagger Documentation
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Invoice
+
+
+@admin.register(Invoice)
+class InvoiceAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'final_amount', 'status', 'due_date', 'created_at']
+    list_filter = ['status']
+    list_select_related = ['order']
+    search_fields = ['invoice_number', 'order__full_name']
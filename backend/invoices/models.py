@@ -38,6 +38,9 @@ class Invoice(models.Model):
         verbose_name = 'فاکتور'
         verbose_name_plural = 'فاکتورها'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='invoice_created_idx'),
+        ]
         
     def __str__(self):
         return f"فاکتور {self.invoice_number} - {self.order.full_name}"
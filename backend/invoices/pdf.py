@@ -0,0 +1,188 @@
+"""
+Invoices App - PDF Rendering
+
+Invoices are rendered from a plain-data snapshot so the renderer can run in
+a Celery worker or a child process without touching the ORM. Output is
+stored under the SHA-256 of the snapshot (``invoices/ab/abcdef….pdf``); if
+nothing on the invoice or its order changed, the existing file is reused.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+try:
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+except ImportError:  # pragma: no cover - RTL shaping is optional
+    arabic_reshaper = None
+    get_display = None
+
+# Bump when the layout changes so existing PDFs are re-rendered.
+RENDERER_VERSION = 1
+
+FONT_NAME = 'InvoiceFont'
+FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/vazirmatn/Vazirmatn-Regular.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',
+]
+
+STATUS_LABELS = {
+    'PENDING': 'در انتظار پرداخت',
+    'PAID': 'پرداخت شده',
+    'OVERDUE': 'سررسید گذشته',
+    'CANCELLED': 'لغو شده',
+}
+
+_font = None
+
+
+def invoice_snapshot(invoice):
+    """Everything that appears on the PDF, as JSON-friendly values."""
+    order = invoice.order
+    return {
+        'invoice_number': invoice.invoice_number,
+        'status': invoice.status,
+        'amount': str(invoice.amount),
+        'tax_amount': str(invoice.tax_amount),
+        'discount_amount': str(invoice.discount_amount),
+        'final_amount': str(invoice.final_amount),
+        'due_date': invoice.due_date.isoformat(),
+        'paid_date': invoice.paid_date.isoformat() if invoice.paid_date else None,
+        'order': {
+            'id': order.pk,
+            'service_title': order.service_title,
+            'full_name': order.full_name,
+            'phone': order.phone,
+            'description': order.description or '',
+        },
+    }
+
+
+def content_hash(snapshot):
+    payload = json.dumps([RENDERER_VERSION, snapshot], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def storage_path(digest):
+    return f'invoices/{digest[:2]}/{digest}.pdf'
+
+
+def get_font():
+    """Register the first available TTF with Persian glyphs (falls back to Helvetica)."""
+    global _font
+    if _font is None:
+        _font = 'Helvetica'
+        configured = getattr(settings, 'INVOICE_PDF_FONT', None)
+        for path in ([configured] if configured else []) + FONT_CANDIDATES:
+            if path and os.path.exists(path):
+                pdfmetrics.registerFont(TTFont(FONT_NAME, path))
+                _font = FONT_NAME
+                break
+    return _font
+
+
+def rtl(text):
+    """Shape and reorder Persian text for left-to-right drawing."""
+    text = str(text)
+    if arabic_reshaper is None:
+        return text
+    return get_display(arabic_reshaper.reshape(text))
+
+
+def format_amount(value):
+    return f'{int(float(value)):,} تومان'
+
+
+def render_pdf(snapshot):
+    """Render one invoice snapshot to PDF bytes."""
+    font = get_font()
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(f'Invoice {snapshot["invoice_number"]}')
+    width, height = A4
+    right = width - 20 * mm
+    y = height - 25 * mm
+
+    def line(label, value, size=11, gap=8 * mm):
+        nonlocal y
+        pdf.setFont(font, size)
+        pdf.drawRightString(right, y, rtl(label))
+        pdf.drawString(20 * mm, y, rtl(value))
+        y -= gap
+
+    pdf.setFont(font, 18)
+    pdf.drawRightString(right, y, rtl('هرمس سازه سبز - فاکتور فروش'))
+    y -= 14 * mm
+
+    order = snapshot['order']
+    line('شماره فاکتور', snapshot['invoice_number'])
+    line('وضعیت', STATUS_LABELS.get(snapshot['status'], snapshot['status']))
+    line('تاریخ سررسید', snapshot['due_date'])
+    if snapshot['paid_date']:
+        line('تاریخ پرداخت', snapshot['paid_date'][:10])
+    y -= 4 * mm
+    line('نام مشتری', order['full_name'])
+    line('شماره تماس', order['phone'])
+    line('سرویس', order['service_title'])
+    y -= 4 * mm
+    pdf.line(20 * mm, y + 4 * mm, right, y + 4 * mm)
+    line('مبلغ کل', format_amount(snapshot['amount']))
+    line('مالیات', format_amount(snapshot['tax_amount']))
+    line('تخفیف', format_amount(snapshot['discount_amount']))
+    line('مبلغ قابل پرداخت', format_amount(snapshot['final_amount']), size=13)
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def render_snapshot(snapshot):
+    """Process-pool entry point: returns ``(digest, pdf_bytes)``."""
+    return content_hash(snapshot), render_pdf(snapshot)
+
+
+def store_pdf(digest, data):
+    """Save rendered bytes under their content address, once."""
+    path = storage_path(digest)
+    if not default_storage.exists(path):
+        path = default_storage.save(path, ContentFile(data))
+    return path
+
+
+def ensure_invoice_pdf(invoice):
+    """Make sure ``invoice.pdf_file`` matches its current content.
+
+    Returns the storage path. Nothing is rendered if the current content
+    hash already has a stored file.
+    """
+    snapshot = invoice_snapshot(invoice)
+    digest = content_hash(snapshot)
+    path = storage_path(digest)
+    if not default_storage.exists(path):
+        path = store_pdf(digest, render_pdf(snapshot))
+    if invoice.pdf_file.name != path:
+        invoice.pdf_file.name = path
+        type(invoice).objects.filter(pk=invoice.pk).update(pdf_file=path)
+    return path
+
+
+def invoice_digest(invoice):
+    return content_hash(invoice_snapshot(invoice))
+
+
+def is_current(invoice, digest=None):
+    """True if ``invoice.pdf_file`` already holds the latest rendering."""
+    path = storage_path(digest or invoice_digest(invoice))
+    return invoice.pdf_file.name == path and default_storage.exists(path)
@@ -11,3 +11,4 @@ class InvoiceSerializer(serializers.ModelSerializer):
         model = Invoice
         fields = '__all__'
         read_only_fields = ['id', 'invoice_number', 'pdf_file', 'created_at', 'updated_at']
+        select_related = ['order']
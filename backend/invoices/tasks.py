@@ -0,0 +1,15 @@
+"""
+Invoices App - Celery Tasks
+"""
+
+from celery import shared_task
+
+from .models import Invoice
+from .pdf import ensure_invoice_pdf
+
+
+@shared_task
+def generate_invoice_pdf(invoice_id):
+    """Render (or reuse) the PDF for one invoice and return its storage path."""
+    invoice = Invoice.objects.select_related('order').get(pk=invoice_id)
+    return ensure_invoice_pdf(invoice)
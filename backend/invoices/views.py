@@ -2,29 +2,67 @@
 Invoices App - Views
 """
 
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.mixins import RelatedFieldsMixin
 from .models import Invoice
 from .serializers import InvoiceSerializer
-# In a real app, import ReportLab or similar for PDF generation
+from .pdf import invoice_digest, is_current
+from .tasks import generate_invoice_pdf
+
+# How long a queued render is waited for before polling queues another.
+RENDER_WAIT = 5 * 60
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(RelatedFieldsMixin, viewsets.ModelViewSet):
     """Invoice CRUD"""
     
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    implicit_filters = [[], ['order']]  # order__user joins through the unique order_id
     
     def get_queryset(self):
+        queryset = super().get_queryset()
         if self.request.user.is_staff:
-            return Invoice.objects.all()
-        return Invoice.objects.filter(order__user=self.request.user)
+            return queryset
+        return queryset.filter(order__user=self.request.user)
+    
+    # Atomic so invoice changes and their outbox notifications commit together.
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save()
+    
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
     
     @action(detail=True, methods=['get'])
     def generate_pdf(self, request, pk=None):
-        """Generate Invoice PDF"""
+        """Generate Invoice PDF (rendered in the background)"""
         invoice = self.get_object()
-        # Mock PDF generation
-        return Response({'message': 'PDF generated successfully', 'url': '/media/invoices/mock.pdf'})
+        digest = invoice_digest(invoice)
+        if not is_current(invoice, digest):
+            # One render per invoice content; polls while it runs get its task id.
+            key = f'invoice-pdf:{invoice.pk}:{digest}'
+            task_id = uuid.uuid4().hex
+            if cache.add(key, task_id, RENDER_WAIT):
+                result = generate_invoice_pdf.apply_async((invoice.pk,), task_id=task_id)
+                ready = result.ready()
+            else:
+                task_id, ready = cache.get(key, task_id), False
+            if not ready:
+                return Response(
+                    {'message': 'در حال تولید فایل PDF', 'task_id': task_id},
+                    status=status.HTTP_202_ACCEPTED
+                )
+            invoice.refresh_from_db(fields=['pdf_file'])
+        return Response({
+            'message': 'PDF generated successfully',
+            'url': request.build_absolute_uri(invoice.pdf_file.url)
+        })
@@ -0,0 +1,29 @@
+from django.contrib import admin
+from .models import LoyaltyPoints, PointTransaction
+
+
+@admin.register(LoyaltyPoints)
+class LoyaltyPointsAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'current_tier', 'referral_code', 'updated_at']
+    list_filter = ['current_tier']
+    list_select_related = ['user']
+    # referred_by changes go through loyalty.referrals so the closure table follows.
+    readonly_fields = ['total_points', 'current_tier', 'referral_code', 'referred_by']
+
+
+@admin.register(PointTransaction)
+class PointTransactionAdmin(admin.ModelAdmin):
+    """The ledger is append-only: entries are never edited or deleted here."""
+    
+    list_display = ['__str__', 'user', 'kind', 'points', 'balance', 'created_at']
+    list_filter = ['kind']
+    list_select_related = ['user']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
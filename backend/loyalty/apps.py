@@ -5,3 +5,6 @@ class LoyaltyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'loyalty'
     verbose_name = 'باشگاه مشتریان'
+
+    def ready(self):
+        from . import receivers  # noqa: F401  (awards points for paid invoices)
@@ -0,0 +1,34 @@
+"""
+Loyalty App - Referral Codes
+
+A referral code is the user's primary key run through a fixed bijection
+of the 45-bit space and written in Crockford-style base32 (no 0/O/1/I)::
+
+    code = base32((user_id * MULTIPLIER + OFFSET) mod 2**45)
+
+Distinct users always get distinct codes, so there is nothing to retry
+and no uniqueness lookup before saving; neighbouring ids still produce
+unrelated-looking codes. New codes are 9 characters long and can never
+clash with the 8-character codes issued before.
+"""
+
+ALPHABET = '23456789ABCDEFGHJKLMNPQRSTUVWXYZ'
+LENGTH = 9
+BITS = 5 * LENGTH
+MODULUS = 1 << BITS
+# Odd, so multiplication is invertible modulo a power of two. Never change
+# these: codes already handed out would stop matching their users.
+MULTIPLIER = 0x1B873593A1D
+OFFSET = 0x0C2B2AE3D27
+
+
+def referral_code(user_id):
+    """The referral code of ``user_id`` (unique for ids below 2**45)."""
+    if not 0 < user_id < MODULUS:
+        raise ValueError(f'user id {user_id} out of range for referral codes')
+    value = (user_id * MULTIPLIER + OFFSET) % MODULUS
+    chars = []
+    for _ in range(LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
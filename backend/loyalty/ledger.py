@@ -0,0 +1,159 @@
+"""
+Loyalty App - Points Ledger
+
+Points only ever change by appending a ``PointTransaction``. Each entry
+takes the next per-user ``sequence`` and stores the balance after it::
+
+    INSERT INTO loyalty_pointtransaction (user_id, sequence, points, balance, ...)
+    VALUES (%s, last_sequence + 1, %s, last_balance + %s, ...)
+
+Two awards racing for the same user collide on the unique
+``(user, sequence)`` pair; the loser re-reads the latest entry and tries
+again. Nothing is locked, so different users never wait for each other.
+``LoyaltyPoints.total_points`` mirrors the latest balance and only moves
+forward (``last_sequence``), so reading a balance is one row whatever the
+length of the history.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .codes import referral_code
+from .models import LoyaltyPoints, PointTransaction
+
+DEFAULTS = {
+    'AMOUNT_PER_POINT': 100000,         # toman of a paid invoice per point
+    'TIERS': [                          # points earned within the window -> tier
+        ('PLATINUM', 20000),
+        ('GOLD', 5000),
+        ('SILVER', 1000),
+    ],
+    'TIER_WINDOW_DAYS': 365,
+    'TIER_BATCH_SIZE': 1000,
+    'MAX_RETRIES': 20,                  # sequence collisions tolerated per entry
+    'REFERRAL_REWARDS': [200, 50, 20],  # points to the referrer, their referrer, ...
+}
+
+
+class InsufficientPoints(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'امتیاز کافی ندارید'
+    default_code = 'insufficient_points'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LOYALTY', {}))
+    return config
+
+
+def get_account(user):
+    account, _ = LoyaltyPoints.objects.get_or_create(
+        user=user, defaults={'referral_code': referral_code(user.pk)}
+    )
+    return account
+
+
+def latest(user_id):
+    """``(sequence, balance)`` of the user's newest entry."""
+    row = (
+        PointTransaction.objects.filter(user_id=user_id)
+        .order_by('-sequence').values_list('sequence', 'balance').first()
+    )
+    return row or (0, 0)
+
+
+def post(user, kind, points, description='', source=None):
+    """Append one entry and return it.
+    
+    With ``source`` the entry is idempotent: ``None`` is returned if that
+    source was already credited. Raises ``InsufficientPoints`` rather than
+    let the balance go negative.
+    """
+    get_account(user)
+    for _ in range(get_config()['MAX_RETRIES']):
+        sequence, balance = latest(user.pk)
+        if balance + points < 0:
+            raise InsufficientPoints()
+        try:
+            with transaction.atomic():
+                entry = PointTransaction.objects.create(
+                    user=user, sequence=sequence + 1, kind=kind, points=points,
+                    balance=balance + points, description=description, source=source
+                )
+        except IntegrityError:
+            if source and PointTransaction.objects.filter(source=source).exists():
+                return None
+            continue
+        LoyaltyPoints.objects.filter(user=user, last_sequence__lt=entry.sequence).update(
+            total_points=entry.balance, last_sequence=entry.sequence, updated_at=timezone.now()
+        )
+        return entry
+    raise IntegrityError(f'Could not append a points entry for user {user.pk}')
+
+
+def earn(user, points, description='', source=None):
+    return post(user, PointTransaction.Kind.EARN, points, description, source)
+
+
+def redeem(user, points, description=''):
+    return post(user, PointTransaction.Kind.REDEEM, -points, description)
+
+
+def expire(user, points, description=''):
+    return post(user, PointTransaction.Kind.EXPIRE, -points, description)
+
+
+def referral_bonus(user, points, description='', source=None):
+    return post(user, PointTransaction.Kind.REFERRAL, points, description, source)
+
+
+def points_for_amount(amount):
+    return int(amount) // get_config()['AMOUNT_PER_POINT']
+
+
+def tier_for(earned, tiers):
+    for tier, threshold in tiers:
+        if earned >= threshold:
+            return tier
+    return LoyaltyPoints.Tier.BRONZE
+
+
+def recompute_tiers(batch_size=None):
+    """Re-derive every account's tier from points earned in the window.
+    
+    Accounts are walked in primary-key batches; each batch costs one
+    aggregate query plus at most one UPDATE per tier. Returns the number
+    of accounts whose tier changed.
+    """
+    config = get_config()
+    batch_size = batch_size or config['TIER_BATCH_SIZE']
+    since = timezone.now() - timedelta(days=config['TIER_WINDOW_DAYS'])
+    earning = [PointTransaction.Kind.EARN, PointTransaction.Kind.REFERRAL]
+    changed = 0
+    last_pk = 0
+    while True:
+        accounts = list(
+            LoyaltyPoints.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'user_id')[:batch_size]
+        )
+        if not accounts:
+            return changed
+        last_pk = accounts[-1][0]
+        user_ids = [user_id for _, user_id in accounts]
+        earned = dict(
+            PointTransaction.objects.filter(user_id__in=user_ids, kind__in=earning, created_at__gte=since)
+            .values('user_id').annotate(total=Sum('points')).values_list('user_id', 'total')
+        )
+        groups = {}
+        for user_id in user_ids:
+            groups.setdefault(tier_for(earned.get(user_id, 0), config['TIERS']), []).append(user_id)
+        for tier, members in groups.items():
+            changed += LoyaltyPoints.objects.filter(user_id__in=members).exclude(current_tier=tier).update(
+                current_tier=tier, updated_at=timezone.now()
+            )
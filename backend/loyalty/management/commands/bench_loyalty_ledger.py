@@ -0,0 +1,103 @@
+"""
+Concurrency and read-cost check for the loyalty points ledger.
+
+    python manage.py bench_loyalty_ledger --users 20 --awards 2000 --concurrency 8
+
+Awards points from parallel threads, then checks that every user's entries
+are numbered without gaps or duplicates, that the balance snapshot equals
+the ledger sum, that racing redemptions never overdraw, that reading a
+balance is one query, and times the batched tier recalculation.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max, Sum
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmarks import benchmark_database, format_summary, run_concurrent
+from loyalty import ledger
+from loyalty.models import LoyaltyPoints, PointTransaction
+
+
+class Command(BaseCommand):
+    help = 'Race parallel point awards and redemptions and verify the ledger stays consistent'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--awards', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            User = get_user_model()
+            users = User.objects.bulk_create(
+                User(username=f'points{i}@example.com', email=f'points{i}@example.com', full_name=f'کاربر {i}')
+                for i in range(options['users'])
+            )
+            for user in users:
+                ledger.get_account(user)
+
+            expected = defaultdict(int)
+            lock = threading.Lock()
+
+            def award(i):
+                user = users[i % len(users)]
+                points = i % 50 + 1
+                ledger.earn(user, points, source=f'bench:{i}')
+                with lock:
+                    expected[user.pk] += points
+
+            summary = run_concurrent(award, options['awards'], options['concurrency'])
+            self.stdout.write(format_summary('concurrent awards', summary))
+            self.check_ledger(expected)
+
+            # Everyone races to spend more than one user holds in total.
+            target = users[0]
+            balance = LoyaltyPoints.objects.get(user=target).total_points
+            spend = max(1, balance // 10)
+            refused = []
+
+            def spend_points(i):
+                try:
+                    ledger.redeem(target, spend)
+                except ledger.InsufficientPoints:
+                    refused.append(i)
+
+            attempts = 20
+            run_concurrent(spend_points, attempts, options['concurrency'])
+            expected[target.pk] -= spend * (attempts - len(refused))
+            self.check_ledger(expected)
+            self.stdout.write(f'redemptions: {attempts - len(refused)} accepted, {len(refused)} refused')
+
+            with CaptureQueriesContext(connection) as queries:
+                ledger.get_account(target).total_points
+            if len(queries) != 1:
+                raise CommandError(f'Balance read took {len(queries)} queries')
+
+            started = time.perf_counter()
+            changed = ledger.recompute_tiers(batch_size=max(1, len(users) // 4))
+            elapsed = time.perf_counter() - started
+            tiers = dict(LoyaltyPoints.objects.values_list('current_tier').annotate(n=Count('pk')))
+            self.stdout.write(f'tiers recomputed in {elapsed * 1000:.1f} ms, {changed} changed: {tiers}')
+        self.stdout.write(self.style.SUCCESS('Ledger consistent'))
+
+    def check_ledger(self, expected):
+        rows = PointTransaction.objects.values('user_id').annotate(
+            n=Count('pk'), last=Max('sequence'), total=Sum('points')
+        )
+        snapshots = dict(LoyaltyPoints.objects.values_list('user_id', 'total_points'))
+        for row in rows:
+            user_id = row['user_id']
+            if row['n'] != row['last']:
+                raise CommandError(f'user {user_id}: {row["n"]} entries but last sequence {row["last"]}')
+            latest_balance = ledger.latest(user_id)[1]
+            if not (row['total'] == latest_balance == snapshots[user_id] == expected[user_id]):
+                raise CommandError(
+                    f'user {user_id}: sum {row["total"]}, latest balance {latest_balance}, '
+                    f'snapshot {snapshots[user_id]}, expected {expected[user_id]}'
+                )
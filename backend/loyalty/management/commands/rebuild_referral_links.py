@@ -0,0 +1,16 @@
+"""
+Regenerate the referral closure table from ``LoyaltyPoints.referred_by``.
+
+    python manage.py rebuild_referral_links
+"""
+
+from django.core.management.base import BaseCommand
+
+from loyalty.referrals import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized referral tree (ReferralLink) from referred_by'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'{rebuild()} referral link(s) written'))
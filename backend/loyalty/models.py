@@ -3,15 +3,26 @@ Loyalty App - Models
 """
 
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 
 
 class LoyaltyPoints(models.Model):
     """User Loyalty Points"""
     
+    class Tier(models.TextChoices):
+        BRONZE = 'BRONZE', 'برنزی'
+        SILVER = 'SILVER', 'نقره‌ای'
+        GOLD = 'GOLD', 'طلایی'
+        PLATINUM = 'PLATINUM', 'پلاتینیوم'
+    
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='loyalty')
+    # Snapshot of the ledger balance as of ``last_sequence``; the ledger is the source of truth.
     total_points = models.PositiveIntegerField(default=0, verbose_name='کل امتیازات')
-    current_tier = models.CharField(max_length=20, default='BRONZE', verbose_name='سطح کاربری')
+    last_sequence = models.PositiveIntegerField(default=0, editable=False)
+    current_tier = models.CharField(
+        max_length=20, choices=Tier.choices, default=Tier.BRONZE, verbose_name='سطح کاربری'
+    )
     
     referral_code = models.CharField(max_length=20, unique=True, verbose_name='کد معرف')
     referred_by = models.ForeignKey(
@@ -30,3 +41,78 @@ class LoyaltyPoints(models.Model):
         
     def __str__(self):
         return f"{self.user.full_name} - {self.total_points} pts"
+
+
+class PointTransaction(models.Model):
+    """Append-only points ledger entry
+    
+    Entries are numbered per user (``sequence`` 1, 2, 3...) and carry the
+    balance after them, so the latest entry is the user's balance. The
+    unique ``(user, sequence)`` pair is what makes concurrent awards safe:
+    two writers racing for the same user collide on it and one retries.
+    """
+    
+    class Kind(models.TextChoices):
+        EARN = 'EARN', 'کسب امتیاز'
+        REDEEM = 'REDEEM', 'استفاده از امتیاز'
+        EXPIRE = 'EXPIRE', 'انقضای امتیاز'
+        REFERRAL = 'REFERRAL', 'پاداش معرفی'
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='point_transactions'
+    )
+    sequence = models.PositiveIntegerField(verbose_name='شماره ردیف')
+    kind = models.CharField(max_length=10, choices=Kind.choices, verbose_name='نوع')
+    points = models.IntegerField(verbose_name='امتیاز')  # negative for redeem/expire
+    balance = models.IntegerField(verbose_name='مانده')
+    description = models.CharField(max_length=200, blank=True, verbose_name='شرح')
+    # Makes awards idempotent, e.g. 'invoice:42' is only ever credited once.
+    source = models.CharField(max_length=100, blank=True, null=True, unique=True, verbose_name='منبع')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ')
+    
+    class Meta:
+        verbose_name = 'تراکنش امتیاز'
+        verbose_name_plural = 'تراکنش‌های امتیاز'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='point_user_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'sequence'], name='point_user_sequence'),
+            models.CheckConstraint(check=Q(balance__gte=0), name='point_balance_not_negative'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} #{self.sequence}: {self.points:+d} ({self.balance})"
+
+
+class ReferralLink(models.Model):
+    """Referral closure table
+    
+    One row for every (ancestor, descendant) pair of the referral tree
+    formed by ``LoyaltyPoints.referred_by``, with the number of levels
+    between them. Whole subtrees and upline chains are single indexed
+    lookups instead of recursive walks.
+    """
+    
+    ancestor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referral_descendants'
+    )
+    descendant = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referral_ancestors'
+    )
+    depth = models.PositiveSmallIntegerField(verbose_name='سطح')  # 1 = direct referral
+    
+    class Meta:
+        verbose_name = 'رابطه معرفی'
+        verbose_name_plural = 'روابط معرفی'
+        indexes = [
+            models.Index(fields=['descendant', 'depth'], name='referral_descendant_idx'),
+        ]
+        constraints = [
+            # Leading column also serves "all descendants of X (by level)".
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='referral_link_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
@@ -0,0 +1,20 @@
+"""
+Loyalty App - Event Receivers
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from invoices.models import Invoice
+from .ledger import earn, points_for_amount
+
+
+@receiver(post_save, sender=Invoice, dispatch_uid='loyalty-invoice-paid')
+def award_paid_invoice(sender, instance, raw=False, **kwargs):
+    """Credit the customer once per paid invoice (the source key makes repeats no-ops)."""
+    if raw or instance.status != 'PAID':
+        return
+    order = instance.order
+    points = points_for_amount(instance.final_amount)
+    if order.user_id and points > 0:
+        earn(order.user, points, f'فاکتور {instance.invoice_number}', source=f'invoice:{instance.pk}')
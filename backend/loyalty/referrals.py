@@ -0,0 +1,106 @@
+"""
+Loyalty App - Referral Tree
+
+``LoyaltyPoints.referred_by`` is mirrored into the ``ReferralLink``
+closure table: linking a user under a referrer inserts one row per
+(upline, downline) pair in a single ``bulk_create``. Afterwards both
+"everyone below X" and "everyone above X up to N levels" are one indexed
+query, which is what multi-level referral rewards need.
+
+A user's referrer is set once and never moved, so links are only ever
+added; ``rebuild()`` regenerates the table from ``referred_by``.
+"""
+
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import ledger
+from .models import LoyaltyPoints, ReferralLink
+
+
+class ReferralError(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'کد معرف نامعتبر است'
+    default_code = 'invalid_referral'
+
+
+def link(user, referrer):
+    """Record ``referrer`` as the referrer of ``user``.
+
+    The accounts of both users and of the referrer's uplines are locked
+    first (in pk order), so concurrent links that could close a cycle or
+    miss each other's closure rows run one after the other.
+    """
+    ledger.get_account(user)
+    with transaction.atomic():
+        ids = {user.pk, referrer.pk}
+        ids.update(ReferralLink.objects.filter(descendant=referrer).values_list('ancestor_id', flat=True))
+        list(LoyaltyPoints.objects.filter(user_id__in=ids).order_by('pk').select_for_update().values_list('pk'))
+        if referrer.pk == user.pk or ReferralLink.objects.filter(ancestor=user, descendant=referrer).exists():
+            raise ReferralError('نمی‌توانید کد معرف خود یا زیرمجموعه خود را وارد کنید')
+        updated = LoyaltyPoints.objects.filter(user=user, referred_by__isnull=True).update(referred_by=referrer)
+        if not updated:
+            raise ReferralError('کد معرف قبلا ثبت شده است')
+        uplines = [(referrer.pk, 0)] + list(
+            ReferralLink.objects.filter(descendant=referrer).values_list('ancestor_id', 'depth')
+        )
+        downlines = [(user.pk, 0)] + list(
+            ReferralLink.objects.filter(ancestor=user).values_list('descendant_id', 'depth')
+        )
+        ReferralLink.objects.bulk_create(
+            ReferralLink(ancestor_id=ancestor, descendant_id=descendant, depth=up + down + 1)
+            for ancestor, up in uplines
+            for descendant, down in downlines
+        )
+
+
+def reward_uplines(user):
+    """Pay ``LOYALTY['REFERRAL_REWARDS']`` (level 1, 2, ...) to the user's uplines."""
+    rewards = ledger.get_config()['REFERRAL_REWARDS']
+    uplines = ReferralLink.objects.filter(descendant=user, depth__lte=len(rewards)).select_related('ancestor')
+    for upline in uplines:
+        ledger.referral_bonus(
+            upline.ancestor, rewards[upline.depth - 1], f'معرفی {user.full_name} (سطح {upline.depth})',
+            source=f'referral:{user.pk}:{upline.depth}'
+        )
+
+
+def apply_code(user, code):
+    """Link ``user`` under the owner of ``code`` and reward the uplines."""
+    account = (
+        LoyaltyPoints.objects.filter(referral_code=code.strip().upper()).select_related('user').first()
+    )
+    if account is None:
+        raise ReferralError()
+    with transaction.atomic():
+        link(user, account.user)
+        reward_uplines(user)
+    return account.user
+
+
+def descendants(user, max_depth=None):
+    """Everyone ``user`` referred, directly or not, nearest levels first."""
+    queryset = ReferralLink.objects.filter(ancestor=user)
+    if max_depth:
+        queryset = queryset.filter(depth__lte=max_depth)
+    return queryset.select_related('descendant').order_by('depth', 'descendant_id')
+
+
+def rebuild(batch_size=2000):
+    """Regenerate the closure table from ``referred_by``. Returns the row count."""
+    parents = dict(
+        LoyaltyPoints.objects.filter(referred_by__isnull=False).values_list('user_id', 'referred_by_id')
+    )
+    rows = []
+    for user_id in parents:
+        seen = {user_id}
+        ancestor, depth = parents[user_id], 1
+        while ancestor is not None and ancestor not in seen:
+            rows.append(ReferralLink(ancestor_id=ancestor, descendant_id=user_id, depth=depth))
+            seen.add(ancestor)
+            ancestor, depth = parents.get(ancestor), depth + 1
+    with transaction.atomic():
+        ReferralLink.objects.all().delete()
+        ReferralLink.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -3,11 +3,36 @@ Loyalty App - Serializers
 """
 
 from rest_framework import serializers
-from .models import LoyaltyPoints
+from .models import LoyaltyPoints, PointTransaction, ReferralLink
 
 
 class LoyaltyPointsSerializer(serializers.ModelSerializer):
     class Meta:
         model = LoyaltyPoints
-        fields = '__all__'
+        exclude = ['last_sequence']
         read_only_fields = ['user', 'total_points', 'current_tier', 'referral_code']
+
+
+class PointTransactionSerializer(serializers.ModelSerializer):
+    kind_display = serializers.CharField(source='get_kind_display', read_only=True)
+    
+    class Meta:
+        model = PointTransaction
+        fields = ['id', 'kind', 'kind_display', 'points', 'balance', 'description', 'created_at']
+
+
+class RedeemSerializer(serializers.Serializer):
+    points = serializers.IntegerField(min_value=1)
+    description = serializers.CharField(max_length=200, required=False, allow_blank=True)
+
+
+class ReferralCodeSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=20)
+
+
+class ReferralLinkSerializer(serializers.ModelSerializer):
+    full_name = serializers.CharField(source='descendant.full_name', read_only=True)
+    
+    class Meta:
+        model = ReferralLink
+        fields = ['descendant', 'full_name', 'depth']
@@ -0,0 +1,13 @@
+"""
+Loyalty App - Celery Tasks
+"""
+
+from celery import shared_task
+
+from .ledger import recompute_tiers
+
+
+@shared_task
+def recompute_loyalty_tiers():
+    """Nightly tier recalculation (scheduled by Celery beat)."""
+    return recompute_tiers()
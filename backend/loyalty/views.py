@@ -2,10 +2,15 @@
 Loyalty App - Views
 """
 
-from rest_framework import viewsets, permissions, views, response
-from .models import LoyaltyPoints
-from .serializers import LoyaltyPointsSerializer
-import uuid
+from rest_framework import viewsets, permissions, response, status
+from rest_framework.decorators import action
+from .ledger import get_account, redeem
+from .referrals import apply_code, descendants
+from .models import LoyaltyPoints, PointTransaction
+from .serializers import (
+    LoyaltyPointsSerializer, PointTransactionSerializer, RedeemSerializer,
+    ReferralCodeSerializer, ReferralLinkSerializer,
+)
 
 
 class LoyaltyViewSet(viewsets.ReadOnlyModelViewSet):
@@ -13,15 +18,52 @@ class LoyaltyViewSet(viewsets.ReadOnlyModelViewSet):
     
     serializer_class = LoyaltyPointsSerializer
     permission_classes = [permissions.IsAuthenticated]
+    implicit_filters = [['user']]
     
     def get_queryset(self):
         return LoyaltyPoints.objects.filter(user=self.request.user)
     
     def list(self, request, *args, **kwargs):
-        # Ensure loyalty record exists
-        loyalty, created = LoyaltyPoints.objects.get_or_create(
-            user=request.user,
-            defaults={'referral_code': str(uuid.uuid4())[:8].upper()}
+        # Ensure loyalty record exists; its total_points is the ledger balance.
+        serializer = self.get_serializer(get_account(request.user))
+        return response.Response(serializer.data)
+    
+    @action(detail=False)
+    def transactions(self, request):
+        """Points history, newest first"""
+        queryset = PointTransaction.objects.filter(user=request.user).order_by('-sequence')
+        page = self.paginate_queryset(queryset)
+        serializer = PointTransactionSerializer(page if page is not None else queryset, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return response.Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def redeem(self, request):
+        """Spend points"""
+        serializer = RedeemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        entry = redeem(
+            request.user, serializer.validated_data['points'],
+            serializer.validated_data.get('description', '')
         )
-        serializer = self.get_serializer(loyalty)
+        return response.Response(PointTransactionSerializer(entry).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False)
+    def referrals(self, request):
+        """Everyone the user brought in, at every level (``?depth=1`` for direct referrals)"""
+        depth = request.query_params.get('depth')
+        queryset = descendants(request.user, int(depth) if depth and depth.isdigit() else None)
+        page = self.paginate_queryset(queryset)
+        serializer = ReferralLinkSerializer(page if page is not None else queryset, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
         return response.Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def referral(self, request):
+        """Enter the code of the user who referred you"""
+        serializer = ReferralCodeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        apply_code(request.user, serializer.validated_data['code'])
+        return response.Response(self.get_serializer(get_account(request.user)).data)
@@ -7,6 +7,9 @@ import sys
 def main():
     """Run administrative tasks."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hermes_backend.settings')
+    # Run Celery tasks inline when developing without a broker and worker.
+    # Web servers (gunicorn) and workers queue them unless told otherwise.
+    os.environ.setdefault('CELERY_TASK_ALWAYS_EAGER', 'True')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'user', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status', 'channel', 'event']
+    list_select_related = ['user']
+    search_fields = ['recipient']
+    readonly_fields = ['claim', 'last_error']
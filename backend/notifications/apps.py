@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class NotificationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notifications'
+    verbose_name = 'اعلان‌ها'
+
+    def ready(self):
+        from . import receivers  # noqa: F401  (connects the event signals)
@@ -0,0 +1,170 @@
+"""
+Notifications App - Delivery
+
+``drain()`` claims a batch of due outbox rows with a single UPDATE (so
+concurrent workers never send the same row twice), applies the per-user
+rate limit, sends, and records the outcome with one ``bulk_update``.
+Delivery is at-least-once: a batch claimed by a worker that dies is
+retried once its claim expires.
+
+Email goes through a per-process SMTP connection that stays open across
+batches and task runs; SMS through ``NOTIFICATIONS['SMS_BACKEND']``.
+"""
+
+import logging
+import smtplib
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification
+from .outbox import get_config
+
+logger = logging.getLogger(__name__)
+
+
+class ConsoleSMSBackend:
+    """Logs SMS instead of sending them; swap in a provider via settings."""
+    
+    def send(self, recipient, body):
+        logger.info('SMS to %s: %s', recipient, body)
+
+
+class SMTPPool:
+    """One email connection per worker process, reused until it goes idle or drops."""
+    
+    def __init__(self):
+        self.connection = None
+        self.last_used = 0.0
+    
+    def get(self):
+        idle = time.monotonic() - self.last_used
+        if self.connection is not None and idle > get_config()['SMTP_IDLE_TIMEOUT']:
+            self.close()
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+            self.connection.open()
+        return self.connection
+    
+    def send(self, message):
+        try:
+            self.get().send_messages([message])
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server dropped the pooled connection; retry once on a fresh one.
+            self.close()
+            self.get().send_messages([message])
+        self.last_used = time.monotonic()
+    
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+smtp_pool = SMTPPool()
+_sms_backend = None
+
+
+def get_sms_backend():
+    global _sms_backend
+    if _sms_backend is None:
+        _sms_backend = import_string(get_config()['SMS_BACKEND'])()
+    return _sms_backend
+
+
+def claim(batch_size, config):
+    """Atomically take up to ``batch_size`` due rows for this worker."""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = Q(status=Notification.Status.PENDING) | Q(status=Notification.Status.SENDING)
+    ids = Notification.objects.filter(due, available_at__lte=now).order_by('available_at').values('pk')[:batch_size]
+    Notification.objects.filter(due, pk__in=ids, available_at__lte=now).update(
+        status=Notification.Status.SENDING,
+        claim=token,
+        available_at=now + timedelta(seconds=config['CLAIM_TIMEOUT']),
+    )
+    return list(Notification.objects.filter(claim=token, status=Notification.Status.SENDING).order_by('pk'))
+
+
+def rate_limit_key(notification):
+    return ('user', notification.user_id) if notification.user_id else ('recipient', notification.recipient)
+
+
+def allowances(batch, config):
+    """``{key: (messages still allowed, when the window frees up)}`` for the batch's recipients."""
+    limit, window = config['RATE_LIMIT']
+    since = timezone.now() - timedelta(seconds=window)
+    sent = Notification.objects.filter(status=Notification.Status.SENT, sent_at__gte=since)
+    user_ids = {n.user_id for n in batch if n.user_id}
+    guests = {n.recipient for n in batch if not n.user_id}
+    result = {}
+    for row in sent.filter(user_id__in=user_ids).values('user_id').annotate(n=Count('pk'), first=Min('sent_at')):
+        result[('user', row['user_id'])] = (limit - row['n'], row['first'] + timedelta(seconds=window))
+    if guests:
+        rows = sent.filter(user__isnull=True, recipient__in=guests).values('recipient')
+        for row in rows.annotate(n=Count('pk'), first=Min('sent_at')):
+            result[('recipient', row['recipient'])] = (limit - row['n'], row['first'] + timedelta(seconds=window))
+    return result
+
+
+def deliver(notification):
+    if notification.channel == Notification.Channel.EMAIL:
+        smtp_pool.send(EmailMessage(
+            notification.subject, notification.body,
+            getattr(settings, 'DEFAULT_FROM_EMAIL', None), [notification.recipient]
+        ))
+    else:
+        get_sms_backend().send(notification.recipient, notification.body)
+
+
+def drain(batch_size=None):
+    """Send one batch. Returns ``(sent, deferred, failed)`` counts."""
+    config = get_config()
+    batch = claim(batch_size or config['BATCH_SIZE'], config)
+    if not batch:
+        return 0, 0, 0
+    limit, window = config['RATE_LIMIT']
+    budget = allowances(batch, config)
+    sent = deferred = failed = 0
+    for notification in batch:
+        key = rate_limit_key(notification)
+        remaining, frees_at = budget.get(key, (limit, None))
+        notification.claim = ''
+        if remaining <= 0:
+            notification.status = Notification.Status.PENDING
+            notification.available_at = frees_at or timezone.now() + timedelta(seconds=window)
+            deferred += 1
+            continue
+        try:
+            deliver(notification)
+        except Exception as exc:
+            logger.warning('Notification %s failed: %s', notification.pk, exc)
+            notification.attempts += 1
+            notification.last_error = str(exc)[:1000]
+            if notification.attempts >= config['MAX_ATTEMPTS']:
+                notification.status = Notification.Status.FAILED
+            else:
+                notification.status = Notification.Status.PENDING
+                backoff = config['RETRY_BACKOFF'] * 2 ** (notification.attempts - 1)
+                notification.available_at = timezone.now() + timedelta(seconds=backoff)
+            failed += 1
+            continue
+        now = timezone.now()
+        notification.status = Notification.Status.SENT
+        notification.sent_at = now
+        notification.attempts += 1
+        budget[key] = (remaining - 1, frees_at or now + timedelta(seconds=window))
+        sent += 1
+    Notification.objects.bulk_update(
+        batch, ['status', 'claim', 'available_at', 'attempts', 'last_error', 'sent_at'], batch_size=500
+    )
+    return sent, deferred, failed
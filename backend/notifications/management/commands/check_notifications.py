@@ -0,0 +1,124 @@
+"""
+End-to-end check of the notification pipeline against a local SMTP stand-in.
+
+    python manage.py check_notifications --users 5 --orders 4
+
+Creates orders (and a guest order), moves them all to another status in one
+bulk transition, issues and pays invoices, then drains the outbox and checks
+that every email arrived over a single pooled SMTP connection and that
+messages beyond the per-user rate limit were deferred, not dropped.
+"""
+
+import datetime
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from core.benchmarks import benchmark_database
+from invoices.models import Invoice
+from notifications import delivery
+from notifications.models import Notification
+from notifications.smtp_standin import LocalSMTPServer
+from notifications.tasks import drain_outbox
+from orders.models import ServiceOrder
+from orders.services import bulk_change_status
+
+
+class Command(BaseCommand):
+    help = 'Drive orders and invoices through the notification outbox and verify delivery'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--orders', type=int, default=4, help='Orders per user')
+        parser.add_argument('--limit', type=int, default=6, help='Per-user rate limit for the run')
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        with LocalSMTPServer() as server, benchmark_database(), override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.port,
+            EMAIL_USE_TLS=False, EMAIL_USE_SSL=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            NOTIFICATIONS={'RATE_LIMIT': (limit, 3600), 'KICK_ON_COMMIT': False},
+        ):
+            delivery.smtp_pool.close()
+            users = self.seed(options['users'], options['orders'])
+
+            queued = Notification.objects.count()
+            started = time.perf_counter()
+            result = drain_outbox()
+            elapsed = time.perf_counter() - started
+            delivery.smtp_pool.close()
+
+            self.verify(users, result, server, limit)
+            self.stdout.write(
+                f'{queued} queued, {result["sent"]} sent, {result["deferred"]} deferred, '
+                f'{result["failed"]} failed in {elapsed * 1000:.0f} ms over '
+                f'{server.connections} SMTP connection(s)'
+            )
+        self.stdout.write(self.style.SUCCESS('Notification pipeline OK'))
+
+    def seed(self, user_count, orders_per_user):
+        User = get_user_model()
+        users = [
+            User.objects.create_user(
+                username=f'notify{i}', email=f'notify{i}@example.com',
+                password='x', full_name=f'کاربر {i}', phone=f'0912000{i:04d}'
+            )
+            for i in range(user_count)
+        ]
+        # Email only, so every registered user's messages go through SMTP.
+        UserProfile.objects.bulk_create(
+            UserProfile(user=user, email_notifications=True, sms_notifications=False) for user in users
+        )
+        orders = []
+        with transaction.atomic():
+            for user in users:
+                for n in range(orders_per_user):
+                    orders.append(ServiceOrder.objects.create(
+                        user=user, service_title=f'خدمت {n}', full_name=user.full_name, phone=user.phone
+                    ))
+            ServiceOrder.objects.create(service_title='خدمت مهمان', full_name='مهمان', phone='09120009999')
+        with transaction.atomic():
+            bulk_change_status([order.pk for order in orders], ServiceOrder.Status.CONTACTED)
+        due = timezone.localdate() + datetime.timedelta(days=7)
+        with transaction.atomic():
+            for i, order in enumerate(orders[::orders_per_user]):
+                invoice = Invoice.objects.create(
+                    order=order, invoice_number=f'INV-N-{i}', amount=1000000,
+                    final_amount=1000000, due_date=due
+                )
+                invoice.status = 'PAID'
+                invoice.save()
+        return users
+
+    def verify(self, users, result, server, limit):
+        rows = Notification.objects.all()
+        by_status = Counter(rows.values_list('status', flat=True))
+        errors = []
+        if result['failed'] or by_status[Notification.Status.FAILED]:
+            errors.append(f'{result["failed"]} notification(s) failed')
+        for user in users:
+            statuses = Counter(rows.filter(user=user).values_list('status', flat=True))
+            total = sum(statuses.values())
+            if statuses[Notification.Status.SENT] != min(total, limit):
+                errors.append(f'{user.email}: {statuses[Notification.Status.SENT]} sent of {total}, limit {limit}')
+            if statuses[Notification.Status.PENDING] != max(0, total - limit):
+                errors.append(f'{user.email}: {statuses[Notification.Status.PENDING]} deferred')
+        deferred = rows.filter(status=Notification.Status.PENDING)
+        if deferred.filter(available_at__lte=timezone.now()).exists():
+            errors.append('deferred notifications are due again immediately')
+        emails = rows.filter(status=Notification.Status.SENT, channel=Notification.Channel.EMAIL).count()
+        if len(server.messages) != emails:
+            errors.append(f'SMTP received {len(server.messages)} message(s), expected {emails}')
+        if emails and server.connections != 1:
+            errors.append(f'{server.connections} SMTP connections opened, expected 1 pooled connection')
+        if not rows.filter(user__isnull=True, channel=Notification.Channel.SMS, status=Notification.Status.SENT).exists():
+            errors.append('guest order produced no SMS')
+        if errors:
+            raise CommandError('; '.join(errors))
@@ -0,0 +1,38 @@
+"""
+Notifications App - Message Templates
+
+``(subject, body)`` per event, formatted with the event context when the
+event is written to the outbox. SMS uses the body only.
+"""
+
+MESSAGES = {
+    'order_created': (
+        'سفارش شما ثبت شد',
+        '{name} عزیز، سفارش «{service}» با شماره {order_id} ثبت شد. کارشناسان ما به زودی با شما تماس می‌گیرند.',
+    ),
+    'order_status_changed': (
+        'وضعیت سفارش شما تغییر کرد',
+        '{name} عزیز، وضعیت سفارش «{service}» (شماره {order_id}) به «{status}» تغییر کرد.',
+    ),
+    'booking_created': (
+        'رزرو بازدید ثبت شد',
+        '{name} عزیز، بازدید شما برای {date} ساعت {time_slot} ثبت شد و پس از تایید به شما اطلاع می‌دهیم.',
+    ),
+    'booking_cancelled': (
+        'رزرو بازدید لغو شد',
+        '{name} عزیز، بازدید {date} ساعت {time_slot} لغو شد.',
+    ),
+    'invoice_created': (
+        'فاکتور جدید صادر شد',
+        '{name} عزیز، فاکتور {invoice_number} به مبلغ {amount} تومان با سررسید {due_date} صادر شد.',
+    ),
+    'invoice_paid': (
+        'پرداخت فاکتور تایید شد',
+        '{name} عزیز، پرداخت فاکتور {invoice_number} به مبلغ {amount} تومان دریافت شد. سپاس از اعتماد شما.',
+    ),
+}
+
+
+def render(event, context):
+    subject, body = MESSAGES[event]
+    return subject.format(**context), body.format(**context)
@@ -0,0 +1,58 @@
+"""
+Notifications App - Models
+"""
+
+from django.db import models
+from django.conf import settings
+
+
+class Notification(models.Model):
+    """Outbox row: one message to one recipient on one channel"""
+    
+    class Channel(models.TextChoices):
+        EMAIL = 'EMAIL', 'ایمیل'
+        SMS = 'SMS', 'پیامک'
+    
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'در صف ارسال'
+        SENDING = 'SENDING', 'در حال ارسال'
+        SENT = 'SENT', 'ارسال شده'
+        FAILED = 'FAILED', 'ناموفق'
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+    event = models.CharField(max_length=50, verbose_name='رویداد')
+    channel = models.CharField(max_length=10, choices=Channel.choices, verbose_name='کانال')
+    recipient = models.CharField(max_length=254, verbose_name='گیرنده')
+    subject = models.CharField(max_length=200, blank=True, verbose_name='موضوع')
+    body = models.TextField(verbose_name='متن')
+    
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, verbose_name='وضعیت')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='تعداد تلاش')
+    available_at = models.DateTimeField(verbose_name='زمان ارسال')
+    claim = models.CharField(max_length=32, blank=True, editable=False)
+    last_error = models.TextField(blank=True, verbose_name='آخرین خطا')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name='زمان ارسال شده')
+    
+    class Meta:
+        verbose_name = 'اعلان'
+        verbose_name_plural = 'اعلان‌ها'
+        ordering = ['-created_at']
+        indexes = [
+            # The drain query: due pending rows, oldest first
+            models.Index(fields=['status', 'available_at'], name='notification_due_idx'),
+            models.Index(fields=['claim'], name='notification_claim_idx'),
+            # Rate limiting: recent sends per user / per recipient
+            models.Index(fields=['user', 'sent_at'], name='notification_user_sent_idx'),
+            models.Index(fields=['recipient', 'sent_at'], name='notification_recip_sent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_channel_display()} {self.event} → {self.recipient}"
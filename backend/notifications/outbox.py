@@ -0,0 +1,78 @@
+"""
+Notifications App - Outbox
+
+Events are turned into ``Notification`` rows by the receivers, inside the
+transaction of the change that caused them: if the change rolls back, so
+do its notifications, and nothing is sent from the request thread. After
+commit a drain task is queued; Celery beat drains anything left behind.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from .messages import render
+from .models import Notification
+
+DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'MAX_BATCHES': 20,                  # per drain task run
+    'RATE_LIMIT': (10, 60 * 60),        # at most N messages per user per window (seconds)
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 60,                # seconds, doubled after every failure
+    'CLAIM_TIMEOUT': 10 * 60,           # a crashed worker's batch is retried after this
+    'SMTP_IDLE_TIMEOUT': 60,            # reopen pooled SMTP connections idle for longer
+    'SMS_BACKEND': 'notifications.delivery.ConsoleSMSBackend',
+    'KICK_ON_COMMIT': True,             # queue a drain right after each committed event
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'NOTIFICATIONS', {}))
+    return config
+
+
+def preferences(user):
+    """``(email, sms)`` opt-ins of ``user``; users without a profile get both."""
+    try:
+        profile = user.profile
+    except UserProfile.DoesNotExist:
+        return True, True
+    return profile.email_notifications, profile.sms_notifications
+
+
+def build(event, context, user=None, phone=None):
+    """Outbox rows for one event: email and/or SMS, as the user allows.
+    
+    Guests (no user) are reached by SMS on the phone they left.
+    """
+    subject, body = render(event, context)
+    now = timezone.now()
+    email_ok, sms_ok = preferences(user) if user is not None else (False, True)
+    phone = phone or (user.phone if user is not None else None)
+    rows = []
+    if email_ok and user is not None and user.email:
+        rows.append(Notification(
+            user=user, event=event, channel=Notification.Channel.EMAIL,
+            recipient=user.email, subject=subject, body=body, available_at=now
+        ))
+    if sms_ok and phone:
+        rows.append(Notification(
+            user=user, event=event, channel=Notification.Channel.SMS,
+            recipient=phone, subject=subject, body=body, available_at=now
+        ))
+    return rows
+
+
+def enqueue(rows):
+    """Write outbox rows in the current transaction and drain after commit."""
+    if not rows:
+        return []
+    rows = Notification.objects.bulk_create(rows)
+    if get_config()['KICK_ON_COMMIT']:
+        from .tasks import drain_outbox
+        
+        transaction.on_commit(drain_outbox.delay)
+    return rows
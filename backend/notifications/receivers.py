@@ -0,0 +1,82 @@
+"""
+Notifications App - Event Receivers
+
+Translate order, booking and invoice changes into outbox rows. Each
+receiver runs inside the transaction of the change it reacts to.
+"""
+
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from bookings.signals import booking_cancelled
+from invoices.models import Invoice
+from orders.models import ServiceOrder
+from orders.signals import status_changed
+from .outbox import build, enqueue
+
+
+def order_context(order):
+    return {'name': order.full_name, 'service': order.service_title, 'order_id': order.pk}
+
+
+def booking_context(booking):
+    return {'name': booking.user.full_name, 'date': booking.date, 'time_slot': booking.time_slot}
+
+
+def invoice_context(invoice):
+    return {
+        'name': invoice.order.full_name,
+        'invoice_number': invoice.invoice_number,
+        'amount': f'{int(invoice.final_amount):,}',
+        'due_date': invoice.due_date,
+    }
+
+
+@receiver(post_save, sender=ServiceOrder, dispatch_uid='notify-order-created')
+def order_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        enqueue(build('order_created', order_context(instance), instance.user, instance.phone))
+
+
+@receiver(status_changed, dispatch_uid='notify-order-status')
+def order_status_changed(sender, changes, **kwargs):
+    """``changes`` is a list of ``(order_id, old_status, new_status)``; one query for all orders."""
+    new_status = {order_id: new for order_id, old, new in changes}
+    orders = ServiceOrder.objects.filter(pk__in=new_status).select_related('user__profile')
+    rows = []
+    for order in orders:
+        context = dict(order_context(order), status=ServiceOrder.Status(new_status[order.pk]).label)
+        rows += build('order_status_changed', context, order.user, order.phone)
+    enqueue(rows)
+
+
+@receiver(post_save, sender=Booking, dispatch_uid='notify-booking-created')
+def booking_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        enqueue(build('booking_created', booking_context(instance), instance.user))
+
+
+@receiver(booking_cancelled, dispatch_uid='notify-booking-cancelled')
+def booking_was_cancelled(sender, booking, **kwargs):
+    enqueue(build('booking_cancelled', booking_context(booking), booking.user))
+
+
+@receiver(pre_save, sender=Invoice, dispatch_uid='notify-invoice-status-before')
+def invoice_status_before(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk:
+        instance._status_before = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Invoice, dispatch_uid='notify-invoice')
+def invoice_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        event = 'invoice_created'
+    elif instance.status == 'PAID' and getattr(instance, '_status_before', None) != 'PAID':
+        event = 'invoice_paid'
+    else:
+        return
+    order = instance.order
+    enqueue(build(event, invoice_context(instance), order.user, order.phone))
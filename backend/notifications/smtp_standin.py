@@ -0,0 +1,93 @@
+"""
+Notifications App - Local SMTP Stand-in
+
+A minimal in-process SMTP server for exercising the email path without a
+real mail server. It accepts everything and records what it received::
+
+    with LocalSMTPServer() as server:
+        # EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.port, EMAIL_USE_TLS=False
+        ...
+        server.messages, server.connections
+"""
+
+import socketserver
+import threading
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+    
+    def handle(self):
+        server = self.server.owner
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost SMTP stand-in')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = command.partition(':')[2].strip(), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.partition(':')[2].strip().strip('<>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                for raw in iter(self.rfile.readline, b''):
+                    if raw in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(raw)
+                with server.lock:
+                    server.messages.append({'from': sender, 'to': recipients, 'data': b''.join(lines)})
+                self.reply('250 OK: queued')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """Threaded SMTP stand-in on ``127.0.0.1``; port 0 picks a free port."""
+    
+    def __init__(self, port=0):
+        self.server = _Server(('127.0.0.1', port), SMTPHandler)
+        self.server.owner = self
+        self.port = self.server.server_address[1]
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        self.thread = None
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,21 @@
+"""
+Notifications App - Celery Tasks
+"""
+
+from celery import shared_task
+
+from .delivery import drain
+from .outbox import get_config
+
+
+@shared_task
+def drain_outbox():
+    """Send due notifications in batches (queued after commits and by Celery beat)."""
+    config = get_config()
+    totals = [0, 0, 0]
+    for _ in range(config['MAX_BATCHES']):
+        counts = drain(config['BATCH_SIZE'])
+        totals = [total + count for total, count in zip(totals, counts)]
+        if sum(counts) < config['BATCH_SIZE']:
+            break
+    return dict(zip(['sent', 'deferred', 'failed'], totals))
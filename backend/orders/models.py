@@ -16,6 +16,15 @@ class ServiceOrder(models.Model):
         COMPLETED = 'COMPLETED', 'تکمیل شده'
         CANCELLED = 'CANCELLED', 'لغو شده'
     
+    # Allowed status changes; anything else is rejected by the API.
+    TRANSITIONS = {
+        Status.PENDING: {Status.CONTACTED, Status.IN_PROGRESS, Status.CANCELLED},
+        Status.CONTACTED: {Status.IN_PROGRESS, Status.CANCELLED},
+        Status.IN_PROGRESS: {Status.COMPLETED, Status.CANCELLED},
+        Status.COMPLETED: set(),
+        Status.CANCELLED: {Status.PENDING},
+    }
+    
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         on_delete=models.SET_NULL, 
@@ -51,6 +60,45 @@ class ServiceOrder(models.Model):
         verbose_name = 'سفارش'
         verbose_name_plural = 'سفارشات'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination for the admin list and for a user's own orders
+            models.Index(fields=['-created_at', '-id'], name='order_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+            # ?status= filtering, for admins and for a user's own orders
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            models.Index(fields=['user', 'status', '-created_at'], name='order_user_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.service_title} - {self.full_name}"
+    
+    @classmethod
+    def can_transition(cls, current, new):
+        return new in cls.TRANSITIONS.get(current, ())
+
+
+class OrderStatusChange(models.Model):
+    """Audit trail of order status changes"""
+    
+    order = models.ForeignKey(ServiceOrder, on_delete=models.CASCADE, related_name='status_changes')
+    from_status = models.CharField(max_length=20, choices=ServiceOrder.Status.choices, verbose_name='وضعیت قبلی')
+    to_status = models.CharField(max_length=20, choices=ServiceOrder.Status.choices, verbose_name='وضعیت جدید')
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    changed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'تغییر وضعیت سفارش'
+        verbose_name_plural = 'تغییرات وضعیت سفارش'
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['order', '-changed_at'], name='order_status_change_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status} → {self.to_status}"
@@ -3,7 +3,7 @@ Orders App - Serializers
 """
 
 from rest_framework import serializers
-from .models import ServiceOrder
+from .models import OrderStatusChange, ServiceOrder
 
 
 class ServiceOrderSerializer(serializers.ModelSerializer):
@@ -25,3 +25,16 @@ class ServiceOrderAdminSerializer(serializers.ModelSerializer):
     class Meta:
         model = ServiceOrder
         fields = '__all__'
+        # Status changes go through update_status / bulk_status (transitions, audit, signals).
+        read_only_fields = ['status']
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+    status = serializers.ChoiceField(choices=ServiceOrder.Status.choices)
+
+
+class OrderStatusChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderStatusChange
+        fields = ['id', 'from_status', 'to_status', 'changed_by', 'changed_at']
@@ -0,0 +1,73 @@
+"""
+Orders App - Status Transitions
+
+Status changes are validated against ``ServiceOrder.TRANSITIONS`` and
+written with ``UPDATE`` statements that touch only ``status`` and
+``updated_at``; every change gets an ``OrderStatusChange`` row.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OrderStatusChange, ServiceOrder
+from .signals import status_changed
+
+# Per-id outcomes of a bulk transition
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_ALLOWED = 'not_allowed'
+NOT_FOUND = 'not_found'
+
+
+def change_status(order, new_status, user=None):
+    """Move one order to ``new_status``. Returns ``False`` if not allowed."""
+    if order.status == new_status:
+        return True
+    if not ServiceOrder.can_transition(order.status, new_status):
+        return False
+    with transaction.atomic():
+        previous = order.status
+        order.status = new_status
+        order.save(update_fields=['status', 'updated_at'])
+        OrderStatusChange.objects.create(
+            order=order, from_status=previous, to_status=new_status, changed_by=user
+        )
+        status_changed.send(sender=ServiceOrder, changes=[(order.pk, previous, new_status)])
+    return True
+
+
+def bulk_change_status(ids, new_status, user=None):
+    """Move many orders to ``new_status`` with a single UPDATE.
+    
+    Returns ``{id: {'result': ..., 'status': current status or None}}``.
+    """
+    results = {}
+    with transaction.atomic():
+        current = dict(
+            ServiceOrder.objects.select_for_update().filter(pk__in=ids).values_list('pk', 'status')
+        )
+        allowed = []
+        for pk in ids:
+            status = current.get(pk)
+            if status is None:
+                results[pk] = {'result': NOT_FOUND, 'status': None}
+            elif status == new_status:
+                results[pk] = {'result': UNCHANGED, 'status': status}
+            elif ServiceOrder.can_transition(status, new_status):
+                allowed.append(pk)
+                results[pk] = {'result': UPDATED, 'status': new_status, 'previous': status}
+            else:
+                results[pk] = {'result': NOT_ALLOWED, 'status': status}
+        if allowed:
+            sources = [status for status, targets in ServiceOrder.TRANSITIONS.items() if new_status in targets]
+            ServiceOrder.objects.filter(pk__in=allowed, status__in=sources).update(
+                status=new_status, updated_at=timezone.now()
+            )
+            OrderStatusChange.objects.bulk_create(
+                OrderStatusChange(order_id=pk, from_status=current[pk], to_status=new_status, changed_by=user)
+                for pk in allowed
+            )
+            status_changed.send(
+                sender=ServiceOrder, changes=[(pk, current[pk], new_status) for pk in allowed]
+            )
+    return results
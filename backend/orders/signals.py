@@ -0,0 +1,9 @@
+"""
+Orders App - Signals
+"""
+
+from django.dispatch import Signal
+
+# Sent inside the transaction of every status change, single or bulk,
+# with ``changes=[(order_id, old_status, new_status), ...]``.
+status_changed = Signal()
@@ -2,11 +2,17 @@
 Orders App - Views
 """
 
+from django.db import transaction
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.pagination import OptInCursorPagination
 from .models import ServiceOrder
-from .serializers import ServiceOrderSerializer, ServiceOrderAdminSerializer
+from .serializers import (
+    BulkStatusSerializer, OrderStatusChangeSerializer,
+    ServiceOrderSerializer, ServiceOrderAdminSerializer,
+)
+from . import services
 
 
 class IsAdminOrOwner(permissions.BasePermission):
@@ -21,6 +27,8 @@ class ServiceOrderViewSet(viewsets.ModelViewSet):
     
     queryset = ServiceOrder.objects.all()
     permission_classes = [permissions.AllowAny]  # Allow guest orders
+    pagination_class = OptInCursorPagination
+    implicit_filters = [[], ['user']]  # staff see everything, users their own orders
     filterset_fields = ['status']
     search_fields = ['full_name', 'phone', 'service_title']
     ordering_fields = ['created_at', 'status']
@@ -37,7 +45,9 @@ class ServiceOrderViewSet(viewsets.ModelViewSet):
             return ServiceOrder.objects.filter(user=self.request.user)
         return ServiceOrder.objects.none()
     
+    @transaction.atomic
     def perform_create(self, serializer):
+        # Atomic so the order and its outbox notification commit together.
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
         else:
@@ -55,7 +65,29 @@ class ServiceOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        order.status = new_status
-        order.save()
+        if not services.change_status(order, new_status, request.user):
+            return Response(
+                {'error': f'تغییر وضعیت از «{order.get_status_display()}» به «{ServiceOrder.Status(new_status).label}» مجاز نیست'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response(ServiceOrderAdminSerializer(order).data)
+    
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk_status(self, request):
+        """Admin endpoint to move many orders to one status at once"""
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        results = services.bulk_change_status(ids, serializer.validated_data['status'], request.user)
+        return Response({
+            'updated': sum(1 for result in results.values() if result['result'] == services.UPDATED),
+            'results': [{'id': pk, **results[pk]} for pk in ids],
+        })
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def history(self, request, pk=None):
+        """Status change history of one order"""
+        order = self.get_object()
+        changes = order.status_changes.all()
+        return Response(OrderStatusChangeSerializer(changes, many=True).data)
@@ -12,6 +12,7 @@ class PortfolioItem(models.Model):
     title = models.CharField(max_length=200, verbose_name='عنوان پروژه')
     description = models.TextField(verbose_name='توضیحات')
     cover_image = models.ImageField(upload_to='portfolio/covers/', blank=True, null=True, verbose_name='تصویر کاور')
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='نسخه‌های واکنش‌گرا')
     location = models.CharField(max_length=200, blank=True, null=True, verbose_name='موقعیت')
     completion_date = models.DateField(blank=True, null=True, verbose_name='تاریخ اتمام')
     
@@ -29,6 +30,15 @@ class PortfolioItem(models.Model):
     is_featured = models.BooleanField(default=False, verbose_name='نمایش ویژه')
     view_count = models.PositiveIntegerField(default=0, verbose_name='تعداد بازدید')
     
+    # Verified review aggregates, maintained by reviews.aggregates
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد امتیازها')
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name='مجموع امتیازها')
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -36,9 +46,23 @@ class PortfolioItem(models.Model):
         verbose_name = 'نمونه کار'
         verbose_name_plural = 'نمونه کارها'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='portfolio_created_idx'),
+            models.Index(fields=['is_featured', '-created_at'], name='portfolio_featured_idx'),
+            models.Index(fields=['location', '-created_at'], name='portfolio_location_idx'),
+            models.Index(fields=['-view_count'], name='portfolio_views_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    @property
+    def rating_average(self):
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+    
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'rating_{star}') for star in range(1, 6)}
 
 
 class PortfolioImage(models.Model):
@@ -50,8 +74,11 @@ class PortfolioImage(models.Model):
         related_name='gallery_images'
     )
     image = models.ImageField(upload_to='portfolio/gallery/', verbose_name='تصویر')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='نسخه‌های واکنش‌گرا')
     caption = models.CharField(max_length=200, blank=True, null=True, verbose_name='توضیح تصویر')
     order = models.PositiveIntegerField(default=0, verbose_name='ترتیب')
+    is_processed = models.BooleanField(default=True, verbose_name='پردازش شده')
+    processing_error = models.CharField(max_length=200, blank=True, default='', verbose_name='خطای پردازش')
     
     class Meta:
         verbose_name = 'تصویر گالری'
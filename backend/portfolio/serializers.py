@@ -3,13 +3,20 @@ Portfolio App - Serializers
 """
 
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Max, Prefetch
+from core.fields import ResponsiveImageField
+from . import uploads
 from .models import PortfolioItem, PortfolioImage, PortfolioTag
+from .tasks import process_portfolio_uploads
 
 
 class PortfolioImageSerializer(serializers.ModelSerializer):
+    image_variants = ResponsiveImageField()
+    
     class Meta:
         model = PortfolioImage
-        fields = ['id', 'image', 'caption', 'order']
+        fields = ['id', 'image', 'image_variants', 'caption', 'order']
 
 
 class PortfolioTagSerializer(serializers.ModelSerializer):
@@ -20,16 +27,28 @@ class PortfolioTagSerializer(serializers.ModelSerializer):
 
 class PortfolioItemSerializer(serializers.ModelSerializer):
     gallery_images = PortfolioImageSerializer(many=True, read_only=True)
+    cover_image_variants = ResponsiveImageField()
+    rating = serializers.SerializerMethodField()
     
     class Meta:
         model = PortfolioItem
         fields = [
-            'id', 'title', 'description', 'cover_image', 'location',
+            'id', 'title', 'description', 'cover_image', 'cover_image_variants', 'location',
             'completion_date', 'before_video_url', 'after_video_url',
-            'gallery_images', 'is_featured', 'view_count',
+            'gallery_images', 'is_featured', 'view_count', 'rating',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'view_count', 'created_at', 'updated_at']
+        prefetch_related = [
+            Prefetch('gallery_images', queryset=PortfolioImage.objects.filter(is_processed=True).order_by('order')),
+        ]
+    
+    def get_rating(self, obj):
+        return {
+            'count': obj.rating_count,
+            'average': obj.rating_average,
+            'histogram': obj.rating_histogram,
+        }
 
 
 class PortfolioItemCreateSerializer(serializers.ModelSerializer):
@@ -49,13 +68,43 @@ class PortfolioItemCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         gallery_images = validated_data.pop('gallery_images', [])
+        cover_image = validated_data.pop('cover_image', None)
         portfolio = PortfolioItem.objects.create(**validated_data)
+        self.queue_uploads(portfolio, cover_image, gallery_images, first_order=0)
+        return portfolio
+    
+    def update(self, instance, validated_data):
+        gallery_images = validated_data.pop('gallery_images', [])
+        # An explicit null still clears the cover; a new file goes through the pipeline.
+        cover_image = validated_data.pop('cover_image') if validated_data.get('cover_image') else None
+        portfolio = super().update(instance, validated_data)
+        if gallery_images:
+            last = portfolio.gallery_images.aggregate(last=Max('order'))['last']
+            first_order = 0 if last is None else last + 1
+        else:
+            first_order = 0
+        self.queue_uploads(portfolio, cover_image, gallery_images, first_order)
+        return portfolio
+    
+    def queue_uploads(self, portfolio, cover_image, gallery_images, first_order):
+        """Stash the uploads and hand them to the watermarking task.
         
-        for index, image in enumerate(gallery_images):
-            PortfolioImage.objects.create(
+        Gallery rows are inserted in one query and stay hidden until the
+        task has replaced their files with the watermarked versions.
+        """
+        if not cover_image and not gallery_images:
+            return
+        images = PortfolioImage.objects.bulk_create(
+            PortfolioImage(
                 portfolio=portfolio,
-                image=image,
-                order=index
+                image=uploads.stash(image),
+                order=first_order + index,
+                is_processed=False
             )
-        
-        return portfolio
+            for index, image in enumerate(gallery_images)
+        )
+        cover = uploads.stash(cover_image) if cover_image else None
+        image_ids = [image.pk for image in images]
+        transaction.on_commit(
+            lambda: process_portfolio_uploads.delay(portfolio.pk, image_ids, cover)
+        )
@@ -0,0 +1,89 @@
+"""
+Portfolio App - Celery Tasks
+"""
+
+import logging
+
+from celery import shared_task
+from django.core.files.storage import default_storage
+
+from core.response_cache import invalidate
+from core.tasks import generate_image_derivatives
+from . import uploads
+from .models import PortfolioImage, PortfolioItem
+
+logger = logging.getLogger(__name__)
+
+GIVE_UP_MESSAGE = 'پردازش تصویر پس از چند تلاش انجام نشد'
+
+
+def load(name):
+    try:
+        return uploads.read(name)
+    except FileNotFoundError as exc:
+        return exc
+
+
+def failure(exc):
+    return (str(exc) or type(exc).__name__)[:200]
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), max_retries=3, retry_backoff=True)
+def process_portfolio_uploads(self, item_id, image_ids, cover=None):
+    """Watermark the pending uploads of one request and publish them.
+
+    Each image succeeds or fails on its own: a missing or corrupt upload is
+    logged and recorded in ``processing_error`` (it stays hidden) without
+    holding back the rest. Any other error retries the task, which then
+    only picks up what is still pending. Pending files are deleted once
+    their image is done, and all of them when the last retry fails.
+    """
+    images = list(PortfolioImage.objects.filter(pk__in=image_ids, is_processed=False, processing_error=''))
+    if cover and not default_storage.exists(cover):
+        cover = None  # Published by an earlier attempt.
+    pending = [image.image.name for image in images] + ([cover] if cover else [])
+    done = []
+    try:
+        blobs = [load(name) for name in pending]
+        rendered = iter(uploads.watermark_many([blob for blob in blobs if not isinstance(blob, Exception)]))
+        results = [blob if isinstance(blob, Exception) else next(rendered) for blob in blobs]
+
+        for image, result in zip(images, results):
+            if isinstance(result, Exception):
+                logger.error('Portfolio image %s could not be processed: %r', image.pk, result)
+                image.processing_error = failure(result)
+            else:
+                image.image.name = uploads.store('portfolio/gallery', *result)
+                image.is_processed = True
+        PortfolioImage.objects.bulk_update(images, ['image', 'is_processed', 'processing_error'])
+        invalidate(PortfolioImage)
+        done += pending[:len(images)]
+
+        if cover:
+            if isinstance(results[-1], Exception):
+                logger.error('Cover of portfolio item %s could not be processed: %r', item_id, results[-1])
+            else:
+                cover_path = uploads.store('portfolio/covers', *results[-1])
+                PortfolioItem.objects.filter(pk=item_id).update(cover_image=cover_path)
+                invalidate(PortfolioItem)
+            done.append(cover)
+    except Exception:
+        if self.request.retries >= self.max_retries:
+            # Out of retries: record the failure instead of leaving the rows pending forever.
+            PortfolioImage.objects.filter(
+                pk__in=[image.pk for image in images], is_processed=False, processing_error=''
+            ).update(processing_error=GIVE_UP_MESSAGE)
+            invalidate(PortfolioImage)
+            done = pending
+        raise
+    finally:
+        for name in done:
+            default_storage.delete(name)
+
+    # bulk_update/update() skip post_save, so queue the derivatives here.
+    for image in images:
+        if image.is_processed:
+            generate_image_derivatives.delay('portfolio.PortfolioImage', image.pk, 'image')
+    if cover and not isinstance(results[-1], Exception):
+        generate_image_derivatives.delay('portfolio.PortfolioItem', item_id, 'cover_image')
+    return len(pending)
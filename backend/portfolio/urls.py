@@ -2,9 +2,12 @@
 Portfolio App - URLs
 """
 
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import PortfolioViewSet
+from .views import (
+    AsyncPortfolioDetailView, AsyncPortfolioFeaturedView, AsyncPortfolioListView, PortfolioViewSet
+)
 
 router = DefaultRouter()
 router.register('', PortfolioViewSet, basename='portfolio')
@@ -12,3 +15,11 @@ router.register('', PortfolioViewSet, basename='portfolio')
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Same paths and names as the router's, matched first.
+    urlpatterns = [
+        path('', AsyncPortfolioListView.as_view(), name='portfolio-list'),
+        path('featured/', AsyncPortfolioFeaturedView.as_view(), name='portfolio-featured'),
+        re_path(r'^(?P<pk>[^/.]+)/$', AsyncPortfolioDetailView.as_view(), name='portfolio-detail'),
+    ] + urlpatterns
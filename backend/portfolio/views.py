@@ -2,15 +2,19 @@
 Portfolio App - Views
 """
 
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import F
-from .models import PortfolioItem, PortfolioImage
+from core.async_views import AsyncAPIView
+from core.mixins import RelatedFieldsMixin
+from core.response_cache import CachedResponseMixin
+from core.view_counter import record_view
+from .models import PortfolioItem
 from .serializers import PortfolioItemSerializer, PortfolioItemCreateSerializer
 
 
-class PortfolioViewSet(viewsets.ModelViewSet):
+class PortfolioViewSet(CachedResponseMixin, RelatedFieldsMixin, viewsets.ModelViewSet):
     """Portfolio CRUD operations"""
     
     queryset = PortfolioItem.objects.all()
@@ -18,6 +22,8 @@ class PortfolioViewSet(viewsets.ModelViewSet):
     filterset_fields = ['is_featured', 'location']
     search_fields = ['title', 'description', 'location']
     ordering_fields = ['created_at', 'view_count']
+    cache_actions = ['list', 'retrieve', 'featured']
+    cache_models = ['portfolio.PortfolioItem', 'portfolio.PortfolioImage', 'reviews.Review']
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -27,16 +33,50 @@ class PortfolioViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
+    def cache_hit(self, request, *args, **kwargs):
+        if 'pk' in kwargs:
+            record_view(PortfolioItem(pk=PortfolioItem._meta.pk.to_python(kwargs['pk'])))
+    
     def retrieve(self, request, *args, **kwargs):
         """Increment view count on retrieve"""
         instance = self.get_object()
-        PortfolioItem.objects.filter(pk=instance.pk).update(view_count=F('view_count') + 1)
+        record_view(instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured portfolio items"""
-        featured = self.queryset.filter(is_featured=True)[:6]
+        featured = self.get_queryset().filter(is_featured=True)[:6]
         serializer = self.get_serializer(featured, many=True)
         return Response(serializer.data)
+
+
+class AsyncPortfolioListView(AsyncAPIView):
+    """Portfolio list served natively under ASGI; creation stays on the viewset"""
+    
+    view_class = PortfolioViewSet
+    actions = {'get': 'list', 'post': 'create'}
+
+
+class AsyncPortfolioDetailView(AsyncAPIView):
+    """Portfolio detail served natively under ASGI; writes stay on the viewset"""
+    
+    view_class = PortfolioViewSet
+    actions = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+    
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.get_object()
+        await sync_to_async(record_view)(instance)  # buffered; Redis when so configured
+        return Response(self.api.get_serializer(instance).data)
+
+
+class AsyncPortfolioFeaturedView(AsyncAPIView):
+    """``PortfolioViewSet.featured`` served natively under ASGI"""
+    
+    view_class = PortfolioViewSet
+    actions = {'get': 'featured'}
+    
+    async def featured(self, request):
+        featured = [item async for item in self.api.get_queryset().filter(is_featured=True)[:6]]
+        return Response(self.api.get_serializer(featured, many=True).data)
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import Review
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'user', 'project', 'rating', 'is_verified', 'created_at']
+    list_filter = ['is_verified', 'rating']
+    list_select_related = ['user', 'project']
+    actions = ['verify', 'unverify']
+    
+    def set_verified(self, queryset, value):
+        # Saved one by one so the project rating aggregates follow.
+        for review in queryset.exclude(is_verified=value):
+            review.is_verified = value
+            review.save(update_fields=['is_verified'])
+    
+    @admin.action(description='تایید نظرات انتخاب شده')
+    def verify(self, request, queryset):
+        self.set_verified(queryset, True)
+    
+    @admin.action(description='لغو تایید نظرات انتخاب شده')
+    def unverify(self, request, queryset):
+        self.set_verified(queryset, False)
@@ -0,0 +1,99 @@
+"""
+Reviews App - Rating Aggregates
+
+Each ``PortfolioItem`` carries the count, sum and per-star histogram of its
+verified reviews. They are adjusted with ``F()`` increments whenever a
+review starts or stops counting (verified/unverified, re-rated, moved,
+deleted), inside the transaction that made the change, so list and detail
+pages read ratings straight from the row.
+"""
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import post_save, pre_delete, pre_save
+
+from portfolio.models import PortfolioItem
+
+STARS = range(1, 6)
+
+
+def contribution(is_verified, project_id, rating):
+    """``(project_id, rating)`` if a review counts towards a rating, else ``None``."""
+    if is_verified and project_id and rating in STARS:
+        return project_id, rating
+    return None
+
+
+def stored_contribution(model, pk):
+    # Read (and on PostgreSQL lock) the row as committed, not the instance,
+    # which may be stale or partially loaded.
+    row = (
+        model._default_manager.select_for_update()
+        .filter(pk=pk).values_list('is_verified', 'project_id', 'rating').first()
+    )
+    return contribution(*row) if row else None
+
+
+def apply(project_id, rating, delta):
+    PortfolioItem.objects.filter(pk=project_id).update(
+        rating_count=F('rating_count') + delta,
+        rating_sum=F('rating_sum') + delta * rating,
+        **{f'rating_{rating}': F(f'rating_{rating}') + delta}
+    )
+
+
+def before_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._rating_before = None if instance._state.adding else stored_contribution(sender, instance.pk)
+
+
+def after_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_rating_before', None)
+    new = contribution(instance.is_verified, instance.project_id, instance.rating)
+    if old != new:
+        if old:
+            apply(*old, -1)
+        if new:
+            apply(*new, 1)
+
+
+def before_delete(sender, instance, **kwargs):
+    old = stored_contribution(sender, instance.pk)
+    if old:
+        apply(*old, -1)
+
+
+def rebuild(batch_size=500):
+    """Recompute every project's aggregates from the reviews table.
+
+    Returns the number of projects that have verified reviews.
+    """
+    rows = (
+        PortfolioItem.objects.filter(reviews__is_verified=True)
+        .values('pk')
+        .annotate(
+            count=Count('reviews'),
+            total=Sum('reviews__rating'),
+            **{f'star_{star}': Count('reviews', filter=Q(reviews__rating=star)) for star in STARS}
+        )
+    )
+    items = []
+    for row in rows:
+        item = PortfolioItem(pk=row['pk'], rating_count=row['count'], rating_sum=row['total'] or 0)
+        for star in STARS:
+            setattr(item, f'rating_{star}', row[f'star_{star}'])
+        items.append(item)
+    fields = ['rating_count', 'rating_sum'] + [f'rating_{star}' for star in STARS]
+    PortfolioItem.objects.exclude(pk__in=[item.pk for item in items]).exclude(rating_count=0).update(
+        **{field: 0 for field in fields}
+    )
+    PortfolioItem.objects.bulk_update(items, fields, batch_size=batch_size)
+    return len(items)
+
+
+def connect_signals(model):
+    pre_save.connect(before_save, sender=model, dispatch_uid='review-rating-before-save')
+    post_save.connect(after_save, sender=model, dispatch_uid='review-rating-after-save')
+    pre_delete.connect(before_delete, sender=model, dispatch_uid='review-rating-before-delete')
@@ -5,3 +5,8 @@ class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
     verbose_name = 'نظرات'
+
+    def ready(self):
+        from . import aggregates
+
+        aggregates.connect_signals(self.get_model('Review'))
@@ -0,0 +1,24 @@
+"""
+Recompute the rating aggregates of every portfolio item from its verified
+reviews, e.g. after bulk imports or raw SQL that bypassed the signals.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.response_cache import invalidate
+from portfolio.models import PortfolioItem
+from reviews.aggregates import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild PortfolioItem rating count/sum/histogram from verified reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rated = rebuild(batch_size=options['batch_size'])
+        invalidate(PortfolioItem)
+        self.stdout.write(self.style.SUCCESS(f'{rated} rated project(s) rebuilt'))
@@ -2,7 +2,7 @@
 Reviews App - Models
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from portfolio.models import PortfolioItem
 
@@ -23,6 +23,14 @@ class Review(models.Model):
         verbose_name = 'نظر'
         verbose_name_plural = 'نظرات'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_verified', '-created_at'], name='review_verified_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.rating}* - {self.user.full_name}"
+    
+    def save(self, *args, **kwargs):
+        # The project's rating aggregates are updated by post_save, in this transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
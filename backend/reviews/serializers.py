@@ -3,14 +3,17 @@ Reviews App - Serializers
 """
 
 from rest_framework import serializers
+from core.fields import ResponsiveImageField
 from .models import Review
 
 
 class ReviewSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     user_avatar = serializers.ImageField(source='user.avatar', read_only=True)
+    user_avatar_variants = ResponsiveImageField(source='user.avatar_variants')
     
     class Meta:
         model = Review
         fields = '__all__'
         read_only_fields = ['id', 'user', 'is_verified', 'created_at']
+        select_related = ['user']
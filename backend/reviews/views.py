@@ -2,17 +2,21 @@
 Reviews App - Views
 """
 
+from django.conf import settings
 from rest_framework import viewsets, permissions
+from core.mixins import RelatedFieldsMixin
+from core.response_cache import CachedResponseMixin
 from .models import Review
 from .serializers import ReviewSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(CachedResponseMixin, RelatedFieldsMixin, viewsets.ModelViewSet):
     """Review CRUD"""
     
     queryset = Review.objects.filter(is_verified=True)
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_models = ['reviews.Review', settings.AUTH_USER_MODEL]
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -5,3 +5,6 @@ class SettingsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'settings_app'
     verbose_name = 'تنظیمات'
+
+    def ready(self):
+        from . import cache  # noqa: F401  (connects invalidation signals)
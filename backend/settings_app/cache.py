@@ -0,0 +1,96 @@
+"""
+Settings App - Cached Singleton
+
+The public settings endpoint is hit on every page load, so the serialized
+singleton is kept in two layers: a per-process copy that lives a few seconds
+and the shared Django cache. Saving or deleting ``SiteSettings`` drops both;
+other workers pick the change up when their local copy expires.
+
+On a process-local cache backend the shared copy also lives only
+``LOCAL_TTL`` seconds (see ``core.caching``), as does the ETag derived from it.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.caching import invalidated_timeout
+
+from .models import SiteSettings
+
+CACHE_KEY = 'settings_app:site-settings'
+CACHE_TIMEOUT = 60 * 60
+LOCAL_TTL = 5
+
+_local_lock = threading.Lock()
+_local_entry = {'value': None, 'expires': 0.0}
+
+
+def cache_timeout():
+    return invalidated_timeout(cache, CACHE_TIMEOUT, LOCAL_TTL)
+
+
+def build_entry(instance):
+    from .serializers import SiteSettingsSerializer
+
+    updated_at = instance.updated_at
+    etag = hashlib.md5(f'{instance.pk}:{updated_at.isoformat()}'.encode()).hexdigest()
+    return {
+        'data': dict(SiteSettingsSerializer(instance).data),
+        'updated_at': updated_at,
+        'etag': f'"{etag}"',
+    }
+
+
+def get_site_settings():
+    """Return ``{'data', 'updated_at', 'etag'}`` for the settings singleton."""
+    now = time.monotonic()
+    with _local_lock:
+        if _local_entry['value'] is not None and _local_entry['expires'] > now:
+            return _local_entry['value']
+
+    entry = cache.get(CACHE_KEY)
+    if entry is None:
+        instance, _ = SiteSettings.objects.get_or_create(id=1)
+        entry = build_entry(instance)
+        cache.set(CACHE_KEY, entry, cache_timeout())
+
+    with _local_lock:
+        _local_entry['value'] = entry
+        _local_entry['expires'] = now + LOCAL_TTL
+    return entry
+
+
+async def aget_site_settings():
+    """``get_site_settings`` for async views."""
+    now = time.monotonic()
+    with _local_lock:
+        if _local_entry['value'] is not None and _local_entry['expires'] > now:
+            return _local_entry['value']
+
+    entry = await cache.aget(CACHE_KEY)
+    if entry is None:
+        instance, _ = await SiteSettings.objects.aget_or_create(id=1)
+        entry = build_entry(instance)
+        await cache.aset(CACHE_KEY, entry, cache_timeout())
+
+    with _local_lock:
+        _local_entry['value'] = entry
+        _local_entry['expires'] = now + LOCAL_TTL
+    return entry
+
+
+def invalidate():
+    with _local_lock:
+        _local_entry['value'] = None
+    cache.delete(CACHE_KEY)
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def invalidate_site_settings(sender, **kwargs):
+    invalidate()
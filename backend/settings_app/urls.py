@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.urls import path
-from .views import SiteSettingsView
+from .views import AsyncSiteSettingsView, SiteSettingsView
 
 urlpatterns = [
     path('', SiteSettingsView.as_view(), name='site-settings'),
 ]
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = [
+        path('', AsyncSiteSettingsView.as_view(), name='site-settings'),
+    ]
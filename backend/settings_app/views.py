@@ -2,9 +2,12 @@
 Settings App - Views
 """
 
-from rest_framework import views, permissions, response
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import views, permissions, response, status
+from core.async_views import AsyncAPIView
 from .models import SiteSettings
 from .serializers import SiteSettingsSerializer
+from .cache import aget_site_settings, get_site_settings
 
 
 class SiteSettingsView(views.APIView):
@@ -13,9 +16,7 @@ class SiteSettingsView(views.APIView):
     permission_classes = [permissions.AllowAny]
     
     def get(self, request):
-        settings, _ = SiteSettings.objects.get_or_create(id=1)
-        serializer = SiteSettingsSerializer(settings)
-        return response.Response(serializer.data)
+        return self.respond(request, get_site_settings())
     
     def patch(self, request):
         if not request.user.is_staff:
@@ -27,3 +28,33 @@ class SiteSettingsView(views.APIView):
             serializer.save()
             return response.Response(serializer.data)
         return response.Response(serializer.errors, status=400)
+    
+    @classmethod
+    def respond(cls, request, entry):
+        headers = {
+            'ETag': entry['etag'],
+            'Last-Modified': http_date(entry['updated_at'].timestamp()),
+            'Cache-Control': 'public, max-age=0, must-revalidate',
+        }
+        if cls.is_not_modified(request, entry):
+            return response.Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return response.Response(entry['data'], headers=headers)
+    
+    @staticmethod
+    def is_not_modified(request, entry):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in etags or entry['etag'] in etags
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return bool(if_modified_since) and int(entry['updated_at'].timestamp()) <= if_modified_since
+
+
+class AsyncSiteSettingsView(AsyncAPIView):
+    """Site settings read served natively under ASGI"""
+    
+    view_class = SiteSettingsView
+    actions = {'get': 'retrieve', 'patch': 'partial_update'}
+    
+    async def retrieve(self, request):
+        return SiteSettingsView.respond(request, await aget_site_settings())
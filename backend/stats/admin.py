@@ -0,0 +1,35 @@
+from django.contrib import admin
+from .models import BookingDailyStat, OrderDailyStat, RevenueDailyStat, UserDailyStat
+
+
+class RollupAdmin(admin.ModelAdmin):
+    """Rollups are derived data: browse them here, rebuild with ``manage.py rebuild_stats``."""
+    
+    date_hierarchy = 'date'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OrderDailyStat)
+class OrderDailyStatAdmin(RollupAdmin):
+    list_display = ['date', 'status', 'orders']
+    list_filter = ['status']
+
+
+@admin.register(RevenueDailyStat)
+class RevenueDailyStatAdmin(RollupAdmin):
+    list_display = ['date', 'invoices', 'revenue']
+
+
+@admin.register(BookingDailyStat)
+class BookingDailyStatAdmin(RollupAdmin):
+    list_display = ['date', 'slots', 'capacity', 'booked']
+
+
+@admin.register(UserDailyStat)
+class UserDailyStatAdmin(RollupAdmin):
+    list_display = ['date', 'new_users']
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class StatsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'stats'
+    verbose_name = 'آمار'
+
+    def ready(self):
+        from . import rollups
+
+        rollups.connect_signals()
@@ -0,0 +1,261 @@
+"""
+Check the dashboard rollups end to end.
+
+    python manage.py check_stats --orders 20000 --days 400
+
+Seeds a history with ``bulk_create`` (no signals) and rebuilds it in chunks,
+then drives orders, status changes (single and bulk), invoices, bookings
+and users through the regular code paths. Verifies that the incrementally
+maintained rollups equal a fresh rebuild and the source tables, that the
+dashboard API reads only rollup tables, and compares its latency with
+computing the same figures from the source tables.
+"""
+
+import datetime
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from bookings.models import DaySlot, SlotTemplate
+from bookings import services as booking_services
+from core.benchmarks import benchmark_database, format_summary, summarize
+from core.seeding import seed_invoices, seed_orders, seed_users
+from invoices.models import Invoice
+from orders.models import ServiceOrder
+from orders import services as order_services
+from stats import rollups
+from stats.models import BookingDailyStat, OrderDailyStat, RevenueDailyStat, UserDailyStat
+
+SOURCE_TABLES = ['orders_serviceorder', 'invoices_invoice', 'bookings_', 'accounts_customuser']
+
+
+class Command(BaseCommand):
+    help = 'Verify incremental dashboard rollups against rebuilds and the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--days', type=int, default=400, help='Days of seeded history')
+        parser.add_argument('--requests', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            start, end = self.seed(options['users'], options['orders'], options['days'])
+            started = time.perf_counter()
+            chunks = rollups.rebuild(start, end)
+            self.stdout.write(
+                f'rebuilt {start} .. {end} in {chunks} chunk(s), {time.perf_counter() - started:.2f} s'
+            )
+            self.compare_with_sources('after rebuild')
+
+            self.drive_events()
+            incremental = self.snapshot()
+            self.compare_with_sources('after events')
+            rollups.rebuild(*rollups.history_range())
+            rebuilt = self.snapshot()
+            if incremental != rebuilt:
+                differences = sorted(set(incremental.items()) ^ set(rebuilt.items()))[:10]
+                raise CommandError(f'incremental rollups differ from a rebuild: {differences}')
+            self.stdout.write(f'incremental rollups match a rebuild ({len(rebuilt)} rows)')
+
+            self.check_dashboard(*rollups.history_range(), options['requests'])
+        self.stdout.write(self.style.SUCCESS('Dashboard rollups OK'))
+
+    def seed(self, user_count, order_count, days):
+        now = timezone.now()
+        users = seed_users(user_count, prefix='stats')
+        for i, user in enumerate(users):
+            user.date_joined = now - datetime.timedelta(days=(i * 7) % days, hours=i % 24)
+        get_user_model().objects.bulk_update(users, ['date_joined'], batch_size=2000)
+
+        orders = seed_orders(order_count, users)
+        for i, order in enumerate(orders):
+            # Hours spread across local midnight, so day boundaries are exercised.
+            order.created_at = now - datetime.timedelta(days=i % days, hours=(i * 5) % 24, minutes=i % 60)
+        ServiceOrder.objects.bulk_update(orders, ['created_at'], batch_size=2000)
+        seed_invoices(orders[::2])
+        invoices = list(Invoice.objects.select_related('order').order_by('pk'))
+        for i, invoice in enumerate(invoices[::2]):
+            invoice.status = 'PAID'
+            # Every fifth paid invoice has no paid_date and counts on its creation day.
+            invoice.paid_date = None if i % 5 == 0 else invoice.order.created_at + datetime.timedelta(days=3)
+            invoice.final_amount = 1000000 + (i % 7) * 250000
+        Invoice.objects.bulk_update(invoices[::2], ['status', 'paid_date', 'final_amount'], batch_size=2000)
+
+        SlotTemplate.objects.bulk_create(
+            SlotTemplate(weekday=weekday, start_time=datetime.time(hour), end_time=datetime.time(hour + 2), capacity=3)
+            for weekday in range(7) for hour in (10, 14)
+        )
+        today = timezone.localdate()
+        booking_services.build_calendar(today - datetime.timedelta(days=90), 150)
+        past = list(DaySlot.objects.filter(date__lt=today).values_list('pk', flat=True))
+        DaySlot.objects.filter(pk__in=past[::2]).update(booked_count=F('capacity'))
+        DaySlot.objects.filter(pk__in=past[1::3]).update(booked_count=1)
+
+        self.users = users
+        self.stdout.write(
+            f'seeded {len(users)} users, {len(orders)} orders, {len(invoices)} invoices, '
+            f'{DaySlot.objects.count()} slots over {days} days'
+        )
+        return rollups.history_range()
+
+    def drive_events(self):
+        User = get_user_model()
+        new_users = [
+            User.objects.create_user(username=f'fresh{i}@example.com', email=f'fresh{i}@example.com', password='x')
+            for i in range(5)
+        ]
+        orders = [
+            ServiceOrder.objects.create(user=user, service_title='بازسازی', full_name='کاربر', phone='09120000000')
+            for user in new_users for n in range(3)
+        ]
+        order_services.change_status(orders[0], ServiceOrder.Status.CONTACTED)
+        order_services.change_status(orders[0], ServiceOrder.Status.IN_PROGRESS)
+        old = list(
+            ServiceOrder.objects.filter(status=ServiceOrder.Status.PENDING)
+            .exclude(pk__in=[order.pk for order in orders]).values_list('pk', flat=True)[:300]
+        )
+        order_services.bulk_change_status(old + [order.pk for order in orders[1:6]], ServiceOrder.Status.CANCELLED)
+
+        due = timezone.localdate() + datetime.timedelta(days=7)
+        invoices = [
+            Invoice.objects.create(
+                order=order, invoice_number=f'INV-S-{order.pk}', amount=2000000, final_amount=2000000, due_date=due
+            )
+            for order in orders[6:12]
+        ]
+        for invoice in invoices[:4]:
+            invoice.status = 'PAID'
+            invoice.paid_date = timezone.now()
+            invoice.save()
+        invoices[0].final_amount = 2500000    # re-priced after payment
+        invoices[0].save()
+        invoices[1].status = 'CANCELLED'      # refunded
+        invoices[1].save()
+        invoices[2].delete()
+        # An old, paid invoice goes with its order.
+        ServiceOrder.objects.filter(invoice__status='PAID', invoice__paid_date__isnull=False).first().delete()
+
+        slots = list(DaySlot.objects.filter(date__gte=timezone.localdate()).order_by('date', 'start_time')[:10])
+        bookings = [
+            booking_services.reserve_slot(user, slot.pk, address='تهران')
+            for user, slot in zip(new_users * 2, slots)
+        ]
+        for booking in bookings[:3]:
+            booking_services.cancel_booking(booking)
+
+        new_users[-1].delete()
+        self.stdout.write(
+            f'events: {len(new_users)} users, {len(orders)} orders, {len(old) + 7} status changes, '
+            f'{len(invoices)} invoices, {len(bookings)} bookings'
+        )
+
+    def snapshot(self):
+        """Every non-zero rollup value, keyed by table, day and field."""
+        values = {}
+        for model, key, fields in [
+            (OrderDailyStat, ['date', 'status'], ['orders']),
+            (RevenueDailyStat, ['date'], ['invoices', 'revenue']),
+            (BookingDailyStat, ['date'], ['slots', 'capacity', 'booked']),
+            (UserDailyStat, ['date'], ['new_users']),
+        ]:
+            for row in model.objects.values(*key, *fields):
+                for field in fields:
+                    if row[field]:
+                        values[(model.__name__, *(str(row[name]) for name in key), field)] = int(row[field])
+        return values
+
+    def compare_with_sources(self, label):
+        paid = Invoice.objects.filter(status='PAID')
+        expected = {
+            'orders': Counter(dict(ServiceOrder.objects.values_list('status').annotate(n=Count('pk')).order_by())),
+            'revenue': int(paid.aggregate(total=Sum('final_amount'))['total'] or 0),
+            'invoices': paid.count(),
+            'booked': DaySlot.objects.aggregate(total=Sum('booked_count'))['total'] or 0,
+            'capacity': DaySlot.objects.aggregate(total=Sum('capacity'))['total'] or 0,
+            'users': get_user_model().objects.count(),
+        }
+        actual = {
+            'orders': Counter(dict(OrderDailyStat.objects.values_list('status').annotate(n=Sum('orders')).order_by())),
+            'revenue': int(RevenueDailyStat.objects.aggregate(total=Sum('revenue'))['total'] or 0),
+            'invoices': RevenueDailyStat.objects.aggregate(total=Sum('invoices'))['total'] or 0,
+            'booked': BookingDailyStat.objects.aggregate(total=Sum('booked'))['total'] or 0,
+            'capacity': BookingDailyStat.objects.aggregate(total=Sum('capacity'))['total'] or 0,
+            'users': UserDailyStat.objects.aggregate(total=Sum('new_users'))['total'] or 0,
+        }
+        # Zero counters left behind by increments are not differences.
+        actual['orders'] = +actual['orders']
+        if actual != expected:
+            raise CommandError(f'{label}: rollups {actual} != sources {expected}')
+        self.stdout.write(f'{label}: rollup totals match the source tables')
+
+    def check_dashboard(self, start, end, total):
+        staff = get_user_model().objects.create_user(
+            username='stats-admin@example.com', email='stats-admin@example.com', password='x', is_staff=True
+        )
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(staff).access_token}')
+        params = {'from': start.isoformat(), 'to': end.isoformat()}
+        response = client.get('/api/stats/dashboard/', params)  # warms the authenticated user cache
+        if response.status_code != 200:
+            raise CommandError(f'dashboard returned {response.status_code}: {response.content[:200]}')
+
+        queries = []
+
+        def capture(execute, sql, sql_params, many, context):
+            queries.append(sql)
+            return execute(sql, sql_params, many, context)
+
+        with connection.execute_wrapper(capture):
+            data = client.get('/api/stats/dashboard/', params).json()
+        sources = [sql for sql in queries if any(table in sql for table in SOURCE_TABLES)]
+        if sources:
+            raise CommandError(f'dashboard queried source tables: {sources[0][:200]}')
+        self.stdout.write(f'dashboard: {len(queries)} queries, rollup tables only')
+
+        paid = Invoice.objects.filter(status='PAID')
+        expected = {
+            'orders': ServiceOrder.objects.count(),
+            'revenue': int(paid.aggregate(total=Sum('final_amount'))['total'] or 0),
+            'users': get_user_model().objects.count(),
+            'booked': DaySlot.objects.aggregate(total=Sum('booked_count'))['total'],
+        }
+        actual = {
+            'orders': data['orders']['total'],
+            'revenue': data['revenue']['total'],
+            'users': data['users']['new'],
+            'booked': data['bookings']['booked'],
+        }
+        if actual != expected:
+            raise CommandError(f'dashboard {actual} != sources {expected}')
+
+        self.stdout.write(format_summary('dashboard (rollups)', self.time(lambda: client.get('/api/stats/dashboard/', params), total)))
+        self.stdout.write(format_summary('ad-hoc source aggregates', self.time(self.adhoc_figures, total)))
+
+    def time(self, fn, total):
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(total):
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+        return summarize(latencies, time.perf_counter() - started)
+
+    def adhoc_figures(self):
+        """The dashboard's figures computed from the source tables, for comparison."""
+        list(ServiceOrder.objects.values('status').annotate(n=Count('pk')).order_by())
+        list(ServiceOrder.objects.annotate(month=TruncMonth('created_at')).values('month').annotate(n=Count('pk')).order_by())
+        list(
+            Invoice.objects.filter(status='PAID').annotate(month=TruncMonth('paid_date')).values('month')
+            .annotate(n=Count('pk'), total=Sum('final_amount')).order_by()
+        )
+        list(DaySlot.objects.annotate(month=TruncMonth('date')).values('month').annotate(
+            capacity=Sum('capacity'), booked=Sum('booked_count')).order_by())
+        list(get_user_model().objects.annotate(month=TruncMonth('date_joined')).values('month').annotate(n=Count('pk')).order_by())
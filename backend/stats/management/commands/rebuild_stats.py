@@ -0,0 +1,44 @@
+"""
+Recompute the dashboard rollups from the source tables, a chunk of days
+per transaction, e.g. after deploying the stats app, bulk imports or raw
+SQL that bypassed the signals.
+
+    python manage.py rebuild_stats                      # all history
+    python manage.py rebuild_stats --from 2025-03-21 --to 2026-03-20
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stats.rollups import get_config, history_range, rebuild
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Not a YYYY-MM-DD date: {value}')
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily order, revenue, booking and user rollups in chunks of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=parse_date, help='First day (default: earliest data)')
+        parser.add_argument('--to', dest='end', type=parse_date, help='Last day (default: today or the calendar end)')
+        parser.add_argument('--chunk-days', type=int, default=get_config()['CHUNK_DAYS'])
+
+    def handle(self, *args, **options):
+        start, end = options['start'], options['end']
+        if start is None or end is None:
+            bounds = history_range()
+            if bounds is None:
+                self.stdout.write('Nothing to rebuild')
+                return
+            start, end = start or bounds[0], end or bounds[1]
+        if start > end:
+            raise CommandError('--from is after --to')
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        chunks = rebuild(start, end, chunk_days=max(options['chunk_days'], 1), log=log)
+        self.stdout.write(self.style.SUCCESS(f'{start} .. {end} rebuilt in {chunks} chunk(s)'))
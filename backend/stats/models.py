@@ -0,0 +1,79 @@
+"""
+Stats App - Models
+
+Daily rollups behind the admin dashboard, kept up to date by
+``stats.rollups``. Counters are plain integers rather than positive ones:
+a change to a row that predates its rollup may briefly take a day below
+zero until the next rebuild.
+"""
+
+from django.db import models
+
+from orders.models import ServiceOrder
+
+
+class OrderDailyStat(models.Model):
+    """Orders created on one day, by their current status"""
+    
+    date = models.DateField(verbose_name='تاریخ ثبت')
+    status = models.CharField(max_length=20, choices=ServiceOrder.Status.choices, verbose_name='وضعیت')
+    orders = models.IntegerField(default=0, verbose_name='تعداد سفارش')
+    
+    class Meta:
+        verbose_name = 'آمار روزانه سفارشات'
+        verbose_name_plural = 'آمار روزانه سفارشات'
+        ordering = ['-date', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'status'], name='order_stat_date_status'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.status}: {self.orders}"
+
+
+class RevenueDailyStat(models.Model):
+    """Invoices paid on one day and their ``final_amount`` total"""
+    
+    date = models.DateField(unique=True, verbose_name='تاریخ پرداخت')
+    invoices = models.IntegerField(default=0, verbose_name='تعداد فاکتور')
+    revenue = models.DecimalField(max_digits=18, decimal_places=0, default=0, verbose_name='درآمد (تومان)')
+    
+    class Meta:
+        verbose_name = 'آمار روزانه درآمد'
+        verbose_name_plural = 'آمار روزانه درآمد'
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.date}: {self.revenue}"
+
+
+class BookingDailyStat(models.Model):
+    """Visit slots offered and taken on one day"""
+    
+    date = models.DateField(unique=True, verbose_name='تاریخ بازدید')
+    slots = models.IntegerField(default=0, verbose_name='تعداد بازه')
+    capacity = models.IntegerField(default=0, verbose_name='ظرفیت')
+    booked = models.IntegerField(default=0, verbose_name='رزرو شده')
+    
+    class Meta:
+        verbose_name = 'آمار روزانه رزرو'
+        verbose_name_plural = 'آمار روزانه رزرو'
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.date}: {self.booked}/{self.capacity}"
+
+
+class UserDailyStat(models.Model):
+    """Users who joined on one day"""
+    
+    date = models.DateField(unique=True, verbose_name='تاریخ عضویت')
+    new_users = models.IntegerField(default=0, verbose_name='کاربران جدید')
+    
+    class Meta:
+        verbose_name = 'آمار روزانه کاربران'
+        verbose_name_plural = 'آمار روزانه کاربران'
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.date}: {self.new_users}"
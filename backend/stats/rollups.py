@@ -0,0 +1,282 @@
+"""
+Stats App - Rollup Maintenance
+
+The dashboard reads only the daily rollup tables in ``stats.models``. They
+are adjusted with ``F()`` increments inside the transaction of the change
+that moved them:
+
+* orders: +1 on creation, -1/+1 between statuses on every transition
+  (``orders.signals.status_changed``, single or bulk), -1 on deletion;
+* revenue: an invoice counts on its payment day (``paid_date``, else its
+  creation day) while it is ``PAID``, whatever path changed it;
+* bookings: ``booked`` follows ``DaySlot.booked_count`` (+1 per
+  reservation, -1 per cancellation); ``slots`` and ``capacity`` come from
+  the calendar, which is built with ``bulk_create``, so they are refreshed
+  by the periodic ``refresh_recent_stats`` task;
+* users: +1 on sign-up, -1 on deletion.
+
+``rebuild`` recomputes a date range from the source tables, one chunk of
+days per transaction. ``refresh_recent_stats`` runs it over the last few
+days and the booking calendar, which also repairs drift from bulk writes
+and raw SQL that bypass the signals.
+"""
+
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.utils import timezone
+
+from bookings.models import Booking, DaySlot
+from bookings.signals import booking_cancelled
+from invoices.models import Invoice
+from orders.models import ServiceOrder
+from orders.signals import status_changed
+from .models import BookingDailyStat, OrderDailyStat, RevenueDailyStat, UserDailyStat
+
+DEFAULTS = {
+    'REFRESH_DAYS': 3,      # past days recomputed by the periodic refresh
+    'CHUNK_DAYS': 31,       # days rebuilt per transaction
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'STATS', {}))
+    return config
+
+
+def local_day(value):
+    return timezone.localdate(value)
+
+
+def bump(model, key, **deltas):
+    """Add ``deltas`` to the rollup row identified by ``key``, creating it if needed."""
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**key).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first.
+        model.objects.filter(**key).update(**changes)
+
+
+# Orders
+
+def order_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump(OrderDailyStat, {'date': local_day(instance.created_at), 'status': instance.status}, orders=1)
+
+
+def order_status_changed(sender, changes, **kwargs):
+    """``changes`` is a list of ``(order_id, old_status, new_status)``."""
+    created = dict(
+        ServiceOrder.objects.filter(pk__in=[order_id for order_id, old, new in changes])
+        .values_list('pk', 'created_at')
+    )
+    deltas = Counter()
+    for order_id, old, new in changes:
+        day = local_day(created[order_id])
+        deltas[day, old] -= 1
+        deltas[day, new] += 1
+    # Sorted, so concurrent bulk changes lock rollup rows in the same order.
+    for (day, status), delta in sorted(deltas.items()):
+        if delta:
+            bump(OrderDailyStat, {'date': day, 'status': status}, orders=delta)
+
+
+def order_deleted(sender, instance, **kwargs):
+    row = sender._default_manager.filter(pk=instance.pk).values_list('created_at', 'status').first()
+    if row:
+        bump(OrderDailyStat, {'date': local_day(row[0]), 'status': row[1]}, orders=-1)
+
+
+# Revenue
+
+def revenue(status, paid_date, created_at, final_amount):
+    """``(day, amount)`` if an invoice counts as revenue, else ``None``."""
+    if status == 'PAID' and final_amount is not None:
+        return local_day(paid_date or created_at), final_amount
+    return None
+
+
+def stored_revenue(model, pk):
+    row = model._default_manager.filter(pk=pk).values_list(
+        'status', 'paid_date', 'created_at', 'final_amount'
+    ).first()
+    return revenue(*row) if row else None
+
+
+def apply_revenue(day, amount, sign):
+    bump(RevenueDailyStat, {'date': day}, invoices=sign, revenue=sign * amount)
+
+
+def invoice_before_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._revenue_before = None if instance._state.adding else stored_revenue(sender, instance.pk)
+
+
+def invoice_after_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_revenue_before', None)
+    new = revenue(instance.status, instance.paid_date, instance.created_at, instance.final_amount)
+    if old != new:
+        if old:
+            apply_revenue(*old, -1)
+        if new:
+            apply_revenue(*new, 1)
+
+
+def invoice_deleted(sender, instance, **kwargs):
+    old = stored_revenue(sender, instance.pk)
+    if old:
+        apply_revenue(*old, -1)
+
+
+# Bookings
+
+def booking_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.slot_id and instance.status != 'CANCELLED':
+        bump(BookingDailyStat, {'date': instance.date}, booked=1)
+
+
+def booking_released(sender, booking, **kwargs):
+    if booking.slot_id:
+        bump(BookingDailyStat, {'date': booking.date}, booked=-1)
+
+
+# Users
+
+def user_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump(UserDailyStat, {'date': local_day(instance.date_joined)}, new_users=1)
+
+
+def user_deleted(sender, instance, **kwargs):
+    bump(UserDailyStat, {'date': local_day(instance.date_joined)}, new_users=-1)
+
+
+# Rebuilding
+
+def day_bounds(start, end):
+    """Aware datetimes ``[start 00:00, end + 1 00:00)`` in the local time zone."""
+    tz = timezone.get_current_timezone()
+    since = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min), tz)
+    until = timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min), tz)
+    return since, until
+
+
+def rebuild_range(start, end):
+    """Replace the rollup rows of ``start``..``end`` (inclusive) with fresh aggregates."""
+    since, until = day_bounds(start, end)
+    days = {'date__gte': start, 'date__lte': end}
+
+    orders = (
+        ServiceOrder.objects.filter(created_at__gte=since, created_at__lt=until)
+        .annotate(day=TruncDate('created_at')).values('day', 'status')
+        .annotate(orders=Count('pk')).order_by()
+    )
+    OrderDailyStat.objects.filter(**days).delete()
+    OrderDailyStat.objects.bulk_create(
+        OrderDailyStat(date=row['day'], status=row['status'], orders=row['orders']) for row in orders
+    )
+
+    paid = (
+        Invoice.objects.filter(status='PAID')
+        .annotate(paid_on=Coalesce('paid_date', 'created_at'))
+        .filter(paid_on__gte=since, paid_on__lt=until)
+        .annotate(day=TruncDate('paid_on')).values('day')
+        .annotate(invoices=Count('pk'), revenue=Sum('final_amount')).order_by()
+    )
+    RevenueDailyStat.objects.filter(**days).delete()
+    RevenueDailyStat.objects.bulk_create(
+        RevenueDailyStat(date=row['day'], invoices=row['invoices'], revenue=row['revenue'] or 0) for row in paid
+    )
+
+    slots = (
+        DaySlot.objects.filter(**days).values('date')
+        .annotate(slots=Count('pk'), capacity=Sum('capacity'), booked=Sum('booked_count')).order_by()
+    )
+    BookingDailyStat.objects.filter(**days).delete()
+    BookingDailyStat.objects.bulk_create(BookingDailyStat(**row) for row in slots)
+
+    joined = (
+        get_user_model().objects.filter(date_joined__gte=since, date_joined__lt=until)
+        .annotate(day=TruncDate('date_joined')).values('day')
+        .annotate(new_users=Count('pk')).order_by()
+    )
+    UserDailyStat.objects.filter(**days).delete()
+    UserDailyStat.objects.bulk_create(UserDailyStat(date=row['day'], new_users=row['new_users']) for row in joined)
+
+
+def history_range():
+    """First and last day any source table has data for (``None`` when empty)."""
+    paid = Invoice.objects.filter(status='PAID')
+    moments = [
+        ServiceOrder.objects.aggregate(first=Min('created_at'), last=Max('created_at')),
+        paid.aggregate(first=Min('created_at'), last=Max('created_at')),
+        paid.aggregate(first=Min('paid_date'), last=Max('paid_date')),
+        get_user_model().objects.aggregate(first=Min('date_joined'), last=Max('date_joined')),
+    ]
+    days = [local_day(value) for bounds in moments for value in bounds.values() if value is not None]
+    calendar = DaySlot.objects.aggregate(first=Min('date'), last=Max('date'))
+    days += [value for value in calendar.values() if value is not None]
+    if not days:
+        return None
+    return min(days), max(days + [timezone.localdate()])
+
+
+def rebuild(start=None, end=None, chunk_days=None, log=None):
+    """Recompute ``start``..``end`` (default: all history) in chunks of days.
+
+    Each chunk is its own transaction, so a long rebuild neither holds
+    locks nor a snapshot for its whole run. Returns the number of chunks.
+    """
+    if start is None or end is None:
+        bounds = history_range()
+        if bounds is None:
+            return 0
+        start, end = start or bounds[0], end or bounds[1]
+    chunk_days = chunk_days or get_config()['CHUNK_DAYS']
+    chunks = 0
+    day = start
+    while day <= end:
+        last = min(day + datetime.timedelta(days=chunk_days - 1), end)
+        with transaction.atomic():
+            rebuild_range(day, last)
+        chunks += 1
+        if log:
+            log(f'{day} .. {last}')
+        day = last + datetime.timedelta(days=1)
+    return chunks
+
+
+def refresh_recent():
+    """Recompute the last ``REFRESH_DAYS`` days and the booking calendar ahead."""
+    today = timezone.localdate()
+    start = today - datetime.timedelta(days=get_config()['REFRESH_DAYS'] - 1)
+    end = today + datetime.timedelta(days=settings.BOOKING_CALENDAR_DAYS)
+    return rebuild(start, end)
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(order_created, sender=ServiceOrder, dispatch_uid='stats-order-created')
+    status_changed.connect(order_status_changed, dispatch_uid='stats-order-status')
+    pre_delete.connect(order_deleted, sender=ServiceOrder, dispatch_uid='stats-order-deleted')
+    pre_save.connect(invoice_before_save, sender=Invoice, dispatch_uid='stats-invoice-before-save')
+    post_save.connect(invoice_after_save, sender=Invoice, dispatch_uid='stats-invoice-after-save')
+    pre_delete.connect(invoice_deleted, sender=Invoice, dispatch_uid='stats-invoice-deleted')
+    post_save.connect(booking_created, sender=Booking, dispatch_uid='stats-booking-created')
+    booking_cancelled.connect(booking_released, dispatch_uid='stats-booking-cancelled')
+    post_save.connect(user_created, sender=User, dispatch_uid='stats-user-created')
+    pre_delete.connect(user_deleted, sender=User, dispatch_uid='stats-user-deleted')
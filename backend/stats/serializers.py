@@ -0,0 +1,33 @@
+"""
+Stats App - Serializers
+"""
+
+import datetime
+
+from django.utils import timezone
+from rest_framework import serializers
+
+MAX_RANGE_DAYS = 366 * 5
+
+
+class DashboardQuerySerializer(serializers.Serializer):
+    """``?from=&to=`` (inclusive); defaults to the current month and the eleven before it"""
+    
+    to = serializers.DateField(required=False)
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField(required=False)  # a keyword, so not a class attribute
+        return fields
+    
+    def validate(self, attrs):
+        end = attrs.get('to') or timezone.localdate()
+        start = attrs.get('from')
+        if start is None:
+            month = end.replace(day=1)
+            start = month.replace(year=month.year - (month.month <= 11), month=(month.month - 12) % 12 + 1)
+        if start > end:
+            raise serializers.ValidationError('تاریخ شروع نباید بعد از تاریخ پایان باشد')
+        if end - start > datetime.timedelta(days=MAX_RANGE_DAYS):
+            raise serializers.ValidationError('بازه زمانی بیش از حد طولانی است')
+        return {'start': start, 'end': end}
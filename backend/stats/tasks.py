@@ -0,0 +1,13 @@
+"""
+Stats App - Celery Tasks
+"""
+
+from celery import shared_task
+
+from .rollups import refresh_recent
+
+
+@shared_task
+def refresh_recent_stats():
+    """Recompute recent rollups and the booking calendar (scheduled by Celery beat)."""
+    return refresh_recent()
@@ -0,0 +1,85 @@
+"""
+Stats App - Views
+"""
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from rest_framework import views, permissions
+from rest_framework.response import Response
+
+from orders.models import ServiceOrder
+from .models import BookingDailyStat, OrderDailyStat, RevenueDailyStat, UserDailyStat
+from .serializers import DashboardQuerySerializer
+
+
+def monthly(model, start, end, *fields):
+    """``[{'month': 'YYYY-MM', field: total, ...}]`` of a rollup between two days"""
+    rows = (
+        model.objects.filter(date__gte=start, date__lte=end)
+        .annotate(month=TruncMonth('date')).values('month')
+        .annotate(**{field: Sum(field) for field in fields}).order_by('month')
+    )
+    return [
+        dict({field: (row[field] or 0) for field in fields}, month=row['month'].strftime('%Y-%m'))
+        for row in rows
+    ]
+
+
+def occupancy(booked, capacity):
+    return round(booked / capacity, 3) if capacity else None
+
+
+class DashboardView(views.APIView):
+    """Admin dashboard figures, read from the daily rollups only (staff only)"""
+    
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        query = DashboardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start, end = query.validated_data['start'], query.validated_data['end']
+        return Response({
+            'from': start,
+            'to': end,
+            'orders': self.orders(start, end),
+            'revenue': self.revenue(start, end),
+            'bookings': self.bookings(start, end),
+            'users': self.users(start, end),
+        })
+    
+    def orders(self, start, end):
+        rows = (
+            OrderDailyStat.objects.filter(date__gte=start, date__lte=end)
+            .values('status').annotate(orders=Sum('orders')).order_by()
+        )
+        counts = {row['status']: row['orders'] for row in rows}
+        return {
+            'total': sum(counts.values()),
+            'by_status': [
+                {'status': status, 'label': status.label, 'count': counts.get(status, 0)}
+                for status in ServiceOrder.Status
+            ],
+            'monthly': monthly(OrderDailyStat, start, end, 'orders'),
+        }
+    
+    def revenue(self, start, end):
+        months = monthly(RevenueDailyStat, start, end, 'invoices', 'revenue')
+        for month in months:
+            month['revenue'] = int(month['revenue'])
+        return {
+            'total': sum(month['revenue'] for month in months),
+            'invoices': sum(month['invoices'] for month in months),
+            'monthly': months,
+        }
+    
+    def bookings(self, start, end):
+        months = monthly(BookingDailyStat, start, end, 'slots', 'capacity', 'booked')
+        for month in months:
+            month['occupancy'] = occupancy(month['booked'], month['capacity'])
+        capacity = sum(month['capacity'] for month in months)
+        booked = sum(month['booked'] for month in months)
+        return {'capacity': capacity, 'booked': booked, 'occupancy': occupancy(booked, capacity), 'monthly': months}
+    
+    def users(self, start, end):
+        months = monthly(UserDailyStat, start, end, 'new_users')
+        return {'new': sum(month['new_users'] for month in months), 'monthly': months}